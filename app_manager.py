@@ -35,8 +35,11 @@ from callbacks.data_cleaning import (
     register_data_cleaning_selector_callbacks,
 )
 from components.upload import upload_component
+from utils.dataset import DatasetRegistry
 from utils.logger_config import logger  # Import the logger
+from utils.sessions import register_session_cookie
 from utils.store import Store
+from utils.uploads import register_upload_routes
 
 
 class AppManager:
@@ -63,6 +66,10 @@ class AppManager:
             )
             self.app.layout = self.create_layout()
 
+        # Chunked uploads bypass the callback payload (see assets/chunked_upload.js)
+        register_upload_routes(self.app.server)
+        register_session_cookie(self.app.server)
+
     def create_layout(self) -> "html.Div":
         """Define the layout with a modern sticky top navigation bar and embedded CSS."""
         return html.Div(
@@ -320,5 +327,4 @@ class AppManager:
 
     def initialize_store(self) -> None:
         self.store = Store()
-        self.store.register("data_frame", None)
-        self.store.register("filename", None)
+        self.store.register("datasets", DatasetRegistry())  # Keyed by session
@@ -0,0 +1,107 @@
+// Streams the selected file to the /upload endpoints in slices, so the browser
+// never base64-encodes the whole file into a callback payload. When the last
+// slice has landed, the upload id is handed to Dash through `uploaded-file`.
+(function () {
+    const CHUNK_BYTES = 8 * 1024 * 1024;
+    const MAX_ATTEMPTS = 3;
+    // Keep in sync with FILE_FORMATS in utils/dataset.py
+    const EXTENSIONS = [".csv", ".parquet", ".pq", ".arrow", ".ipc", ".feather"];
+    // Keep in sync with COMPRESSION_SUFFIXES in utils/uploads.py
+    const COMPRESSIONS = ["", ".gz", ".gzip", ".zst", ".zstd", ".bz2"];
+    const ACCEPTED = EXTENSIONS.flatMap((ext) => COMPRESSIONS.map((c) => ext + c));
+
+    function setProps(id, props) {
+        window.dash_clientside.set_props(id, props);
+    }
+
+    function showStatus(message) {
+        setProps("file-info", {children: message});
+    }
+
+    async function send(method, url, body) {
+        const response = await fetch(url, {
+            method,
+            body,
+            headers: body ? {"Content-Type": "application/octet-stream"} : {},
+        });
+        const payload = await response.json().catch(() => ({}));
+        return {ok: response.ok, status: response.status, payload};
+    }
+
+    async function sendSlice(uploadId, file, offset) {
+        const end = Math.min(offset + CHUNK_BYTES, file.size);
+        for (let attempt = 1; ; attempt++) {
+            try {
+                const sent = await send(
+                    "PUT", `/upload/${uploadId}?offset=${offset}`, file.slice(offset, end)
+                );
+                // 409: a retried slice already landed, resume from the server's size
+                if (sent.ok || sent.status === 409) {
+                    return sent.payload.size;
+                }
+                throw new Error(sent.payload.error || `HTTP ${sent.status}`);
+            } catch (error) {
+                if (attempt >= MAX_ATTEMPTS) {
+                    throw error;
+                }
+            }
+        }
+    }
+
+    async function uploadFile(file) {
+        const name = file.name.toLowerCase();
+        if (!ACCEPTED.some((extension) => name.endsWith(extension))) {
+            showStatus("❌ Unsupported file type.");
+            return;
+        }
+
+        const started = await send("POST", "/upload");
+        if (!started.ok) {
+            throw new Error(started.payload.error || `HTTP ${started.status}`);
+        }
+        const uploadId = started.payload.upload_id;
+
+        let offset = 0;
+        while (offset < file.size) {
+            offset = await sendSlice(uploadId, file, offset);
+            const percent = Math.floor((100 * offset) / file.size);
+            showStatus(`⏫ Uploading ${file.name}... ${percent}%`);
+        }
+
+        showStatus(`⚙️ Processing ${file.name}...`);
+        setProps("uploaded-file", {
+            data: {upload_id: uploadId, filename: file.name, size: file.size},
+        });
+    }
+
+    function handleFile(file) {
+        if (!file) {
+            return;
+        }
+        uploadFile(file).catch((error) => showStatus(`❌ Upload failed: ${error.message}`));
+    }
+
+    // The layout is rendered by React after load, so listen on the document
+    document.addEventListener("click", (event) => {
+        if (event.target.closest && event.target.closest("#file-upload")) {
+            const picker = document.createElement("input");
+            picker.type = "file";
+            picker.accept = [...EXTENSIONS, ...COMPRESSIONS.filter(Boolean)].join(",");
+            picker.addEventListener("change", () => handleFile(picker.files[0]));
+            picker.click();
+        }
+    });
+
+    document.addEventListener("dragover", (event) => {
+        if (event.target.closest && event.target.closest("#file-upload")) {
+            event.preventDefault();
+        }
+    });
+
+    document.addEventListener("drop", (event) => {
+        if (event.target.closest && event.target.closest("#file-upload")) {
+            event.preventDefault();
+            handleFile(event.dataTransfer.files[0]);
+        }
+    });
+})();
@@ -0,0 +1,136 @@
+import argparse
+import gc
+import itertools
+import pickle
+import sys
+import tempfile
+import time
+from pathlib import Path
+from statistics import mean, stdev
+
+import numpy as np
+import polars as pl
+
+# Allow running as `python benchmarks/benchmarks_cache.py` from the repo root
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT_DIR))
+
+from benchmarks.joblib_part_backend import JoblibPartBackend  # noqa: E402
+from utils.cache_backends import CacheBackend, SQLiteBackend  # noqa: E402
+
+DATASET = ROOT_DIR / "data" / "Iris Species.csv"
+NUM_RUNS = 5
+OUTLIER_ALGORITHMS = ["zscore", "iqr", "dbscan", "isolation_forest"]
+
+
+def build_workload(df: pl.DataFrame) -> dict[str, bytes]:
+    """Builds payloads shaped like the entries seen in report/cache_*.txt."""
+    numeric = [col for col, dtype in df.schema.items() if dtype.is_numeric()][1:]
+    categorical = [col for col, dtype in df.schema.items() if dtype == pl.Utf8]
+
+    workload = {
+        "head_table": df.head(10).to_dicts(),
+        "data_summary": [
+            {"Column": col, "Type": str(dtype), "Unique Values": df[col].n_unique()}
+            for col, dtype in df.schema.items()
+        ],
+        "missing_values_summary": [],
+        "duplicate_rows": (0, []),
+        "dataset_statistics": (df.describe().to_dicts(), df.describe().columns),
+    }
+    for col in numeric:
+        data = df[col].drop_nulls().to_numpy().astype(np.float64)
+        grid = np.linspace(data.min(), data.max(), 100)
+        workload[f"skewness_kurtosis_{col}"] = (0.0, 0.0, grid, grid, data)
+        for algorithm in OUTLIER_ALGORITHMS:
+            workload[f"outlier_detection_{col}_{algorithm}"] = (
+                data,
+                data > data.mean(),
+            )
+    for method in ["pearson", "spearman"]:
+        matrix = np.corrcoef(df.select(numeric).to_numpy(), rowvar=False)
+        workload[f"correlation_heatmap_{method}"] = (numeric, matrix)
+    for x, y in itertools.pairwise(numeric):
+        workload[f"scatter_{x}_{y}"] = (df[x].to_numpy(), df[y].to_numpy())
+    for col in categorical:
+        counts = df[col].value_counts()
+        workload[f"bar_plot_{col}"] = (
+            counts[col].to_list(),
+            counts["count"].to_list(),
+        )
+
+    return {
+        key: pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        for key, value in workload.items()
+    }
+
+
+def benchmark_backend(
+    backend_class: type[CacheBackend], workload: dict[str, bytes]
+) -> dict[str, list[float]]:
+    """Times writes, reads and overwrites of the whole workload."""
+    times = {"write": [], "read": [], "overwrite": []}
+
+    for run in range(NUM_RUNS):
+        gc.collect()
+        with tempfile.TemporaryDirectory() as cache_dir:
+            backend = backend_class(Path(cache_dir))
+            namespace = f"bench{run}"
+
+            start = time.perf_counter()
+            for key, value in workload.items():
+                backend.put(namespace, key, value)
+            times["write"].append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            for key, value in workload.items():
+                assert backend.get(namespace, key) == value
+            times["read"].append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            for key, value in workload.items():
+                backend.put(namespace, key, value)
+            times["overwrite"].append(time.perf_counter() - start)
+
+            backend.close()
+
+    return times
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark cache backends.")
+    parser.add_argument(
+        "--scale",
+        type=int,
+        default=1,
+        help="Repeat the dataset rows this many times to grow the payloads.",
+    )
+    args = parser.parse_args()
+
+    df = pl.read_csv(DATASET)
+    df = pl.concat([df] * args.scale)
+    workload = build_workload(df)
+    total_bytes = sum(len(value) for value in workload.values())
+    print(
+        f"Workload: {len(workload)} entries, {total_bytes / 1024:.1f} KB "
+        f"({df.height:,} rows)"
+    )
+
+    implementations = [
+        ("Joblib part files", JoblibPartBackend),
+        ("SQLite (WAL)", SQLiteBackend),
+    ]
+    results = {}
+    for label, backend_class in implementations:
+        print(f"Benchmarking {label}...")
+        results[label] = benchmark_backend(backend_class, workload)
+
+    print("\nResults (Time in seconds, avg ± std):")
+    print(f"{'Operation':<15} {' '.join(f'{label:<25}' for label in results)}")
+    print("=" * 80)
+    for op in ["write", "read", "overwrite"]:
+        row = [f"{op.capitalize():<15}"]
+        for times in results.values():
+            text = f"{mean(times[op]):.6f} ± {stdev(times[op]):.6f}"
+            row.append(f"{text:25}")
+        print(" ".join(row))
@@ -0,0 +1,110 @@
+from collections.abc import Iterator
+from pathlib import Path
+
+import joblib
+
+from utils.cache_backends import CacheBackend, CacheEntryInfo
+
+
+class JoblibPartBackend(CacheBackend):
+    """
+    The previous cache layout, kept as a benchmark baseline.
+
+    Every namespace has a pickled ``{hash}_index.pkl`` mapping keys to part
+    numbers and size-capped ``{hash}_data_{n}.pkl`` part files. A write reads
+    the index, rewrites the old part to drop the key, loads parts to find free
+    space, then rewrites the chosen part and the index.
+
+    Unlike the original code, a full part allocates ``max + 1`` and the index
+    records the part actually written, so reads hit after writes.
+    """
+
+    MAX_FILE_SIZE = 8 * 1024
+
+    def __init__(self, cache_dir: Path):
+        self.cache_dir = cache_dir
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def index_file(self, namespace: str) -> Path:
+        return self.cache_dir / f"{namespace}_index.pkl"
+
+    def data_file(self, namespace: str, part_number: int) -> Path:
+        return self.cache_dir / f"{namespace}_data_{part_number}.pkl"
+
+    def load_index(self, namespace: str) -> dict[str, int]:
+        index_file = self.index_file(namespace)
+        return joblib.load(index_file) if index_file.exists() else {}
+
+    def get(self, namespace: str, key: str) -> bytes | None:
+        index_data = self.load_index(namespace)
+        if key not in index_data:
+            return None
+        data_file = self.data_file(namespace, index_data[key])
+        if not data_file.exists():
+            return None
+        return joblib.load(data_file).get(key)
+
+    def put(
+        self,
+        namespace: str,
+        key: str,
+        value: bytes,
+        size: int | None = None,
+        compute_seconds: float = 0.0,
+    ) -> None:
+        index_data = self.load_index(namespace)
+
+        # Remove the old entry from its part
+        if key in index_data:
+            old_file = self.data_file(namespace, index_data[key])
+            if old_file.exists():
+                old_cache = joblib.load(old_file)
+                old_cache.pop(key, None)
+                joblib.dump(old_cache, old_file, compress=0)
+
+        # Search existing parts for free space
+        available_part = None
+        for part_number in sorted(set(index_data.values())):
+            data_file = self.data_file(namespace, part_number)
+            if not data_file.exists():
+                continue
+            joblib.load(data_file)
+            if data_file.stat().st_size + len(value) <= self.MAX_FILE_SIZE:
+                available_part = part_number
+                break
+
+        if available_part is None:
+            available_part = max(index_data.values(), default=0) + 1
+            file_cache = {}
+        else:
+            file_cache = joblib.load(self.data_file(namespace, available_part))
+
+        file_cache[key] = value
+        joblib.dump(file_cache, self.data_file(namespace, available_part), compress=0)
+
+        index_data[key] = available_part
+        joblib.dump(index_data, self.index_file(namespace), compress=0)
+
+    def delete(self, namespace: str, key: str) -> None:
+        index_data = self.load_index(namespace)
+        if key not in index_data:
+            return
+        data_file = self.data_file(namespace, index_data.pop(key))
+        if data_file.exists():
+            file_cache = joblib.load(data_file)
+            file_cache.pop(key, None)
+            joblib.dump(file_cache, data_file, compress=0)
+        joblib.dump(index_data, self.index_file(namespace), compress=0)
+
+    def iter_entries(self, namespace: str | None = None) -> Iterator[CacheEntryInfo]:
+        pattern = f"{namespace}_index.pkl" if namespace else "*_index.pkl"
+        for index_file in self.cache_dir.glob(pattern):
+            entry_namespace = index_file.name.removesuffix("_index.pkl")
+            for key in joblib.load(index_file):
+                value = self.get(entry_namespace, key)
+                if value is not None:
+                    yield CacheEntryInfo(entry_namespace, key, len(value), 0.0)
+
+    def clear(self) -> None:
+        for file in self.cache_dir.glob("*.pkl"):
+            file.unlink()
@@ -1,22 +1,28 @@
 import argparse
+import io
 import json
-import pickle
 import pprint
+import shutil
+import tarfile
+import time
+from collections import defaultdict
 from pathlib import Path
-import joblib
 
-CACHE_DIR = Path("./.cache")  # Default cache directory
+from utils.cache_manager import CACHE_MANAGER
+from utils.file_utils import atomic_write
 
+# Unreferenced blobs younger than this may belong to a write still in progress
+ORPHAN_GRACE_SECONDS = 3600
+BUNDLE_MANIFEST = "manifest.jsonl"
 
-def load_pickle_file(file_path: Path):
-    """Loads a pickle file and returns its content."""
+
+def load_cache_entry(cache_hash: str, key: str):
+    """Loads and deserializes a single cache entry."""
     try:
-        return joblib.load(file_path)
-    except (EOFError, pickle.UnpicklingError) as e:
-        print(f"⚠️ Skipping corrupted file {file_path}: {e}")
-        return None
+        payload = CACHE_MANAGER.backend.get(cache_hash, key)
+        return None if payload is None else CACHE_MANAGER.serializer.loads(payload)
     except Exception as e:
-        print(f"❌ Failed to load {file_path}: {e}")
+        print(f"⚠️ Skipping corrupted entry {key}: {e}")
         return None
 
 
@@ -28,18 +34,14 @@ def beautify_cache_data(data):
         return pprint.pformat(data, indent=4, width=120)
 
 
-def get_cache_files_by_hash(cache_hash: str):
-    """Finds the index and all data files for a given hash."""
-    index_file = CACHE_DIR / f"{cache_hash}_index.pkl"
-
-    if not index_file.exists():
-        print(f"❌ No cache found for hash: {cache_hash}")
-        return None, []
-
-    # Find all corresponding data files
-    data_files = sorted(CACHE_DIR.glob(f"{cache_hash}_data*.pkl"))
-
-    return index_file, data_files
+def collect_garbage() -> None:
+    """Applies the configured disk budget and TTL once."""
+    stats = CACHE_MANAGER.collect_garbage()
+    print(
+        f"🧹 Evicted {stats['evicted']} entries "
+        f"({stats['freed_bytes'] / 1024 / 1024:.1f} MB freed), "
+        f"{stats['entries']} entries ({stats['bytes'] / 1024 / 1024:.1f} MB) left"
+    )
 
 
 def dump_cache_by_hash(
@@ -50,32 +52,32 @@ def dump_cache_by_hash(
         print("❌ Please specify a hash using --cache-hash")
         return
 
-    index_file, data_files = get_cache_files_by_hash(kwargs["cache_hash"])
-
-    if not index_file or not data_files:
-        return
-
-    print(f"\n📂 **Inspecting cache:** {index_file.name}")
-
-    index_data = load_pickle_file(index_file)
+    index_data = {
+        entry.key: {
+            "size": entry.size,
+            "compute_seconds": entry.compute_seconds,
+            "hits": entry.hits,
+        }
+        for entry in CACHE_MANAGER.backend.iter_entries(kwargs["cache_hash"])
+    }
     if not index_data:
-        print("❌ Failed to load index data.")
+        print(f"❌ No cache found for hash: {kwargs['cache_hash']}")
         return
 
+    print(f"\n📂 **Inspecting cache:** {kwargs['cache_hash']}")
+
     print("\n📌 **Index Data:**")
     formatted_index = beautify_cache_data(index_data)
     print(formatted_index)
 
     results = {"index": formatted_index, "data": {}}
 
-    # Read all data parts
-    for data_file in data_files:
-        if kwargs.get("part_number") and kwargs["part_number"] != int(
-            data_file.name.split("_")[-1][0]
-        ):
+    # Read entries one at a time
+    for key in index_data:
+        if kwargs.get("key") and kwargs["key"] != key:
             continue
-        print(f"\n📂 **Inspecting data file:** {data_file.name}")
-        data_cache = load_pickle_file(data_file)
+        print(f"\n📂 **Inspecting entry:** {key}")
+        data_cache = load_cache_entry(kwargs["cache_hash"], key)
         if kwargs.get("pretty"):
             formatted_data = beautify_cache_data(data_cache)
         else:
@@ -84,7 +86,9 @@ def dump_cache_by_hash(
         print("\n📌 **Cached Data:**")
         print(formatted_data)
 
-        results["data"][data_file.name] = formatted_data
+        results["data"][key] = (
+            formatted_data if isinstance(formatted_data, str) else repr(formatted_data)
+        )
 
     # Save to file if requested
     if kwargs.get("output"):
@@ -94,33 +98,347 @@ def dump_cache_by_hash(
         print(f"\n✅ Cache dump saved to {output_file}")
 
 
-if __name__ == "__main__":
-    parser = argparse.ArgumentParser(
-        description="Inspect and dump cache files by hash."
+def analysis_name(key: str) -> str:
+    """Strips the JSON-encoded arguments from an analysis cache key."""
+    return key.split(":{", 1)[0]
+
+
+def show_stats(group_by: str = "analysis", top: int = 20, as_json: bool = False):
+    """
+    Reports entries, bytes, compute cost and hits, aggregated per group.
+
+    ``saved_seconds`` estimates the compute time the cache has avoided
+    (hits x compute time). Hit counts are flushed by the cache janitor, so the
+    latest few minutes of reads may not be included yet.
+    """
+    group_of = {
+        "analysis": lambda e: analysis_name(e.key),
+        "key": lambda e: f"{e.namespace}/{e.key}",
+        "namespace": lambda e: e.namespace,
+    }[group_by]
+
+    groups = defaultdict(
+        lambda: {"entries": 0, "bytes": 0, "compute_seconds": 0.0, "hits": 0}
+    )
+    for entry in CACHE_MANAGER.backend.iter_entries():
+        row = groups[group_of(entry)]
+        row["entries"] += 1
+        row["bytes"] += entry.size
+        row["compute_seconds"] += entry.compute_seconds
+        row["hits"] += entry.hits
+        row.setdefault("saved_seconds", 0.0)
+        row["saved_seconds"] += entry.hits * entry.compute_seconds
+
+    ranked = sorted(groups.items(), key=lambda item: item[1]["bytes"], reverse=True)
+    totals = {
+        field: sum(row[field] for row in groups.values())
+        for field in ("entries", "bytes", "compute_seconds", "hits", "saved_seconds")
+    }
+
+    if as_json:
+        print(json.dumps({"totals": totals, "groups": dict(ranked[:top])}, indent=4))
+        return
+
+    print(f"\n📊 **Cache usage by {group_by}** (top {top} by size)\n")
+    print(
+        f"{'entries':>8} {'MB':>9} {'compute s':>10} {'hits':>8} {'saved s':>10}  {group_by}"
+    )
+    for name, row in [*ranked[:top], ("TOTAL", totals)]:
+        print(
+            f"{row['entries']:>8} {row['bytes'] / 1024 / 1024:>9.2f} "
+            f"{row['compute_seconds']:>10.2f} {row['hits']:>8} "
+            f"{row['saved_seconds']:>10.2f}  {name}"
+        )
+
+
+def find_orphan_blobs(referenced: set[str]) -> list[Path]:
+    """Lists blob files no entry refers to, leaving out recently written ones."""
+    cutoff = time.time() - ORPHAN_GRACE_SECONDS
+    return [
+        blob
+        for blob in CACHE_MANAGER.serializer.blob_dir.iterdir()
+        if blob.name not in referenced and blob.stat().st_mtime < cutoff
+    ]
+
+
+def verify_cache(fix: bool = False) -> int:
+    """
+    Checks every entry's checksum and blob files, then looks for orphaned blobs.
+
+    Returns the number of problems found. With ``fix``, broken entries and
+    orphaned blobs are removed.
+    """
+    backend, serializer = CACHE_MANAGER.backend, CACHE_MANAGER.serializer
+    referenced: set[str] = set()
+    broken = []
+    checked = 0
+
+    for entry in backend.iter_entries():
+        payload = backend.get(entry.namespace, entry.key)
+        if payload is None:
+            continue  # Evicted while scanning
+        checked += 1
+        try:
+            blobs = serializer.blob_files(payload)
+        except Exception as e:  # CorruptEntryError, unpickling errors
+            broken.append((entry, payload, f"corrupt payload ({e})"))
+            continue
+        referenced.update(blobs)
+        missing = [b for b in blobs if not (serializer.blob_dir / b).exists()]
+        if missing:
+            broken.append((entry, payload, f"{len(missing)} blob file(s) missing"))
+
+    orphans = find_orphan_blobs(referenced)
+
+    for entry, _, reason in broken:
+        print(f"❌ {entry.namespace}/{entry.key}: {reason}")
+    for blob in orphans:
+        print(f"⚠️ Orphaned blob {blob.name} ({blob.stat().st_size} bytes)")
+    print(
+        f"🔎 Checked {checked} entries: {len(broken)} broken, "
+        f"{len(orphans)} orphaned blob(s)"
     )
-    parser.add_argument(
-        "--cache-hash", type=str, help="Specify a cache hash to inspect."
+
+    if fix:
+        remove_broken(broken, orphans)
+    return len(broken) + len(orphans)
+
+
+def remove_broken(broken: list[tuple], orphans: list[Path]) -> None:
+    """Drops the broken entries and orphaned blobs ``verify_cache`` found."""
+    for entry, payload, _ in broken:
+        CACHE_MANAGER._drop_entry(entry.namespace, entry.key, payload)
+    for blob in orphans:
+        blob.unlink(missing_ok=True)
+    if broken or orphans:
+        print(f"🧹 Removed {len(broken)} entries and {len(orphans)} blob(s)")
+
+
+def cache_dir_size() -> int:
+    """Returns the bytes used by every file under the cache directory."""
+    return sum(
+        path.stat().st_size
+        for path in CACHE_MANAGER.CACHE_DIR.rglob("*")
+        if path.is_file()
     )
-    parser.add_argument(
+
+
+def compact_cache() -> None:
+    """Deletes orphaned blobs and rewrites the backend to reclaim free space."""
+    before = cache_dir_size()
+    referenced: set[str] = set()
+    for entry in CACHE_MANAGER.backend.iter_entries():
+        payload = CACHE_MANAGER.backend.get(entry.namespace, entry.key)
+        if payload is None:
+            continue
+        try:
+            referenced.update(CACHE_MANAGER.serializer.blob_files(payload))
+        except Exception:
+            continue  # Broken entries are reported by `verify`
+    for blob in find_orphan_blobs(referenced):
+        blob.unlink(missing_ok=True)
+    CACHE_MANAGER.backend.compact()
+    after = cache_dir_size()
+    print(
+        f"🧹 Compacted cache: {before / 1024 / 1024:.1f} MB -> "
+        f"{after / 1024 / 1024:.1f} MB"
+    )
+
+
+def export_cache(output: str, cache_hash: str | None = None) -> None:
+    """
+    Writes entries and their blobs to a tar bundle (gzipped for .gz/.tgz).
+
+    Entries are streamed into the archive one at a time; broken entries are
+    skipped.
+    """
+    output_file = Path(output)
+    mode = "w:gz" if output_file.suffix in (".gz", ".tgz") else "w"
+    backend, serializer = CACHE_MANAGER.backend, CACHE_MANAGER.serializer
+    manifest = []
+
+    with tarfile.open(output_file, mode) as bundle:
+        for entry in backend.iter_entries(cache_hash):
+            payload = backend.get(entry.namespace, entry.key)
+            if payload is None:
+                continue
+            try:
+                blobs = serializer.blob_files(payload)
+                for blob in blobs:
+                    bundle.add(serializer.blob_dir / blob, arcname=f"blobs/{blob}")
+            except Exception as e:
+                print(f"⚠️ Skipping broken entry {entry.key}: {e}")
+                continue
+
+            member = f"entries/{len(manifest):08d}.bin"
+            add_bytes(bundle, member, payload)
+            manifest.append(
+                {
+                    "namespace": entry.namespace,
+                    "key": entry.key,
+                    "payload": member,
+                    "blobs": blobs,
+                    "compute_seconds": entry.compute_seconds,
+                }
+            )
+
+        add_bytes(
+            bundle,
+            BUNDLE_MANIFEST,
+            "".join(json.dumps(item) + "\n" for item in manifest).encode(),
+        )
+
+    print(f"📦 Exported {len(manifest)} entries to {output_file}")
+
+
+def add_bytes(bundle: tarfile.TarFile, name: str, data: bytes) -> None:
+    """Adds an in-memory member to a tar archive."""
+    info = tarfile.TarInfo(name)
+    info.size = len(data)
+    info.mtime = int(time.time())
+    bundle.addfile(info, io.BytesIO(data))
+
+
+def import_cache(bundle_path: str, overwrite: bool = False) -> None:
+    """
+    Loads a bundle written by ``export``.
+
+    Existing entries are kept unless ``overwrite`` is set. Entries that cannot
+    be read are reported and skipped, and the rest are still imported.
+    """
+    imported = skipped = failed = 0
+
+    with tarfile.open(bundle_path) as bundle:
+        manifest = bundle.extractfile(BUNDLE_MANIFEST)
+        for number, line in enumerate(manifest, 1):
+            try:
+                added = import_entry(bundle, json.loads(line), overwrite)
+            except Exception as e:  # Corrupt payloads, unpickling errors, bad members
+                print(f"❌ Skipping entry {number} of the bundle: {e}")
+                failed += 1
+                continue
+            if added:
+                imported += 1
+            else:
+                skipped += 1
+
+    print(
+        f"📥 Imported {imported} entries ({skipped} skipped, {failed} failed) "
+        f"from {bundle_path}"
+    )
+
+
+def import_entry(bundle: tarfile.TarFile, item: dict, overwrite: bool) -> bool:
+    """Writes one manifest entry and its blobs; returns whether it was written."""
+    backend, serializer = CACHE_MANAGER.backend, CACHE_MANAGER.serializer
+    namespace, key = item["namespace"], item["key"]
+    if any(Path(blob).name != blob for blob in item["blobs"]):
+        print(f"⚠️ Skipping {key}: unsafe blob name in bundle")
+        return False
+
+    payload = bundle.extractfile(item["payload"]).read()
+    serializer.blob_files(payload)  # Raises for corrupt payloads, before any write
+    with CACHE_MANAGER.entry_lock(namespace, key):
+        previous = backend.get(namespace, key)
+        if previous == payload or (previous is not None and not overwrite):
+            return False
+        written = []
+        try:
+            for blob in item["blobs"]:
+                source = bundle.extractfile(f"blobs/{blob}")
+                atomic_write(
+                    serializer.blob_dir / blob,
+                    lambda f, source=source: shutil.copyfileobj(source, f),
+                )
+                written.append(blob)
+        except BaseException:
+            for blob in written:
+                (serializer.blob_dir / blob).unlink(missing_ok=True)
+            raise
+        size = len(payload) + serializer.blob_size(payload)
+        backend.put(namespace, key, payload, size, item["compute_seconds"])
+        if previous is not None:
+            serializer.discard_blobs(previous)
+    return True
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Builds the command line of the cache maintenance tool."""
+    parser = argparse.ArgumentParser(
+        description="Inspect, analyse and maintain the analysis cache."
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    dump = commands.add_parser("dump", help="Dump the entries of one dataset hash.")
+    dump.add_argument("--cache-hash", type=str, help="Specify a cache hash to inspect.")
+    dump.add_argument(
         "--output", type=str, help="Optional file to save the formatted dump."
     )
-    parser.add_argument(
-        "--pretty",
-        type=bool,
-        help="Pretty print the cache data.",
-        default=False,
+    dump.add_argument(
+        "--pretty", action="store_true", help="Pretty print the cache data."
+    )
+    dump.add_argument(
+        "--key", type=str, help="Optional cache key to inspect.", default=None
+    )
+
+    stats = commands.add_parser(
+        "stats", help="Report size, compute cost and hits per analysis, key or hash."
+    )
+    stats.add_argument(
+        "--by", choices=("analysis", "key", "namespace"), default="analysis"
+    )
+    stats.add_argument("--top", type=int, default=20, help="Number of rows to show.")
+    stats.add_argument("--json", action="store_true", help="Print JSON instead.")
+
+    verify = commands.add_parser(
+        "verify", help="Check checksums and blob files, and find orphaned blobs."
     )
-    parser.add_argument(
-        "--part-number",
-        type=int,
-        help="Optional part number to inspect.",
-        default=None,
+    verify.add_argument(
+        "--fix", action="store_true", help="Remove broken entries and orphans."
     )
 
-    args = parser.parse_args()
-    dump_cache_by_hash(
-        cache_hash=args.cache_hash,
-        output_path=args.output,
-        pretty=args.pretty,
-        part_number=args.part_number,
+    commands.add_parser(
+        "compact", help="Delete orphaned blobs and reclaim free space on disk."
     )
+    commands.add_parser(
+        "gc",
+        help="Evict entries past CACHE_TTL_SECONDS or over CACHE_DISK_MB.",
+    )
+
+    export = commands.add_parser("export", help="Write entries to a tar bundle.")
+    export.add_argument("output", type=str, help="Bundle path (.tar, .tar.gz).")
+    export.add_argument(
+        "--cache-hash", type=str, help="Only export entries of this hash."
+    )
+
+    import_ = commands.add_parser("import", help="Load entries from a tar bundle.")
+    import_.add_argument("bundle", type=str, help="Bundle written by `export`.")
+    import_.add_argument(
+        "--overwrite", action="store_true", help="Replace existing entries."
+    )
+    return parser
+
+
+if __name__ == "__main__":
+    args = build_parser().parse_args()
+
+    if args.command == "dump":
+        dump_cache_by_hash(
+            cache_hash=args.cache_hash,
+            output=args.output,
+            pretty=args.pretty,
+            key=args.key,
+        )
+    elif args.command == "stats":
+        show_stats(group_by=args.by, top=args.top, as_json=args.json)
+    elif args.command == "verify":
+        problems = verify_cache(fix=args.fix)
+        raise SystemExit(1 if problems and not args.fix else 0)
+    elif args.command == "compact":
+        compact_cache()
+    elif args.command == "gc":
+        collect_garbage()
+    elif args.command == "export":
+        export_cache(args.output, cache_hash=args.cache_hash)
+    elif args.command == "import":
+        import_cache(args.bundle, overwrite=args.overwrite)
@@ -1,6 +1,7 @@
 from dash import Input, Output, State, callback, html, ctx, dcc
 import polars as pl
 import numpy as np
+from utils.dataset import Dataset, current_dataset, ingest_state, publish_dataset
 from utils.logger_config import logger
 from utils.store import Store
 from callbacks.overviews.data_summary_callback import generate_summary_table
@@ -11,6 +12,20 @@ from typing import Optional, Dict, Any, Tuple
 store = Store()
 
 
+def cleaning_unavailable(dataset: Dataset | None) -> str | None:
+    """Returns why ``dataset`` cannot be cleaned or downloaded now, if it cannot."""
+    if dataset is None:
+        reason = "⚠️ Dataset not found in memory."
+    elif dataset.streaming:  # Cleaning the sample would replace the dataset by it
+        reason = "🌊 Cleaning is not available for datasets larger than memory."
+    elif ingest_state()[0]:  # The full load would be dropped on publishing the head
+        reason = "⏳ Cleaning is available once the full file has loaded."
+    else:
+        return None
+    logger.warning(reason)
+    return reason
+
+
 def handle_missing_values(df: pl.DataFrame, column: str, method: str) -> pl.DataFrame:
     """Handle missing values in the specified column using the given method."""
     if method == "mean":
@@ -81,11 +96,12 @@ def register_data_cleaning_callbacks(app):
             logger.warning("⚠️ No dataset available for cleaning.")
             return "Please upload a dataset first.", False
 
-        df: Optional[pl.DataFrame] = Store.get_static("data_frame")
-        if df is None:
-            logger.warning("⚠️ Dataset not found in memory.")
-            return "Dataset not found in memory.", False
+        dataset = current_dataset()
+        unavailable = cleaning_unavailable(dataset)
+        if unavailable:
+            return unavailable, False
 
+        df = dataset.frame()
         ctx_id = ctx.triggered_id
 
         try:
@@ -113,8 +129,8 @@ def register_data_cleaning_callbacks(app):
                 df = df.unique()
                 logger.info("✅ Duplicate rows removed successfully")
 
-            # Update the store with cleaned data
-            store.set("data_frame", df)
+            # Update the store with cleaned data and its new fingerprints
+            publish_dataset(df)
             logger.info("✅ Data cleaning completed successfully.")
 
             # Create preview data for the table
@@ -140,11 +156,11 @@ def register_data_cleaning_callbacks(app):
         if not n_clicks:
             return None
 
-        df: Optional[pl.DataFrame] = Store.get_static("data_frame")
-        if df is None:
-            logger.warning("⚠️ No dataset available for download.")
+        dataset = current_dataset()
+        if cleaning_unavailable(dataset):
             return None
 
+        df = dataset.frame()
         try:
             # Convert to CSV
             csv_buffer = io.StringIO()
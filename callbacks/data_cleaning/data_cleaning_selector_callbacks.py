@@ -1,7 +1,7 @@
 import polars as pl
 from dash import Input, Output, ctx, State
 from utils.logger_config import logger
-from utils.store import Store
+from utils.dataset import current_dataset
 from typing import List, Dict, Any, Optional, Tuple
 
 
@@ -57,15 +57,16 @@ def register_data_cleaning_selector_callbacks(app) -> None:
             logger.warning("⚠️ No file uploaded. Cannot populate column dropdowns.")
             return [], [], "Please upload a dataset first.", True, True, True, True
 
-        df: Optional[pl.DataFrame] = Store.get_static("data_frame")
+        dataset = current_dataset()
 
-        if df is None:
+        if dataset is None:
             logger.warning(
                 "⚠️ No dataset in memory despite file upload. Possible storage issue."
             )
             return [], [], "Dataset not found in memory.", True, True, True, True
 
         try:
+            df = dataset.frame()
             # Get all column names for type conversion
             all_columns = [{"label": col, "value": col} for col in df.columns]
 
@@ -99,12 +100,12 @@ def register_data_cleaning_selector_callbacks(app) -> None:
         if not file_uploaded or not selected_column:
             return []
 
-        df: pl.DataFrame = Store.get_static("data_frame")
-        if df is None:
+        dataset = current_dataset()
+        if dataset is None or selected_column not in dataset.columns:
             return []
 
         # Get the data type of the selected column
-        col_type = df[selected_column].dtype
+        col_type = dataset.schema[selected_column]
 
         # Define conversion options based on current type
         if col_type in [pl.Float64, pl.Float32, pl.Int64, pl.Int32, pl.Int16, pl.Int8]:
@@ -9,9 +9,64 @@ from sklearn.ensemble import RandomForestClassifier, RandomForestRegressor
 from sklearn.impute import SimpleImputer
 from sklearn.preprocessing import LabelEncoder
 
-from utils.cache_manager import CACHE_MANAGER  # ✅ Import CacheManager
+from utils.cached_analysis import cached_analysis
+from utils.dataset import current_dataset
+from utils.dtypes import is_categorical, is_numeric
 from utils.logger_config import logger  # ✅ Import Logger
-from utils.store import Store
+
+
+# ✅ The top-N slider only affects display, so it is not an argument
+@cached_analysis()
+def feature_importances(
+    df: pl.DataFrame, target_column: str, importance_method: str
+) -> list[tuple[str, float]] | None:
+    """Trains a model on all other columns and returns (feature, importance) pairs."""
+    X_df = df.drop([target_column])
+    y = df[target_column]
+
+    num_cols = [col for col in X_df.columns if is_numeric(X_df[col].dtype)]
+    cat_cols = [col for col in X_df.columns if col not in num_cols]
+
+    if cat_cols:
+        X_df = X_df.with_columns(
+            [X_df[col].rank(descending=False).alias(col) for col in cat_cols]
+        )
+        logger.info(f"📊 Encoded {len(cat_cols)} categorical features.")
+
+    X = SimpleImputer(strategy="constant", fill_value=-999).fit_transform(
+        X_df.to_numpy()
+    )
+    valid_idx = ~y.is_null().to_numpy()
+    X, y = X[valid_idx], y.to_numpy()[valid_idx]
+
+    if len(y) == 0:
+        return None
+
+    if is_categorical(df[target_column].dtype):
+        y = LabelEncoder().fit_transform(y)
+        model = lgb.LGBMClassifier(random_state=42, n_jobs=-1)
+    else:
+        model = lgb.LGBMRegressor(random_state=42, n_jobs=-1)
+
+    if importance_method == "native":
+        logger.info("⚙️ Training LightGBM for native feature importance...")
+        model.fit(X, y)
+        importances = model.feature_importances_
+
+    elif importance_method == "boruta":
+        logger.info("⚙️ Running Boruta Feature Selection...")
+        rf_model = (
+            RandomForestRegressor(n_jobs=-1, random_state=42)
+            if not is_categorical(df[target_column].dtype)
+            else RandomForestClassifier(n_jobs=-1, random_state=42)
+        )
+        boruta_selector = BorutaPy(
+            rf_model, n_estimators="auto", verbose=0, random_state=42
+        )
+        boruta_selector.fit(X, y)
+        importances = boruta_selector.ranking_
+
+    return list(zip(X_df.columns, importances))
 
 
 def register_feature_importance_plot_callbacks(app) -> None:
@@ -30,12 +85,12 @@ def register_feature_importance_plot_callbacks(app) -> None:
             logger.warning("⚠️ No dataset uploaded. Using default slider range.")
             return 2, 50, 20, {2: "2", 10: "10", 20: "20", 30: "30", 50: "50"}
 
-        df: pl.DataFrame = Store.get_static("data_frame")
-        if df is None:
+        dataset = current_dataset()
+        if dataset is None:
             logger.error("❌ Dataset missing in memory despite upload.")
             return 2, 50, 20, {2: "2", 10: "10", 20: "20", 30: "30", 50: "50"}
 
-        num_features = len(df.columns) - 1  # Exclude target column
+        num_features = len(dataset.columns) - 1  # Exclude target column
 
         min_features = max(2, min(num_features, 2))
         max_features = min(50, num_features)
@@ -66,80 +121,23 @@ def register_feature_importance_plot_callbacks(app) -> None:
         if not file_uploaded:
             return _log_and_return_empty("⚠️ No dataset loaded. Please upload a file.")
 
-        df: pl.DataFrame = Store.get_static("data_frame")
-        if df is None:
+        dataset = current_dataset()
+        if dataset is None:
             return _log_and_return_empty("⚠️ Dataset missing in memory.")
 
         if not target_column:
             return _log_and_return_empty("⚠️ No target column selected.")
 
-        cache_key = (
-            f"feature_importance_{importance_method}_{target_column}_{num_top_features}"
-        )
-        cached_result = CACHE_MANAGER.load_cache(cache_key, df)
-        if cached_result:
-            importance_data = cached_result
-        else:
-            try:
-                X_df = df.drop([target_column])
-                y = df[target_column]
-
-                num_cols = [
-                    col
-                    for col in X_df.columns
-                    if X_df[col].dtype in (pl.Float64, pl.Int64)
-                ]
-                cat_cols = [col for col in X_df.columns if col not in num_cols]
-
-                if cat_cols:
-                    X_df = X_df.with_columns(
-                        [
-                            X_df[col].rank(descending=False).alias(col)
-                            for col in cat_cols
-                        ]
-                    )
-                    logger.info(f"📊 Encoded {len(cat_cols)} categorical features.")
-
-                X = SimpleImputer(strategy="constant", fill_value=-999).fit_transform(
-                    X_df.to_numpy()
-                )
-                valid_idx = ~y.is_null().to_numpy()
-                X, y = X[valid_idx], y.to_numpy()[valid_idx]
-
-                if len(y) == 0:
-                    return _log_and_return_empty(
-                        "⚠️ No valid target values after NaN removal."
-                    )
-
-                if df[target_column].dtype == pl.Utf8:
-                    y = LabelEncoder().fit_transform(y)
-                    model = lgb.LGBMClassifier(random_state=42, n_jobs=-1)
-                else:
-                    model = lgb.LGBMRegressor(random_state=42, n_jobs=-1)
-
-                if importance_method == "native":
-                    logger.info("⚙️ Training LightGBM for native feature importance...")
-                    model.fit(X, y)
-                    importances = model.feature_importances_
-
-                elif importance_method == "boruta":
-                    logger.info("⚙️ Running Boruta Feature Selection...")
-                    rf_model = (
-                        RandomForestRegressor(n_jobs=-1, random_state=42)
-                        if df[target_column].dtype != pl.Utf8
-                        else RandomForestClassifier(n_jobs=-1, random_state=42)
-                    )
-                    boruta_selector = BorutaPy(
-                        rf_model, n_estimators="auto", verbose=0, random_state=42
-                    )
-                    boruta_selector.fit(X, y)
-                    importances = boruta_selector.ranking_
-
-                importance_data = list(zip(X_df.columns, importances))
-                CACHE_MANAGER.save_cache(cache_key, df, importance_data)
-
-            except Exception as e:
-                return _log_and_return_empty(f"❌ Error: {e!s}")
+        # ✅ Concurrent identical requests (e.g. several tabs) share one training run
+        try:
+            importance_data = feature_importances(
+                dataset.frame(), target_column, importance_method
+            )
+        except Exception as e:
+            return _log_and_return_empty(f"❌ Error: {e!s}")
+        if importance_data is None:
+            return _log_and_return_empty("⚠️ No valid target values after NaN removal.")
+
         final_message = (
             f"✅ Training Completed! - Top {num_top_features} features displayed."
         )
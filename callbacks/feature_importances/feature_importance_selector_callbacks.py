@@ -1,8 +1,7 @@
-import polars as pl
 from dash import Input, Output, ctx
 
+from utils.dataset import current_dataset
 from utils.logger_config import logger  # Import logger
-from utils.store import Store
 
 
 def register_feature_importance_selector_callbacks(app) -> None:
@@ -27,16 +26,16 @@ def register_feature_importance_selector_callbacks(app) -> None:
             )
             return [], "⚠️ No dataset loaded."
 
-        df: pl.DataFrame = Store.get_static("data_frame")
+        dataset = current_dataset()
 
-        if df is None:
+        if dataset is None:
             logger.warning(
                 "⚠️ No dataset in memory despite file upload. Possible storage issue."
             )
             return [], "⚠️ Dataset not found in memory."
 
         # Get column names (excluding the first column, assuming it's an ID column)
-        options = [{"label": col, "value": col} for col in df.columns[1:]]
+        options = [{"label": col, "value": col} for col in dataset.columns[1:]]
 
         # Determine what message to display based on trigger
         if ctx_id == "file-upload-status":
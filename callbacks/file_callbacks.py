@@ -1,16 +1,291 @@
-import base64
-import io
+from collections import Counter
 
 import dash
-import polars as pl
 from dash import Dash, Input, Output, State, html
 
+from callbacks.warmup import schedule_warmup
+from utils.dataset import (
+    INGEST_MODE,
+    PROGRESSIVE_ROWS,
+    activate_dataset,
+    catalog_entries,
+    clear_dataset,
+    current_dataset,
+    current_filename,
+    detect_format,
+    ingest_state,
+    is_larger_than_memory,
+    open_catalog_entry,
+    publish_dataset,
+    publish_progressively,
+    read_dataset,
+    read_schema,
+    restore_upload,
+    session_datasets,
+    upload_key,
+)
 from utils.logger_config import logger  # Import logger
-from utils.store import Store
+from utils.projection import (
+    WIDE_FILE_COLUMNS,
+    column_groups,
+    column_pattern,
+    match_columns,
+    split_patterns,
+)
+from utils.uploads import (
+    claim_upload,
+    decompress_upload,
+    discard_upload,
+    upload_path,
+)
+
+
+def loaded_file_info(filename: str) -> html.Div:
+    """Upload card status for a dataset that is already loaded."""
+    return html.Div(
+        [
+            html.P(f"📄 {filename} (Already Loaded)", style={"fontWeight": "bold"}),
+            html.P("✅ File is already loaded", style={"color": "green"}),
+        ]
+    )
+
+
+def partial_file_info(filename: str, rows: int) -> html.Div:
+    """Upload card status while a progressive ingest parses the rest of a file."""
+    return html.Div(
+        [
+            html.P(f"📄 {filename}", style={"fontWeight": "bold"}),
+            html.P(
+                f"⏳ Showing the first {rows:,} rows while the full file loads...",
+                style={"color": "#fd7e14"},
+            ),
+        ]
+    )
+
+
+def pending_columns(pending: dict) -> list[str]:
+    """Column names of an upload waiting for its columns to be chosen."""
+    return list(read_schema(upload_path(pending["upload_id"]), pending["format"]))
+
+
+def available_columns(pending: dict | None) -> list[str] | None:
+    """Column names of the pending upload, or None if there is none any more."""
+    if not pending:
+        return None
+    try:
+        return pending_columns(pending)
+    except (OSError, ValueError):  # Removed as stale meanwhile
+        return None
+
+
+def ingest_upload(
+    upload_id: str,
+    file_format: str,
+    filename: str,
+    size_info: str,
+    columns: list[str] | None = None,
+) -> tuple[str, html.Div, bool]:
+    """
+    Reads a finished upload according to ``INGEST_MODE`` and publishes it.
+
+    Returns the upload status, the upload card status and whether polling
+    for a progressive ingest stays disabled.
+    """
+    path = upload_path(upload_id)
+    key = upload_key(path, columns)
+    dataset = restore_upload(key)  # Identical to an upload ingested before
+    if dataset is not None:
+        dataset = publish_dataset(dataset, filename)
+        schedule_warmup(dataset)
+        return dataset.fingerprint, loaded_file_info(filename), True
+
+    streaming = is_larger_than_memory(path)  # Kept on disk whatever the mode
+    if INGEST_MODE == "progressive" and not streaming:
+        # Publish the first rows now, parse the rest in the background
+        dataset = publish_progressively(
+            claim_upload(upload_id), file_format, filename, columns, key
+        )
+        provisional, _ = ingest_state()
+        if provisional:
+            logger.info(f"⏳ Published the first {dataset.height:,} rows of {filename}")
+            return (
+                dataset.fingerprint,
+                partial_file_info(filename, dataset.height),
+                False,
+            )
+        schedule_warmup(dataset)  # Small enough to be complete already
+        return dataset.fingerprint, loaded_file_info(filename), True
+
+    if INGEST_MODE == "lazy" or streaming:
+        path = claim_upload(upload_id)  # Read column by column later
+
+    # Parse straight from the file, without an in-memory copy of the upload
+    dataset = read_dataset(path, file_format, columns)
+
+    # Store the dataset and filename (fingerprinted once per ingest)
+    dataset = publish_dataset(dataset, filename, key)
+    schedule_warmup(dataset)  # Precompute default selections in the background
+
+    logger.info(
+        f"✅ File uploaded: {filename}, {len(dataset.columns)} columns "
+        f"({'streaming' if streaming else INGEST_MODE} ingest)"
+    )
+
+    file_info = html.Div(
+        [
+            html.P(f"📄 {filename} ({size_info})", style={"fontWeight": "bold"}),
+            html.P("✅ File uploaded successfully!", style={"color": "green"}),
+        ]
+    )
+    return dataset.fingerprint, file_info, True
+
+
+def loaded_upload_state() -> list:
+    """Upload card outputs when no new file was uploaded, e.g. on a page load."""
+    # Check if a file is already loaded
+    existing_df = current_dataset()
+    stored_filename = current_filename()
+
+    if existing_df is not None and stored_filename:
+        logger.info(
+            f"📄 {stored_filename} (Already Loaded) - Preventing redundant upload."
+        )
+        provisional, _ = ingest_state()
+        if provisional:  # Reloaded while the rest of the file is parsed
+            file_info = partial_file_info(stored_filename, existing_df.height)
+        else:
+            file_info = loaded_file_info(stored_filename)
+        # The fingerprint as status retriggers pages when switching datasets
+        return [
+            existing_df.fingerprint,
+            file_info,
+            None,
+            False,
+            not provisional,
+            None,
+        ]
+    logger.info("📂 No file uploaded yet.")
+    return [
+        False,
+        "📂 No file uploaded yet.",
+        None,
+        True,
+        True,
+        None,
+    ]  # No file uploaded
 
 
 def register_file_callbacks(app: "Dash") -> None:
-    """Registers callbacks for reset and file upload handling."""
+    """Registers callbacks for reset, file upload handling and the upload card."""
+    register_reset_callbacks(app)
+
+    @app.callback(
+        [
+            Output("file-upload-status", "data"),
+            Output("file-info", "children"),
+            Output("uploaded-file", "data"),
+            Output("reset-button", "disabled"),
+            Output("ingest-poll", "disabled"),
+            Output("pending-upload", "data"),
+        ],
+        Input("uploaded-file", "data"),
+        State("pending-upload", "data"),
+    )
+    def handle_file_upload(upload: dict | None, pending: dict | None) -> list:
+        """
+        Parses a file streamed to disk by the upload route and publishes it.
+
+        ``upload`` holds the ``upload_id`` and ``filename`` set by the browser
+        once every chunk has been written. Files wider than
+        ``WIDE_FILE_COLUMNS`` are kept as the pending upload instead, until
+        the columns to load are chosen.
+        """
+        if not upload:
+            return loaded_upload_state()
+
+        if pending:
+            discard_upload(pending["upload_id"])  # Columns never chosen
+
+        filename = upload.get("filename", "")
+        keep_upload = False
+        try:
+            path = upload_path(upload.get("upload_id"))
+            file_size = path.stat().st_size
+
+            # Inflates .gz/.zst/.bz2 uploads on disk, block by block
+            data_name, codec = decompress_upload(upload["upload_id"], filename)
+            data_size = path.stat().st_size
+
+            try:
+                file_format = detect_format(path, data_name)
+            except ValueError:
+                logger.warning(f"❌ Unsupported file type uploaded: {filename}")
+                return [
+                    False,
+                    "❌ Unsupported file type.",
+                    None,
+                    True,
+                    True,
+                    None,
+                ]  # Unsupported file type
+
+            size_info = f"{file_size / 1024:.2f} KB"
+            if codec is not None:
+                size_info += f" {codec}, {data_size / 1024:.2f} KB inflated"
+
+            # Only the header is parsed here, rows are read once columns are chosen
+            width = len(read_schema(path, file_format))
+            if width > WIDE_FILE_COLUMNS:
+                logger.info(
+                    f"🧮 {filename} has {width:,} columns, asking which to load"
+                )
+                keep_upload = True
+                pending = {
+                    "upload_id": upload["upload_id"],
+                    "filename": filename,
+                    "format": file_format,
+                    "size_info": size_info,
+                }
+                file_info = html.Div(
+                    [
+                        html.P(
+                            f"📄 {filename} ({size_info})", style={"fontWeight": "bold"}
+                        ),
+                        html.P(f"🧮 {width:,} columns, choose the ones to load below."),
+                    ]
+                )
+                return [False, file_info, None, True, True, pending]
+
+            status, file_info, poll_disabled = ingest_upload(
+                upload["upload_id"], file_format, filename, size_info
+            )
+            return [status, file_info, None, False, poll_disabled, None]  # Enable Reset
+
+        except Exception as e:
+            logger.error(f"❌ Error processing file {filename}: {e}")
+            return [
+                False,
+                f"❌ Error: {e}",
+                None,
+                True,
+                True,
+                None,
+            ]  # Handle errors gracefully
+        finally:
+            try:
+                if not keep_upload:
+                    discard_upload(upload.get("upload_id"))
+            except ValueError:
+                pass  # Invalid id, nothing was written
+
+    register_column_chooser_callbacks(app)
+    register_dataset_picker_callbacks(app)
+    register_progressive_ingest_callbacks(app)
+    register_catalog_callbacks(app)
+
+
+def register_reset_callbacks(app: "Dash") -> None:
+    """Registers the reset button and its confirmation modal."""
 
     @app.callback(
         [
@@ -31,8 +306,11 @@ def register_file_callbacks(app: "Dash") -> None:
         State("file-upload-status", "data"),  # Check if file uploaded
     )
     def handle_reset_and_modal(
-        reset_clicks, confirm_reset_clicks, cancel_reset_clicks, file_uploaded
-    ):
+        reset_clicks: int | None,
+        confirm_reset_clicks: int | None,
+        cancel_reset_clicks: int | None,
+        file_uploaded: str | bool | None,
+    ) -> tuple:
         """Handles reset functionality, including modal popups for confirmation."""
         ctx = dash.ctx.triggered_id  # Identify which input triggered callback
 
@@ -61,8 +339,7 @@ def register_file_callbacks(app: "Dash") -> None:
         # If confirm-reset is clicked, clear stored file and reset status
         if ctx == "confirm-reset":
             logger.warning("⚠️ Reset confirmed - Clearing stored file")
-            Store.set_static("data_frame", None)  # Clear stored file
-            Store.set_static("filename", None)  # Clear stored filename
+            clear_dataset()  # Clear stored file, filename and fingerprints
 
             no_file_info = html.Div(
                 [
@@ -71,7 +348,7 @@ def register_file_callbacks(app: "Dash") -> None:
                         style={"fontWeight": "bold", "color": "#6c757d"},
                     ),
                     html.P(
-                        "⚠️ Please upload a CSV file to start analysis.",
+                        "⚠️ Please upload a CSV, Parquet or Arrow file to start analysis.",
                         style={"color": "#dc3545"},
                     ),
                 ]
@@ -86,86 +363,222 @@ def register_file_callbacks(app: "Dash") -> None:
 
         return False, True, dash.no_update, False  # Default case
 
+
+def register_column_chooser_callbacks(app: "Dash") -> None:
+    """Registers callbacks choosing the columns to load of a wide upload."""
+
     @app.callback(
-        [
-            Output("file-upload-status", "data"),
-            Output("file-info", "children"),
-            Output("file-upload", "contents"),
-            Output("reset-button", "disabled"),
-        ],
-        Input("file-upload", "contents"),
-        State("file-upload", "filename"),
+        Output("column-select", "options"),
+        Output("column-select", "value"),
+        Output("column-patterns", "value"),
+        Output("column-chooser", "style"),
+        Input("pending-upload", "data"),
     )
-    def handle_file_upload(contents, filename):
-        """Handles file upload, stores filename, and prevents unnecessary reloads."""
-        # Check if a file is already loaded
-        existing_df = Store.get_static("data_frame")
-        stored_filename = Store.get_static("filename")
-
-        if not contents:
-            if existing_df is not None and stored_filename:
-                logger.info(
-                    f"📄 {stored_filename} (Already Loaded) - Preventing redundant upload."
-                )
-                file_info = html.Div(
-                    [
-                        html.P(
-                            f"📄 {stored_filename} (Already Loaded)",
-                            style={"fontWeight": "bold"},
-                        ),
-                        html.P("✅ File is already loaded", style={"color": "green"}),
-                    ]
-                )
-                return [True, file_info, None, False]  # Prevent redundant reloading
-            logger.info("📂 No file uploaded yet.")
-            return [False, "📂 No file uploaded yet.", None, True]  # No file uploaded
+    def show_column_chooser(
+        pending: dict | None,
+    ) -> tuple[list[dict], list[str], str, dict]:
+        """Offers the column groups and columns of a wide pending upload."""
+        columns = available_columns(pending)
+        if columns is None:
+            return [], [], "", {"display": "none"}
 
+        options = [
+            {"label": f"{pattern} ({count:,} columns)", "value": pattern}
+            for pattern, count in column_groups(columns).items()
+        ]
+        options += [{"label": col, "value": column_pattern(col)} for col in columns]
+        return options, [], "", {}
+
+    @app.callback(
+        Output("column-count", "children"),
+        Output("load-columns", "disabled"),
+        Input("column-select", "value"),
+        Input("column-patterns", "value"),
+        State("pending-upload", "data"),
+    )
+    def count_chosen_columns(
+        selected: list[str] | None, typed: str | None, pending: dict | None
+    ) -> tuple[str, bool]:
+        """Shows how many columns the chosen groups and patterns match."""
+        columns = available_columns(pending)
+        if columns is None:
+            return "", True
+        chosen = match_columns(columns, [*(selected or []), *split_patterns(typed)])
+        return f"🧮 {len(chosen):,} of {len(columns):,} columns selected", not chosen
+
+    @app.callback(
+        Output("file-upload-status", "data", allow_duplicate=True),
+        Output("file-info", "children", allow_duplicate=True),
+        Output("reset-button", "disabled", allow_duplicate=True),
+        Output("ingest-poll", "disabled", allow_duplicate=True),
+        Output("pending-upload", "data", allow_duplicate=True),
+        Input("load-columns", "n_clicks"),
+        State("pending-upload", "data"),
+        State("column-select", "value"),
+        State("column-patterns", "value"),
+        prevent_initial_call=True,
+    )
+    def load_chosen_columns(
+        n_clicks: int | None,
+        pending: dict | None,
+        selected: list[str] | None,
+        typed: str | None,
+    ) -> tuple:
+        """Reads only the chosen columns of the pending upload and publishes them."""
+        if not pending:
+            return (dash.no_update,) * 5
+        filename = pending["filename"]
+        keep_upload = False
         try:
-            # Decode base64 file content
-            content_type, content_string = contents.split(",")
-            decoded = base64.b64decode(content_string)
+            columns = pending_columns(pending)
+            chosen = match_columns(columns, [*(selected or []), *split_patterns(typed)])
+            if not chosen:
+                keep_upload = True  # Let the user choose again
+                return (dash.no_update,) * 5
+            logger.info(
+                f"🧮 Loading {len(chosen):,}/{len(columns):,} columns of {filename}"
+            )
+            status, file_info, poll_disabled = ingest_upload(
+                pending["upload_id"],
+                pending["format"],
+                filename,
+                pending["size_info"],
+                chosen,
+            )
+            return status, file_info, False, poll_disabled, None
+        except Exception as e:
+            logger.error(f"❌ Error processing file {filename}: {e}")
+            return False, f"❌ Error: {e}", True, True, None
+        finally:
+            if not keep_upload:
+                discard_upload(pending["upload_id"])
 
-            if not filename.endswith(".csv"):
-                logger.warning(f"❌ Unsupported file type uploaded: {filename}")
-                return [
-                    False,
-                    "❌ Unsupported file type.",
-                    None,
-                    True,
-                ]  # Unsupported file type
 
-            # Read CSV file using Polars
-            df = pl.read_csv(io.StringIO(decoded.decode("utf-8")))
-            # Check if the first column is an incremental integer
-            first_col_name = df.columns[0]
-            if df[first_col_name].dtype == pl.Int64 and df[first_col_name].is_sorted():
-                logger.info(f"✅ Using '{first_col_name}' as the ID column.")
-            else:
-                logger.info(
-                    "⚠️ First column is not an incremental integer, adding new ID column."
-                )
-                df = df.with_columns(pl.Series("id", range(1, len(df) + 1)))
-                column_order = ["id"] + [col for col in df.columns if col != "id"]
-                df = df.select(column_order)
+def register_dataset_picker_callbacks(app: "Dash") -> None:
+    """Registers callbacks listing and switching the datasets of the session."""
+
+    @app.callback(
+        Output("dataset-picker", "options"),
+        Output("dataset-picker", "value"),
+        Input("file-upload-status", "data"),
+    )
+    def update_dataset_picker(
+        file_uploaded: str | bool | None,
+    ) -> tuple[list[dict], str | None]:
+        """Lists the datasets of the session, newest first, marking the active one."""
+        datasets = session_datasets()
+        names = Counter(filename for _, filename in datasets)
+        options = [
+            {
+                # Tell apart uploads of the same name, e.g. a file and its cleaned copy
+                "label": filename if names[filename] == 1 else f"{filename} ({fp[:8]})",
+                "value": fp,
+            }
+            for fp, filename in reversed(datasets)
+        ]
+        dataset = current_dataset()
+        return options, dataset.fingerprint if dataset is not None else None
+
+    @app.callback(
+        Output("file-upload-status", "data", allow_duplicate=True),
+        Output("file-info", "children", allow_duplicate=True),
+        Output("reset-button", "disabled", allow_duplicate=True),
+        Input("dataset-picker", "value"),
+        prevent_initial_call=True,
+    )
+    def switch_dataset(fingerprint: str | None) -> tuple:
+        """Activates another dataset of the session and refreshes every page."""
+        dataset = current_dataset()
+        if not fingerprint or (
+            dataset is not None and dataset.fingerprint == fingerprint
+        ):
+            return dash.no_update, dash.no_update, dash.no_update
+
+        activate_dataset(fingerprint)
+        dataset = current_dataset()
+        if dataset is None:
+            return False, "📂 Dataset no longer available.", True
+        schedule_warmup(dataset)
+        logger.info(f"🔀 Switched to dataset {current_filename()}")
+        return dataset.fingerprint, loaded_file_info(current_filename()), False
 
-            # Store DataFrame and filename
-            Store.set_static("data_frame", df)
-            Store.set_static("filename", filename)
 
-            logger.info(f"✅ File uploaded: {filename}, Shape: {df.shape}")
+def register_progressive_ingest_callbacks(app: "Dash") -> None:
+    """Registers the callback noticing when a progressive ingest completes."""
+
+    @app.callback(
+        Output("file-upload-status", "data", allow_duplicate=True),
+        Output("file-info", "children", allow_duplicate=True),
+        Output("ingest-poll", "disabled", allow_duplicate=True),
+        Input("ingest-poll", "n_intervals"),
+        prevent_initial_call=True,
+    )
+    def poll_progressive_ingest(n_intervals: int | None) -> tuple:
+        """Refreshes every page once the full file replaced its first rows."""
+        provisional, error = ingest_state()
+        if provisional and error is None:
+            return dash.no_update, dash.no_update, dash.no_update  # Still parsing
 
+        filename = current_filename()
+        if error is not None:
+            rows = f"{PROGRESSIVE_ROWS:,}"
             file_info = html.Div(
                 [
+                    html.P(f"📄 {filename}", style={"fontWeight": "bold"}),
                     html.P(
-                        f"📄 {filename} ({len(decoded) / 1024:.2f} KB)",
-                        style={"fontWeight": "bold"},
+                        f"❌ Full load failed, only the first {rows} rows are "
+                        f"available: {error}",
+                        style={"color": "#dc3545"},
                     ),
-                    html.P("✅ File uploaded successfully!", style={"color": "green"}),
                 ]
             )
+            return dash.no_update, file_info, True
+
+        dataset = current_dataset()
+        if dataset is None:
+            return False, "📂 Dataset no longer available.", True
+        schedule_warmup(dataset)
+        logger.info(f"✅ {filename} fully loaded, {dataset.height:,} rows")
+        return dataset.fingerprint, loaded_file_info(filename), True
+
 
-            return [True, file_info, None, False]  # Enable Reset Button
+def register_catalog_callbacks(app: "Dash") -> None:
+    """Registers callbacks opening files of the data root in place."""
 
+    @app.callback(
+        Output("catalog-picker", "options"),
+        Input("file-upload-status", "data"),
+    )
+    def update_catalog_picker(file_uploaded: str | bool | None) -> list[dict]:
+        """Lists the files and partitioned directories under the data root."""
+        return [
+            {"label": f"🗂️ {entry}" if entry.endswith("/") else entry, "value": entry}
+            for entry in catalog_entries()
+        ]
+
+    @app.callback(
+        Output("file-upload-status", "data", allow_duplicate=True),
+        Output("file-info", "children", allow_duplicate=True),
+        Output("reset-button", "disabled", allow_duplicate=True),
+        Input("catalog-picker", "value"),
+        prevent_initial_call=True,
+    )
+    def open_catalog_file(entry: str | None) -> tuple:
+        """Opens a file of the data root in place, like an uploaded one."""
+        if not entry:
+            return dash.no_update, dash.no_update, dash.no_update
+        try:
+            dataset = publish_dataset(open_catalog_entry(entry), entry)
         except Exception as e:
-            logger.error(f"❌ Error processing file {filename}: {e}")
-            return [False, f"❌ Error: {e}", None, True]  # Handle errors gracefully
+            logger.error(f"❌ Error opening {entry}: {e}")
+            return False, f"❌ Error: {e}", True
+        schedule_warmup(dataset)
+        logger.info(f"🗂️ Opened {entry} in place, {len(dataset.columns)} columns")
+
+        file_info = html.Div(
+            [
+                html.P(f"📄 {entry} (on the server)", style={"fontWeight": "bold"}),
+                html.P("✅ Opened without uploading", style={"color": "green"}),
+            ]
+        )
+        return dataset.fingerprint, file_info, False
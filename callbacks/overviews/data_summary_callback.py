@@ -3,9 +3,68 @@ import polars as pl
 from dash import Input, Output, dash_table, html
 from scipy.stats import entropy
 
-from utils.cache_manager import CACHE_MANAGER  # ✅ Import CacheManager
-from utils.logger_config import logger  # ✅ Import logger
-from utils.store import Store
+from utils import streaming
+from utils.cached_analysis import cached_analysis, cached_column_analysis
+from utils.dataset import current_dataset
+from utils.dtypes import is_categorical, is_numeric
+
+SUMMARY_COLUMNS = [
+    "Column",
+    "Type",
+    "Size (KB)",
+    "Unique Values",
+    "Most Frequent Value",
+    "Zero Count",
+    "Entropy",
+    "Constant Column",
+]
+MISSING_COLUMNS = ["Column", "Missing Count", "Missing %"]
+
+
+@cached_column_analysis()
+def column_summaries(df: pl.DataFrame, columns: list[str]) -> dict[str, dict]:
+    """Computes type, size, cardinality and distribution stats of each column."""
+    summaries = {}
+    for col in columns:
+        series, dtype = df[col], df.schema[col]
+        unique_count = int(series.n_unique())
+        summaries[col] = {
+            "Type": str(dtype),
+            "Size (KB)": round(series.estimated_size() / 1024, 2),
+            "Unique Values": unique_count if is_categorical(dtype) else "-",
+            "Most Frequent Value": (
+                series.mode().to_list()[0]
+                if is_categorical(dtype) and unique_count > 1
+                else "-"
+            ),
+            "Zero Count": int((series == 0).sum()) if is_numeric(dtype) else "-",
+            "Entropy": (
+                round(entropy(series.value_counts().to_numpy()[:, 1].astype(float)), 2)
+                if is_categorical(dtype) and unique_count > 1
+                else "-"
+            ),
+            "Constant Column": "Yes" if unique_count == 1 else "No",
+        }
+    return summaries
+
+
+def summarize_columns(df: pl.DataFrame) -> list[dict]:
+    """Builds the summary table rows, reusing stats of columns seen before."""
+    return [{"Column": col, **summary} for col, summary in column_summaries(df).items()]
+
+
+@cached_analysis()
+def summarize_missing_values(df: pl.DataFrame) -> list[dict]:
+    """Counts missing values for every column that has any."""
+    return [
+        {
+            "Missing Count": df[col].null_count(),
+            "Column": col,
+            "Missing %": f"{(df[col].null_count() / df.height * 100):.2f}%",
+        }
+        for col in df.columns
+        if df[col].null_count() > 0
+    ]
 
 
 def generate_summary_table(data, columns, title):
@@ -65,78 +124,17 @@ def register_data_summary_callbacks(app) -> None:
         if not trigger:
             return "No dataset loaded."
 
-        df: pl.DataFrame = Store.get_static("data_frame")
-        if df is None:
+        dataset = current_dataset()
+        if dataset is None:
             return "No dataset loaded."
 
-        cache_key = "data_summary"
-        cached_result = CACHE_MANAGER.load_cache(cache_key, df)
-        if cached_result:
-            return generate_summary_table(
-                cached_result,
-                [
-                    "Column",
-                    "Type",
-                    "Size (KB)",
-                    "Unique Values",
-                    "Most Frequent Value",
-                    "Zero Count",
-                    "Entropy",
-                    "Constant Column",
-                ],
-                "📌 Data Types & Column Statistics",
-            )
-
-        # Compute Data Summary
-        column_types = df.schema
-        column_sizes = {
-            col: round(df[col].estimated_size() / 1024, 2) for col in df.columns
-        }
-        unique_counts = {col: int(df[col].n_unique()) for col in df.columns}
-        most_frequent_values = {
-            col: df[col].mode().to_list()[0] if unique_counts[col] > 1 else "-"
-            for col in df.columns
-        }
-
-        summary_table_data = [
-            {
-                "Column": col,
-                "Type": str(dtype),
-                "Size (KB)": column_sizes.get(col, 0),
-                "Unique Values": unique_counts[col] if dtype == pl.Utf8 else "-",
-                "Most Frequent Value": (
-                    most_frequent_values[col] if dtype == pl.Utf8 else "-"
-                ),
-                "Zero Count": (
-                    int((df[col] == 0).sum())
-                    if dtype in (pl.Float64, pl.Int64)
-                    else "-"
-                ),
-                "Entropy": (
-                    round(
-                        entropy(df[col].value_counts().to_numpy()[:, 1].astype(float)),
-                        2,
-                    )
-                    if dtype == pl.Utf8 and unique_counts[col] > 1
-                    else "-"
-                ),
-                "Constant Column": "Yes" if unique_counts[col] == 1 else "No",
-            }
-            for col, dtype in column_types.items()
-        ]
-        CACHE_MANAGER.save_cache(cache_key, df, summary_table_data)
+        if dataset.streaming:
+            rows = streaming.column_summaries(dataset)
+        else:
+            rows = summarize_columns(dataset.frame())
         return generate_summary_table(
-            summary_table_data,
-            [
-                "Column",
-                "Type",
-                "Size (KB)",
-                "Unique Values",
-                "Most Frequent Value",
-                "Zero Count",
-                "Entropy",
-                "Constant Column",
-            ],
+            rows,
+            SUMMARY_COLUMNS,
             "📌 Data Types & Column Statistics",
         )
 
@@ -148,50 +146,16 @@ def register_data_summary_callbacks(app) -> None:
         if not trigger:
             return "No dataset loaded."
 
-        df: pl.DataFrame = Store.get_static("data_frame")
-        if df is None:
+        dataset = current_dataset()
+        if dataset is None:
             return "No dataset loaded."
 
-        cache_key = "missing_values_summary"
-        cached_result = CACHE_MANAGER.load_cache(cache_key, df)
-        if cached_result:
-            return generate_summary_table(
-                cached_result,
-                ["Column", "Missing Count", "Missing %"],
-                "⚠️ Missing Values Summary",
-            )
-
-        # missing_counts = df.null_count().to_dict(as_series=False)
-        # missing_counts = {
-        #     col: (
-        #         int(missing_counts[col][0])
-        #         if isinstance(missing_counts[col], list)
-        #         else int(missing_counts[col])
-        #     )
-        #     for col in df.columns
-        # }
-        missing_table_data = [
-            {
-                "Missing Count": df[col].null_count(),
-                "Column": col,
-                "Missing %": f"{(df[col].null_count() / df.height * 100):.2f}%",
-            }
-            for col in df.columns
-            if df[col].null_count() > 0
-        ]
-
-        # missing_table_data = [
-        #     {
-        #         "Column": col,
-        #         "Missing Count": missing_counts[col],
-        #         "Missing %": f"{(missing_counts[col] / df.height * 100):.2f}%",
-        #     }
-        #     for col in df.columns
-        #     if missing_counts[col] > 0
-        # ]
-        CACHE_MANAGER.save_cache(cache_key, df, missing_table_data)
+        if dataset.streaming:
+            rows = streaming.missing_values(dataset)
+        else:
+            rows = summarize_missing_values(dataset.frame())
         return generate_summary_table(
-            missing_table_data,
-            ["Column", "Missing Count", "Missing %"],
+            rows,
+            MISSING_COLUMNS,
             "⚠️ Missing Values Summary",
         )
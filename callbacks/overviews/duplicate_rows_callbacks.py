@@ -2,9 +2,17 @@ import dash_bootstrap_components as dbc
 import polars as pl
 from dash import Dash, Input, Output, dash_table, html
 
-from utils.cache_manager import CACHE_MANAGER  # Import the cache manager
+from utils import streaming
+from utils.cached_analysis import cached_analysis
+from utils.dataset import current_dataset
 from utils.logger_config import logger  # Import the logger
-from utils.store import Store
+
+
+@cached_analysis()
+def find_duplicate_rows(df: pl.DataFrame) -> tuple[int, pl.DataFrame]:
+    """Returns the number of duplicated rows and the rows themselves."""
+    duplicate_mask = df.is_duplicated()
+    return int(duplicate_mask.sum()), df.filter(duplicate_mask)
 
 
 def generate_duplicate_table(data, columns, title, highlight_color="#007bff"):
@@ -63,37 +71,22 @@ def register_duplicate_rows_callbacks(app: "Dash") -> None:
         if not trigger:
             return "No dataset loaded."
 
-        df: pl.DataFrame = Store.get_static("data_frame")
-        if df is None:
+        dataset = current_dataset()
+        if dataset is None:
             return "No dataset loaded."
 
-        cache_key = "duplicate_rows"
-        cached_result = CACHE_MANAGER.load_cache(cache_key, df)
-        if cached_result:
-
-            num_duplicates, data = cached_result
-            return (
-                generate_duplicate_table(
-                    data,
-                    df.columns,
-                    f"🔁 {num_duplicates:,} Duplicate Rows Found",
-                    "#dc3545",
-                )
-                if num_duplicates > 0
-                else html.P("✅ No duplicate rows found.")
-            )
-
-        duplicate_mask = df.is_duplicated()
-        num_duplicates = duplicate_mask.sum()
+        if dataset.streaming:  # Lists each duplicated row once, up to a limit
+            num_duplicates, duplicate_rows = streaming.duplicate_rows(dataset)
+            columns = streaming.streamed_columns(dataset)
+        else:
+            num_duplicates, duplicate_rows = find_duplicate_rows(dataset.frame())
+            columns = dataset.columns
 
         if num_duplicates > 0:
-            duplicate_rows = df.filter(duplicate_mask)
             logger.warning(f"🔁 Found {num_duplicates:,} duplicate rows.")
-            data = duplicate_rows.to_dicts()
-            CACHE_MANAGER.save_cache(cache_key, df, (num_duplicates, data))
             return generate_duplicate_table(
-                data,
-                df.columns,
+                duplicate_rows.to_dicts(),
+                columns,
                 f"🔁 {num_duplicates:,} Duplicate Rows Found",
                 "#dc3545",
             )
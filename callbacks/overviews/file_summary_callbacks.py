@@ -1,9 +1,24 @@
-import polars as pl
 from dash import Dash, Input, Output, html
 
 from utils.cache_manager import CACHE_MANAGER  # Import cache manager
+from utils.dataset import Dataset, current_dataset, ingest_state
+from utils.dtypes import DOWNCAST_DTYPES
 from utils.logger_config import logger  # Import the logger
-from utils.store import Store
+
+
+def memory_report(dataset: Dataset) -> str:
+    """Describes the memory held by the loaded columns, before and after downcasting."""
+    in_memory = dataset.memory_bytes / 1024 / 1024
+    loaded = f"{len(dataset.series):,}/{len(dataset.columns):,} columns loaded"
+    if not DOWNCAST_DTYPES or not dataset.raw_bytes:
+        return f"💾 {in_memory:.2f} MB in memory ({loaded})"
+
+    as_read = dataset.raw_bytes / 1024 / 1024
+    saved = 100 * (1 - dataset.memory_bytes / dataset.raw_bytes)
+    return (
+        f"💾 {in_memory:.2f} MB in memory, {as_read:.2f} MB before downcasting "
+        f"({saved:.0f}% saved, {loaded})"
+    )
 
 
 def register_file_summary_callbacks(app: "Dash") -> None:
@@ -19,9 +34,9 @@ def register_file_summary_callbacks(app: "Dash") -> None:
             logger.warning("⚠️ No dataset loaded. Skipping file summary.")
             return "No dataset loaded."
 
-        df: pl.DataFrame = Store.get_static("data_frame")
+        dataset = current_dataset()
 
-        if df is None:
+        if dataset is None:
             logger.warning("⚠️ Dataset not found in memory despite file upload.")
             return "No dataset loaded."
 
@@ -33,10 +48,28 @@ def register_file_summary_callbacks(app: "Dash") -> None:
         #     return cached_result  # Return cached result instantly
 
         # Compute dataset summary
-        num_rows, num_cols = df.shape
+        num_rows, num_cols = dataset.shape
         logger.info(f"📊 Dataset Summary: {num_rows:,} rows, {num_cols:,} columns.")
 
-        result = html.P(f"📊 {num_rows:,} rows, {num_cols:,} columns")
+        rows = f"{num_rows:,} rows"
+        provisional, error = ingest_state()
+        if provisional:  # Results on every page cover these rows only, for now
+            rows += " (first rows only, " + (
+                "full load failed)" if error else "full file still loading)"
+            )
+
+        lines = [
+            html.P(f"📊 {rows}, {num_cols:,} columns"),
+            html.P(memory_report(dataset)),
+        ]
+        if dataset.streaming:
+            lines.append(
+                html.P(
+                    "🌊 Larger than memory: summaries stream over every row, "
+                    f"plots use a sample of {dataset.sample_height:,} rows"
+                )
+            )
+        result = html.Div(lines)
 
         # ✅ Store result in cache
         # CACHE_MANAGER.save_cache(cache_key, df, result)
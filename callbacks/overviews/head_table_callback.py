@@ -2,9 +2,15 @@ import dash_bootstrap_components as dbc
 import polars as pl
 from dash import Dash, Input, Output, dash_table, html
 
-from utils.cache_manager import CACHE_MANAGER  # Import cache manager
+from utils.cached_analysis import cached_analysis
+from utils.dataset import current_dataset
 from utils.logger_config import logger  # Import logger
-from utils.store import Store
+
+
+@cached_analysis()
+def head_rows(df: pl.DataFrame, n: int = 10) -> pl.DataFrame:
+    """Returns the first ``n`` rows of the dataset."""
+    return df.head(n)
 
 
 def generate_head_table(data, columns, title, highlight_color="#007bff"):
@@ -64,21 +70,19 @@ def register_head_table_callbacks(app: "Dash") -> None:
         if not trigger:
             return "No data available for display."
 
-        df: pl.DataFrame = Store.get_static("data_frame")
-        if df is None or df.is_empty():
+        dataset = current_dataset()
+        if dataset is None:
             return "No data available for display."
 
-        cache_key = "head_table"
-        cached_result = CACHE_MANAGER.load_cache(cache_key, df)
-        if cached_result:
-            return generate_head_table(
-                cached_result, df.columns, "📋 First 10 Rows of Dataset"
-            )
+        # Lazy datasets read just the first rows instead of loading every column
+        head_df = dataset.head(10) if dataset.lazy else head_rows(dataset.frame())
+        if head_df.is_empty():
+            return "No data available for display."
 
         logger.info(
-            f"📋 Displaying first 10 rows of dataset ({df.shape[0]} rows, {df.shape[1]} columns)."
+            f"📋 Displaying first 10 rows of dataset ({len(dataset.columns)} columns)."
         )
-        data = df.head(10).to_dicts()
-        CACHE_MANAGER.save_cache(cache_key, df, data)
 
-        return generate_head_table(data, df.columns, "📋 First 10 Rows of Dataset")
+        return generate_head_table(
+            head_df.to_dicts(), dataset.columns, "📋 First 10 Rows of Dataset"
+        )
@@ -5,9 +5,47 @@ import polars as pl
 from dash import Dash, Input, Output
 from scipy.stats import rankdata
 
-from utils.cache_manager import CACHE_MANAGER  # Import cache manager
+from callbacks.statistics.statistics_selector_callbacks import statistics_columns
+from utils.cached_analysis import cached_analysis, cached_figure
+from utils.dataset import current_dataset
 from utils.logger_config import logger  # Import logger
-from utils.store import Store
+
+
+@cached_analysis(columns="columns")
+def correlation_matrix(df: pl.DataFrame, columns: list[str], method: str) -> np.ndarray:
+    """Computes the correlation matrix of numeric columns, NaNs filled with the mean."""
+    logger.info(f"📊 Computing {method} correlation for {len(columns)} features.")
+
+    data = df.select(columns).to_numpy()  # Only keep numeric columns
+    data = np.nan_to_num(data, nan=np.nanmean(data))  # ✅ Replace NaNs with column mean
+
+    # ✅ Compute correlation matrix efficiently
+    if method == "pearson":
+        return np.corrcoef(data, rowvar=False)
+    if method == "spearman":
+        return spearman_corr(data)
+    raise ValueError(f"Unsupported correlation method: {method}")
+
+
+# ✅ Efficient Spearman Correlation Computation with NaN Handling
+def spearman_corr(data: np.ndarray) -> np.ndarray:
+    """Optimized Spearman correlation using NumPy & SciPy."""
+    logger.info("⚡ Optimized Spearman computation using vectorized ranking.")
+    ranked_data = np.apply_along_axis(rankdata, axis=0, arr=data)
+    return np.corrcoef(ranked_data, rowvar=False)  # Fast matrix correlation
+
+
+@cached_figure(columns="columns")
+def correlation_figure(df: pl.DataFrame, columns: list[str], method: str) -> go.Figure:
+    """Builds the correlation heatmap of numeric columns."""
+    return px.imshow(
+        correlation_matrix(df, columns, method),
+        labels={"color": "Correlation"},
+        x=columns,
+        y=columns,
+        color_continuous_scale="RdBu_r",
+        title=f"Feature Correlation Heatmap ({method.capitalize()})",
+    )
 
 
 def register_correlation_heatmap_callbacks(app: "Dash") -> None:
@@ -23,71 +61,19 @@ def register_correlation_heatmap_callbacks(app: "Dash") -> None:
         if not file_uploaded:
             return go.Figure()  # No dataset available
 
-        df: pl.DataFrame = Store.get_static("data_frame")
-        if df is None or df.is_empty():
+        dataset = current_dataset()
+        if dataset is None or dataset.height == 0:
             return go.Figure()  # No dataset available
 
-        # ✅ Generate cache key using dataset shape & method
-        cache_key = f"correlation_heatmap_{method}"
-        cached_result = CACHE_MANAGER.load_cache(cache_key, df)
-        if cached_result:
-            numeric_columns, corr_matrix = cached_result
-            return px.imshow(
-                corr_matrix,
-                labels={"color": "Correlation"},
-                x=numeric_columns,
-                y=numeric_columns,
-                color_continuous_scale="RdBu_r",
-                title=f"Feature Correlation Heatmap ({method.capitalize()})",
-            )
-
         # ✅ Select only numeric columns
-        numeric_columns = [
-            col for col in df.columns if df[col].dtype in (pl.Float64, pl.Int64)
-        ]
+        numeric_columns = statistics_columns(dataset)
         if len(numeric_columns) < 2:
             return go.Figure()  # Not enough numerical features for correlation
 
-        logger.info(
-            f"📊 Computing {method} correlation for {len(numeric_columns)} features."
-        )
-
-        df_select = df.select(numeric_columns)  # Only keep numeric columns
-        data = df_select.to_numpy()
-        data = np.nan_to_num(
-            data, nan=np.nanmean(data)
-        )  # ✅ Replace NaNs with column mean
-
         try:
-            # ✅ Compute correlation matrix efficiently
-            if method == "pearson":
-                corr_matrix = np.corrcoef(data, rowvar=False)
-            elif method == "spearman":
-                corr_matrix = spearman_corr(data)
-            else:
-                logger.error(f"❌ Unsupported correlation method: {method}")
-                return go.Figure()
-
-            # ✅ Store minimal dict in cache
-            CACHE_MANAGER.save_cache(cache_key, df, (numeric_columns, corr_matrix))
-            logger.info(f"💾 Cached correlation heatmap for {method}.")
-
-            return px.imshow(
-                corr_matrix,
-                labels={"color": "Correlation"},
-                x=numeric_columns,
-                y=numeric_columns,
-                color_continuous_scale="RdBu_r",
-                title=f"Feature Correlation Heatmap ({method.capitalize()})",
+            return correlation_figure(
+                dataset.frame(numeric_columns), numeric_columns, method
             )
-
         except Exception as e:
             logger.error(f"❌ Error computing correlation: {e}")
             return go.Figure()
-
-    # ✅ Efficient Spearman Correlation Computation with NaN Handling
-    def spearman_corr(data: np.ndarray) -> np.ndarray:
-        """Optimized Spearman correlation using NumPy & SciPy."""
-        logger.info("⚡ Optimized Spearman computation using vectorized ranking.")
-        ranked_data = np.apply_along_axis(rankdata, axis=0, arr=data)
-        return np.corrcoef(ranked_data, rowvar=False)  # Fast matrix correlation
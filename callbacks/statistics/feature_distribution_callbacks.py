@@ -6,9 +6,34 @@ from dash import Dash, Input, Output, dash_table
 from plotly_resampler import FigureResampler
 from scipy.stats import gaussian_kde, kurtosis, skew
 
-from utils.cache_manager import CACHE_MANAGER
+from utils.cached_analysis import cached_analysis
 from utils.logger_config import logger
-from utils.store import Store
+from utils.dataset import current_dataset
+
+
+@cached_analysis(columns="column")
+def distribution_stats(
+    df: pl.DataFrame, column: str
+) -> tuple[float, float, np.ndarray, np.ndarray, np.ndarray] | None:
+    """Computes skewness, kurtosis and a KDE curve of a numeric column."""
+    logger.info(f"🔍 Computing skewness, kurtosis, and KDE for '{column}'.")
+
+    # Drop missing values efficiently
+    column_data = np.asarray(df[column].drop_nulls().to_list(), dtype=np.float64)
+
+    if column_data.size == 0:
+        return None
+
+    # Compute skewness & kurtosis (handling NaNs better)
+    skew_value = np.nan_to_num(skew(column_data, nan_policy="omit"), nan=0.0)
+    kurtosis_value = np.nan_to_num(kurtosis(column_data, nan_policy="omit"), nan=0.0)
+
+    # **Compute KDE Curve**
+    kde = gaussian_kde(column_data)
+    x_vals = np.linspace(column_data.min(), column_data.max(), 100)
+    y_vals = kde(x_vals)
+
+    return skew_value, kurtosis_value, x_vals, y_vals, column_data
 
 
 def register_feature_distribution_callbacks(app: "Dash") -> None:
@@ -27,56 +52,25 @@ def register_feature_distribution_callbacks(app: "Dash") -> None:
         if not file_uploaded:
             return "No valid data for analysis.", go.Figure()
 
-        df: pl.DataFrame = Store.get_static("data_frame")
+        dataset = current_dataset()
 
-        if df is None or not selected_column or selected_column not in df.columns:
+        if (
+            dataset is None
+            or not selected_column
+            or selected_column not in dataset.columns
+        ):
             return "No valid data for analysis.", go.Figure()
 
-        # Generate cache key
-        cache_key = f"skewness_kurtosis_{selected_column}"
-        cached_result = CACHE_MANAGER.load_cache(cache_key, df)
-        if cached_result:
-            skew_value, kurtosis_value, x_vals, y_vals, column_data = cached_result
-        else:
-            try:
-                logger.info(
-                    f"🔍 Computing skewness, kurtosis, and KDE for '{selected_column}'."
-                )
-
-                # Drop missing values efficiently
-                column_data = np.asarray(
-                    df[selected_column].drop_nulls().to_list(), dtype=np.float64
-                )
-
-                if column_data.size == 0:
-                    return "No valid data for analysis.", go.Figure()
-
-                # Compute skewness & kurtosis (handling NaNs better)
-                skew_value = np.nan_to_num(
-                    skew(column_data, nan_policy="omit"), nan=0.0
-                )
-                kurtosis_value = np.nan_to_num(
-                    kurtosis(column_data, nan_policy="omit"), nan=0.0
-                )
-
-                # **Compute KDE Curve**
-                kde = gaussian_kde(column_data)
-                x_vals = np.linspace(column_data.min(), column_data.max(), 100)
-                y_vals = kde(x_vals)
-
-                # Store minimal data in cache using joblib
-                cache_data = (skew_value, kurtosis_value, x_vals, y_vals, column_data)
-                CACHE_MANAGER.save_cache(
-                    cache_key,
-                    df,
-                    cache_data,
-                )
-
-            except Exception as e:
-                logger.error(
-                    f"❌ Error while computing skewness, kurtosis, or KDE: {e}"
-                )
-                return "❌ Failed to compute analysis.", go.Figure()
+        try:
+            result = distribution_stats(
+                dataset.frame([selected_column]), selected_column
+            )
+        except Exception as e:
+            logger.error(f"❌ Error while computing skewness, kurtosis, or KDE: {e}")
+            return "❌ Failed to compute analysis.", go.Figure()
+        if result is None:
+            return "No valid data for analysis.", go.Figure()
+        skew_value, kurtosis_value, x_vals, y_vals, column_data = result
 
         # **Prepare Skewness & Kurtosis Table**
         table = dash_table.DataTable(
@@ -8,9 +8,27 @@ from plotly_resampler import FigureResampler
 from sklearn.cluster import DBSCAN
 from sklearn.ensemble import IsolationForest
 
-from utils.cache_manager import CACHE_MANAGER  # Import cache manager
+from utils.cached_analysis import cached_analysis
 from utils.logger_config import logger  # Import logger
-from utils.store import Store
+from utils.dataset import current_dataset
+
+
+@cached_analysis(columns="column")
+def find_outliers(
+    df: pl.DataFrame, column: str, algorithm: str
+) -> tuple[np.ndarray, np.ndarray] | None:
+    """Returns the non-NaN values of a column and their outlier mask."""
+    logger.info(f"🔍 Detecting outliers in '{column}' using {algorithm}.")
+    column_data = df[column].to_numpy()
+    column_data_clean = column_data[~np.isnan(column_data)]  # Remove NaNs
+
+    if column_data_clean.size == 0:
+        return None
+
+    outliers = detect_outliers(column_data_clean, algorithm)
+    if outliers is None:
+        return None
+    return column_data_clean, outliers
 
 
 def register_outlier_detection_callbacks(app: "Dash") -> None:
@@ -27,41 +45,18 @@ def register_outlier_detection_callbacks(app: "Dash") -> None:
         if not file_uploaded:
             return go.Figure(), go.Figure()
 
-        df: pl.DataFrame = Store.get_static("data_frame")
-        if df is None or column_name not in df.columns:
+        dataset = current_dataset()
+        if dataset is None or column_name not in dataset.columns:
             return go.Figure(), go.Figure()
 
-        cache_key = f"outlier_detection_{column_name}_{algorithm}"
-        cached_result = CACHE_MANAGER.load_cache(
-            cache_key,
-            df,
-        )
-        if cached_result:
-            column_data_clean, outliers = cached_result
-        else:
-            try:
-                logger.info(
-                    f"🔍 Detecting outliers in '{column_name}' using {algorithm}."
-                )
-                column_data = df[column_name].to_numpy()
-                column_data_clean = column_data[~np.isnan(column_data)]  # Remove NaNs
-
-                if column_data_clean.size == 0:
-                    return go.Figure(), go.Figure()
-
-                outliers = detect_outliers(column_data_clean, algorithm)
-                if outliers is None:
-                    return go.Figure(), go.Figure()
-
-                # Store only necessary data in cache
-                CACHE_MANAGER.save_cache(
-                    cache_key,
-                    df,
-                    (column_data_clean, outliers),
-                )
-            except Exception as e:
-                logger.error(f"❌ Error during outlier detection: {e}")
-                return go.Figure(), go.Figure()
+        try:
+            result = find_outliers(dataset.frame([column_name]), column_name, algorithm)
+        except Exception as e:
+            logger.error(f"❌ Error during outlier detection: {e}")
+            return go.Figure(), go.Figure()
+        if result is None:
+            return go.Figure(), go.Figure()
+        column_data_clean, outliers = result
 
         # **Create Boxplot**
         fig_box = FigureResampler(
@@ -98,7 +93,7 @@ def register_outlier_detection_callbacks(app: "Dash") -> None:
         return fig_box, fig_scatter
 
 
-def detect_outliers(data: np.ndarray, algorithm: str):
+def detect_outliers(data: np.ndarray, algorithm: str) -> np.ndarray | None:
     if algorithm == "zscore":
         return detect_outliers_zscore(data)
     elif algorithm == "iqr":
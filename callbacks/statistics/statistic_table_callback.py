@@ -1,8 +1,32 @@
 import polars as pl
 from dash import Input, Output, dash_table
-from utils.cache_manager import CACHE_MANAGER
+from utils.cached_analysis import cached_column_analysis
 from utils.logger_config import logger
-from utils.store import Store
+from utils.dataset import current_dataset
+from utils import streaming
+
+
+@cached_column_analysis()
+def column_statistics(df: pl.DataFrame, columns: list[str]) -> dict[str, dict]:
+    """Computes descriptive statistics of the given columns, keyed by statistic."""
+    logger.info(f"📊 Computing statistics for {len(columns)} column(s)...")
+    stats_df = df.select(columns).describe()
+    return {
+        col: dict(zip(stats_df["statistic"], stats_df[col].to_list(), strict=True))
+        for col in columns
+    }
+
+
+def describe_dataset(df: pl.DataFrame) -> pl.DataFrame:
+    """Assembles ``df.describe()`` from per-column statistics."""
+    stats = column_statistics(df)
+    if not stats:
+        return df.describe()
+    statistics = list(next(iter(stats.values())))
+    return pl.DataFrame(
+        {"statistic": statistics}
+        | {col: [values[s] for s in statistics] for col, values in stats.items()}
+    )
 
 
 def register_statistic_table_callbacks(app) -> None:
@@ -17,36 +41,22 @@ def register_statistic_table_callbacks(app) -> None:
         if not file_uploaded:
             return "No dataset loaded."
 
-        df: pl.DataFrame = Store.get_static("data_frame")
-        if df is None or df.is_empty():
+        dataset = current_dataset()
+        if dataset is None or dataset.height == 0:
             return "No data available for statistical summary."
 
-        # ✅ Generate a unique cache key based on dataset shape
-        cache_key = "dataset_statistics"
-        cached_stats = CACHE_MANAGER.load_cache(
-            cache_key,
-            df,
-        )
-        if cached_stats:
-            data, columns = cached_stats
-        else:
-            try:
-                logger.info("📊 Computing dataset statistics...")
-                stats_df = df.describe()
-                data, columns = stats_df.to_dicts(), stats_df.columns
-                CACHE_MANAGER.save_cache(
-                    cache_key,
-                    df,
-                    (data, columns),
-                )
-                logger.info("💾 Cached data summary for future use.")
-            except Exception as e:
-                logger.error(f"❌ Error while computing dataset statistics: {e}")
-                return "❌ Failed to compute statistics."
+        try:
+            if dataset.streaming:
+                stats_df = streaming.describe(dataset)
+            else:
+                stats_df = describe_dataset(dataset.frame())
+        except Exception as e:
+            logger.error(f"❌ Error while computing dataset statistics: {e}")
+            return "❌ Failed to compute statistics."
 
         return dash_table.DataTable(
-            data=data,
-            columns=[{"name": col, "id": col} for col in columns],
+            data=stats_df.to_dicts(),
+            columns=[{"name": col, "id": col} for col in stats_df.columns],
             style_table={
                 "maxHeight": "500px",
                 "overflowY": "auto",
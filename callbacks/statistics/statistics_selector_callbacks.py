@@ -1,8 +1,20 @@
-import polars as pl
 from dash import Input, Output
 
+from utils.dataset import Dataset, current_dataset
+from utils.dtypes import is_numeric
 from utils.logger_config import logger  # Import logger
-from utils.store import Store
+
+
+def statistics_columns(dataset: Dataset) -> list[str]:
+    """Returns the numerical columns offered in the Statistics tab."""
+    return [col for col, dtype in dataset.schema.items() if is_numeric(dtype)]
+
+
+def default_statistics_column(columns: list[str]) -> str | None:
+    """Defaults to the second column (the first is usually the ID), else the first."""
+    if not columns:
+        return None
+    return columns[1] if len(columns) > 1 else columns[0]
 
 
 def register_statistics_selector_callbacks(app) -> None:
@@ -23,16 +35,14 @@ def register_statistics_selector_callbacks(app) -> None:
             )
             return [], None
 
-        df: pl.DataFrame = Store.get_static("data_frame")
+        dataset = current_dataset()
 
-        if df is None:
+        if dataset is None:
             logger.error("❌ Dataset not found in memory despite file upload.")
             return [], None
 
         # Select only numeric columns
-        numeric_columns = [
-            col for col in df.columns if df[col].dtype in (pl.Float64, pl.Int64)
-        ]
+        numeric_columns = statistics_columns(dataset)
 
         if not numeric_columns:
             logger.warning("⚠️ No numerical columns found in dataset.")
@@ -40,12 +50,7 @@ def register_statistics_selector_callbacks(app) -> None:
 
         options = [{"label": col, "value": col} for col in numeric_columns]
 
-        # Default to second column if available, otherwise first column
-        default_value = (
-            (options[1]["value"] if len(options) > 1 else options[0]["value"])
-            if options
-            else None
-        )
+        default_value = default_statistics_column(numeric_columns)
 
         logger.info(
             f"✅ Updated statistics selector with {len(options)} numerical columns. Default: {default_value}"
@@ -3,9 +3,52 @@ import plotly.graph_objects as go
 import polars as pl
 from dash import Input, Output
 
-from utils.cache_manager import CACHE_MANAGER  # Import Cache Manager
+from utils import streaming
+from utils.cached_analysis import cached_analysis, cached_figure
+from utils.dataset import current_dataset
 from utils.logger_config import logger  # Import logger
-from utils.store import Store
+
+
+@cached_analysis(columns="column")
+def category_counts(df: pl.DataFrame, column: str) -> tuple[list, list] | None:
+    """Returns the categories of a column and how often each occurs."""
+    # ✅ Get value counts
+    counts = df[column].value_counts()
+
+    # ✅ Inspect actual column names (Polars may return different names)
+    col_names = counts.columns
+    logger.info(f"🔍 Found columns in value_counts(): {col_names}")
+
+    # ✅ Rename columns dynamically based on available names
+    category_col = col_names[0]  # The categorical feature name
+    count_col = col_names[1]  # The count column
+
+    counts = counts.rename({category_col: "category", count_col: "count"})
+    if counts.is_empty():
+        return None
+    return counts["category"].to_list(), counts["count"].to_list()
+
+
+@cached_figure(columns="column")
+def bar_figure(df: pl.DataFrame, column: str) -> go.Figure | None:
+    """Builds the bar plot of a categorical column, or None if it has no values."""
+    return counts_figure(category_counts(df, column), column)
+
+
+def counts_figure(result: tuple[list, list] | None, column: str) -> go.Figure | None:
+    """Plots category counts as bars, or returns None if there are none."""
+    if result is None:
+        return None
+    x, y = result
+
+    # ✅ Create Bar Plot
+    return px.bar(
+        x=x,
+        y=y,
+        title=f"Bar Plot: {column}",
+        labels={"x": column, "y": "Count"},
+        template="plotly_white",
+    )
 
 
 def register_bar_plot_callbacks(app) -> None:
@@ -21,59 +64,24 @@ def register_bar_plot_callbacks(app) -> None:
         if not file_uploaded:
             return go.Figure()
 
-        df: pl.DataFrame = Store.get_static("data_frame")
-        if df is None or selected_categorical not in df.columns:
+        dataset = current_dataset()
+        if dataset is None or selected_categorical not in dataset.columns:
             return go.Figure()  # No valid data
 
-        # ✅ Generate cache key using dataset shape (prevents unnecessary recomputation)
-        cache_key = f"bar_plot_{selected_categorical}"
-        cached_result = CACHE_MANAGER.load_cache(cache_key, df)
-        if cached_result:
-            x, y = cached_result
-        else:
-            try:
-                # ✅ Get value counts
-                category_counts = df[selected_categorical].value_counts()
-
-                # ✅ Inspect actual column names (Polars may return different names)
-                col_names = category_counts.columns
-                logger.info(f"🔍 Found columns in value_counts(): {col_names}")
-
-                # ✅ Rename columns dynamically based on available names
-                category_col = col_names[0]  # The categorical feature name
-                count_col = col_names[1]  # The count column
-
-                category_counts = category_counts.rename(
-                    {category_col: "category", count_col: "count"}
+        try:
+            if dataset.streaming:  # Counted over every row, not the sample
+                fig = counts_figure(
+                    streaming.category_counts(dataset, selected_categorical),
+                    selected_categorical,
                 )
-
-                unique_values = category_counts["category"].to_list()
-                # counts = category_counts["count"].to_list()
-
-                if not unique_values:
-                    return go.Figure()
-                x = category_counts["category"].to_list()
-                y = category_counts["count"].to_list()
-                # ✅ Store minimal data in cache
-                CACHE_MANAGER.save_cache(
-                    cache_key,
-                    df,
-                    (x, y),
+            else:
+                fig = bar_figure(
+                    dataset.frame([selected_categorical]), selected_categorical
                 )
+        except Exception as e:
+            logger.error(
+                f"❌ Error generating bar plot for '{selected_categorical}': {e}"
+            )
+            return go.Figure()
 
-            except Exception as e:
-                logger.error(
-                    f"❌ Error generating bar plot for '{selected_categorical}': {e}"
-                )
-                return go.Figure()
-
-        # ✅ Create Bar Plot
-        fig = px.bar(
-            x=x,
-            y=y,
-            title=f"Bar Plot: {selected_categorical}",
-            labels={"x": selected_categorical, "y": "Count"},
-            template="plotly_white",
-        )
-
-        return fig
+        return go.Figure() if fig is None else fig
@@ -1,12 +1,12 @@
 import plotly.express as px
 import plotly.graph_objects as go
-import polars as pl
 from dash import Input, Output
 from plotly_resampler import FigureResampler  # ✅ Adds resampling for large datasets
 
-from utils.cache_manager import CACHE_MANAGER  # Import Cache Manager
+from utils.dataset import current_dataset
+from utils.dtypes import is_numeric
+from utils.helpers import select_columns
 from utils.logger_config import logger  # Import logger
-from utils.store import Store
 
 
 def register_pair_plot_callbacks(app) -> None:
@@ -22,41 +22,33 @@ def register_pair_plot_callbacks(app) -> None:
         if not file_uploaded:
             return go.Figure()
 
-        df: pl.DataFrame = Store.get_static("data_frame")
-        if df is None or not selected_features:
+        dataset = current_dataset()
+        if dataset is None or not selected_features:
             return go.Figure()  # No valid data
 
         # ✅ Filter only valid numerical features
         valid_features = [
             col
             for col in selected_features
-            if col in df.columns and df[col].dtype in (pl.Float64, pl.Int64)
+            if col in dataset.schema and is_numeric(dataset.schema[col])
         ]
 
         if len(valid_features) < 2:
             return go.Figure()  # Pair plot requires at least 2 features
 
-        # ✅ Generate cache key using dataset shape (prevents unnecessary recomputation)
-        cache_key = f"pair_plot_{'_'.join(valid_features)}"
-        cached_result = CACHE_MANAGER.load_cache(cache_key, df)
-        if cached_result:
-            pairplot_data = cached_result
-        else:
-            try:
-                # ✅ Select only necessary columns (keeps data in Polars)
-                pairplot_data = df.select(valid_features).to_dicts()
-
-                # ✅ Store minimal data in cache
-                CACHE_MANAGER.save_cache(cache_key, df, pairplot_data)
-
-            except Exception as e:
-                logger.error(f"❌ Error generating resampled pair plot: {e}")
-                return go.Figure()
+        try:
+            # ✅ Select only necessary columns (keeps data in Polars)
+            pairplot_data = select_columns(
+                dataset.frame(valid_features), valid_features
+            )
+        except Exception as e:
+            logger.error(f"❌ Error generating resampled pair plot: {e}")
+            return go.Figure()
 
         # ✅ Resampled Pair Plot
         fig = FigureResampler(
             px.scatter_matrix(
-                pairplot_data,  # Use dictionary-based input
+                {col: pairplot_data[col].to_numpy() for col in valid_features},
                 dimensions=valid_features,
                 title="Resampled Pair Plot of Selected Features",
                 template="plotly_white",
@@ -2,12 +2,32 @@ import numpy as np
 import plotly.graph_objects as go
 import polars as pl
 from dash import Input, Output
-from plotly_resampler import FigureResampler
 from scipy.stats import gaussian_kde  # Import Gaussian KDE for contour
 
-from utils.cache_manager import CACHE_MANAGER
+from utils.cached_analysis import cached_analysis
+from utils.dataset import current_dataset
+from utils.helpers import xy_pair
 from utils.logger_config import logger
-from utils.store import Store
+
+
+@cached_analysis(columns=("feature_x", "feature_y"))
+def contour_density(
+    df: pl.DataFrame, feature_x: str, feature_y: str
+) -> tuple[np.ndarray, np.ndarray, np.ndarray] | None:
+    """Estimates a 100x100 KDE density grid over the x/y pair."""
+    # ✅ Same x/y pair as the scatter plot, extracted once for both
+    pair = xy_pair(df, feature_x, feature_y)
+    if pair is None:
+        return None  # No valid data
+    x_data, y_data = pair
+
+    # ✅ Estimate density using KDE
+    kde = gaussian_kde(np.vstack([x_data, y_data]))
+    x_axis = np.linspace(x_data.min(), x_data.max(), 100)
+    y_axis = np.linspace(y_data.min(), y_data.max(), 100)
+    x_grid, y_grid = np.meshgrid(x_axis, y_axis)
+    density = kde(np.vstack([x_grid.ravel(), y_grid.ravel()])).reshape(100, 100)
+    return x_axis, y_axis, density
 
 
 def register_contour_plot_callbacks(app) -> None:
@@ -24,62 +44,31 @@ def register_contour_plot_callbacks(app) -> None:
         if not file_uploaded:
             return go.Figure()
 
-        df: pl.DataFrame = Store.get_static("data_frame")
-        if df is None or not feature_x or not feature_y:
+        dataset = current_dataset()
+        if dataset is None or not feature_x or not feature_y:
             return go.Figure()  # No valid data
 
         # ✅ Check if selected features exist
-        if feature_x not in df.columns or feature_y not in df.columns:
+        if feature_x not in dataset.columns or feature_y not in dataset.columns:
             return go.Figure()  # Invalid feature selection
 
-        # ✅ Handle duplicate column names
-        if feature_x == feature_y:
-            feature_y_renamed = f"{feature_y}_y"
-            df = df.with_columns(df[feature_y].alias(feature_y_renamed))
-            feature_y = feature_y_renamed
-
-        # ✅ Generate cache key using dataset shape
-        cache_key = f"contour_{feature_x}_{feature_y}"
-        cached_result = CACHE_MANAGER.load_cache(cache_key, df, use_joblib=True)
-        if cached_result:
-            x_grid, y_grid, density = cached_result
-        else:
-            try:
-                # ✅ Extract feature data (handling NaNs)
-                df_clean = df.select([feature_x, feature_y]).drop_nulls()
-                if df_clean.is_empty():
-                    return go.Figure()  # No valid data
-
-                # ✅ Sort data by x-axis
-                df_clean = df_clean.sort(feature_x)
-                x_data, y_data = (
-                    df_clean[feature_x].to_numpy(),
-                    df_clean[feature_y].to_numpy(),
-                )
-
-                # ✅ Estimate density using KDE
-                kde = gaussian_kde(np.vstack([x_data, y_data]))
-                x_grid, y_grid = np.meshgrid(
-                    np.linspace(x_data.min(), x_data.max(), 100),
-                    np.linspace(y_data.min(), y_data.max(), 100),
-                )
-                density = kde(np.vstack([x_grid.ravel(), y_grid.ravel()])).reshape(
-                    100, 100
-                )
-
-                # ✅ Store minimal required data in cache
-                CACHE_MANAGER.save_cache(cache_key, df, (x_grid, y_grid, density))
-
-            except Exception as e:
-                logger.error(f"❌ Error generating Contour plot: {e}")
-                return go.Figure()
+        try:
+            result = contour_density(
+                dataset.frame([feature_x, feature_y]), feature_x, feature_y
+            )
+        except Exception as e:
+            logger.error(f"❌ Error generating Contour plot: {e}")
+            return go.Figure()
+        if result is None:
+            return go.Figure()  # No valid data
+        x_axis, y_axis, density = result
 
         # ✅ Create contour plot
         fig = go.Figure()
         fig.add_trace(
             go.Contour(
-                x=np.linspace(x_data.min(), x_data.max(), 100),
-                y=np.linspace(y_data.min(), y_data.max(), 100),
+                x=x_axis,
+                y=y_axis,
                 z=density,
                 colorscale="Viridis",
                 contours=dict(showlabels=True, size=2),
@@ -87,9 +76,9 @@ def register_contour_plot_callbacks(app) -> None:
         )
 
         fig.update_layout(
-            title=f"Contour Plot: {feature_x} vs {feature_y.replace('_y', '')}",
+            title=f"Contour Plot: {feature_x} vs {feature_y}",
             xaxis_title=feature_x,
-            yaxis_title=feature_y.replace("_y", ""),
+            yaxis_title=feature_y,
             template="plotly_white",
         )
 
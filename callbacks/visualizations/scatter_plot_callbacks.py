@@ -1,13 +1,12 @@
 import numpy as np
 import plotly.graph_objects as go
-import polars as pl
 from dash import Input, Output
 from plotly_resampler import FigureResampler
 from scipy.stats import gaussian_kde  # Import Gaussian KDE for contour
 
-from utils.cache_manager import CACHE_MANAGER
+from utils.dataset import current_dataset
+from utils.helpers import xy_pair
 from utils.logger_config import logger
-from utils.store import Store
 
 
 def register_scatter_plot_callbacks(app) -> None:
@@ -25,45 +24,23 @@ def register_scatter_plot_callbacks(app) -> None:
         if not file_uploaded:
             return go.Figure()
 
-        df: pl.DataFrame = Store.get_static("data_frame")
-        if df is None or not feature_x or not feature_y:
+        dataset = current_dataset()
+        if dataset is None or not feature_x or not feature_y:
             return go.Figure()  # No valid data
 
         # ✅ Check if selected features exist
-        if feature_x not in df.columns or feature_y not in df.columns:
+        if feature_x not in dataset.columns or feature_y not in dataset.columns:
             return go.Figure()  # Invalid feature selection
 
-        # ✅ Handle duplicate column names
-        if feature_x == feature_y:
-            feature_y_renamed = f"{feature_y}_y"
-            df = df.with_columns(df[feature_y].alias(feature_y_renamed))
-            feature_y = feature_y_renamed
-
-        # ✅ Generate cache key using dataset shape and selected mode
-        cache_key = f"{plot_type}_{feature_x}_{feature_y}"
-        cached_result = CACHE_MANAGER.load_cache(cache_key, df)
-        if cached_result:
-            x_data, y_data = cached_result
-        else:
-            try:
-                # ✅ Extract feature data (handling NaNs)
-                df_clean = df.select([feature_x, feature_y]).drop_nulls()
-                if df_clean.is_empty():
-                    return go.Figure()  # No valid data
-
-                # ✅ Sort data by x-axis
-                df_clean = df_clean.sort(feature_x)
-                x_data, y_data = (
-                    df_clean[feature_x].to_numpy(),
-                    df_clean[feature_y].to_numpy(),
-                )
-
-                # ✅ Store minimal data in cache
-                CACHE_MANAGER.save_cache(cache_key, df, (x_data, y_data))
-
-            except Exception as e:
-                logger.error(f"❌ Error generating {plot_type} plot: {e}")
-                return go.Figure()
+        # ✅ Same x/y pair as the contour plot, extracted once for both
+        try:
+            pair = xy_pair(dataset.frame([feature_x, feature_y]), feature_x, feature_y)
+        except Exception as e:
+            logger.error(f"❌ Error generating {plot_type} plot: {e}")
+            return go.Figure()
+        if pair is None:
+            return go.Figure()  # No valid data
+        x_data, y_data = pair
 
         fig = go.Figure()
 
@@ -76,14 +53,14 @@ def register_scatter_plot_callbacks(app) -> None:
                     y=y_data,
                     mode="markers",
                     marker={"color": "blue", "size": 5, "opacity": 0.7},
-                    name=f"{feature_x} vs {feature_y.replace('_y', '')}",
+                    name=f"{feature_x} vs {feature_y}",
                 )
             )
 
             fig.update_layout(
-                title=f"Scatter Plot: {feature_x} vs {feature_y.replace('_y', '')}",
+                title=f"Scatter Plot: {feature_x} vs {feature_y}",
                 xaxis_title=feature_x,
-                yaxis_title=feature_y.replace("_y", ""),
+                yaxis_title=feature_y,
                 template="plotly_white",
             )
 
@@ -108,9 +85,9 @@ def register_scatter_plot_callbacks(app) -> None:
             )
 
             fig.update_layout(
-                title=f"Contour Plot: {feature_x} vs {feature_y.replace('_y', '')}",
+                title=f"Contour Plot: {feature_x} vs {feature_y}",
                 xaxis_title=feature_x,
-                yaxis_title=feature_y.replace("_y", ""),
+                yaxis_title=feature_y,
                 template="plotly_white",
             )
 
@@ -1,11 +1,66 @@
+import numpy as np
 import plotly.graph_objects as go
 import polars as pl
 from dash import Input, Output
 from plotly_resampler import FigureResampler  # ✅ Adds resampling for large datasets
 
-from utils.cache_manager import CACHE_MANAGER  # Import Cache Manager
+from utils.cached_analysis import cached_analysis, cached_figure
+from utils.dataset import current_dataset
 from utils.logger_config import logger  # Import logger
-from utils.store import Store
+
+
+@cached_analysis(columns=("categorical_feature", "numerical_feature"))
+def grouped_values(
+    df: pl.DataFrame, categorical_feature: str, numerical_feature: str
+) -> tuple[np.ndarray, np.ndarray] | None:
+    """
+    Returns the null-free category/value pairs, or None if fewer than two remain.
+
+    Both features may be the same column.
+    """
+    # ✅ Extract selected features and drop missing values
+    clean_df = pl.DataFrame(
+        {"x": df[categorical_feature], "y": df[numerical_feature]}
+    ).drop_nulls()
+
+    # ✅ Ensure sufficient data points
+    if clean_df.height < 2:
+        return None
+    return clean_df["x"].to_numpy(), clean_df["y"].to_numpy()
+
+
+@cached_figure(columns=("categorical_feature", "numerical_feature"))
+def violin_figure(
+    df: pl.DataFrame, categorical_feature: str, numerical_feature: str
+) -> go.Figure | None:
+    """Builds the violin plot, or None if fewer than two valid points remain."""
+    result = grouped_values(df, categorical_feature, numerical_feature)
+    if result is None:
+        return None
+    x_data, y_data = result
+
+    # ✅ Create Resampler Figure
+    fig = FigureResampler(go.Figure())
+
+    # ✅ Add violin plot trace
+    fig.add_trace(
+        go.Violin(
+            x=x_data,
+            y=y_data,
+            box_visible=True,
+            meanline_visible=True,
+            points="all",
+            name=f"{numerical_feature} by {categorical_feature}",
+        )
+    )
+
+    fig.update_layout(
+        title=f"Violin Plot: {numerical_feature} by {categorical_feature} (Resampled)",
+        xaxis_title=categorical_feature,
+        yaxis_title=numerical_feature,
+        template="plotly_white",
+    )
+    return fig
 
 
 def register_violin_plot_callbacks(app) -> None:
@@ -22,77 +77,34 @@ def register_violin_plot_callbacks(app) -> None:
         if not file_uploaded:
             return _log_and_return_empty("⚠️ No dataset uploaded. Clearing Violin plot.")
 
-        df: pl.DataFrame = Store.get_static("data_frame")
-        if df is None:
+        dataset = current_dataset()
+        if dataset is None:
             return _log_and_return_empty("❌ Dataset not found in memory.")
 
         if not categorical_feature or not numerical_feature:
             return _log_and_return_empty("⚠️ Missing feature selection for Violin plot.")
 
-        if categorical_feature not in df.columns or numerical_feature not in df.columns:
+        if (
+            categorical_feature not in dataset.columns
+            or numerical_feature not in dataset.columns
+        ):
             return _log_and_return_empty(
                 f"❌ Selected features {categorical_feature} or {numerical_feature} not found in dataset."
             )
 
-        # ✅ Handle duplicate column names by renaming the numerical column
-        if categorical_feature == numerical_feature:
-            numerical_feature_alias = f"{numerical_feature}_value"
-            df = df.with_columns(df[numerical_feature].alias(numerical_feature_alias))
-            numerical_feature = numerical_feature_alias  # Use new alias for processing
-
-        # ✅ Generate cache key using dataset shape (prevents unnecessary recomputation)
-        cache_key = f"violin_{categorical_feature}_{numerical_feature}"
-        cached_result = CACHE_MANAGER.load_cache(cache_key, df)
-        if cached_result:
-            x_data, y_data = cached_result
-        else:
-            try:
-                # ✅ Extract selected features and drop missing values
-                clean_df = df.select(
-                    [categorical_feature, numerical_feature]
-                ).drop_nulls()
-
-                # ✅ Ensure sufficient data points
-                if clean_df.height < 2:
-                    return _log_and_return_empty(
-                        "⚠️ Insufficient valid data points for Violin plot."
-                    )
-
-                x_data = clean_df[categorical_feature].to_numpy()
-                y_data = clean_df[numerical_feature].to_numpy()
-
-                # ✅ Store minimal data in cache
-                CACHE_MANAGER.save_cache(
-                    cache_key,
-                    df,
-                    (x_data, y_data),
-                )
-
-            except Exception as e:
-                logger.error(f"❌ Error generating Violin plot: {e}")
-                return go.Figure()
-
-        # ✅ Create Resampler Figure
-        fig = FigureResampler(go.Figure())
-
-        # ✅ Add violin plot trace
-        fig.add_trace(
-            go.Violin(
-                x=x_data,
-                y=y_data,
-                box_visible=True,
-                meanline_visible=True,
-                points="all",
-                name=f"{numerical_feature} by {categorical_feature}",
+        try:
+            fig = violin_figure(
+                dataset.frame([categorical_feature, numerical_feature]),
+                categorical_feature,
+                numerical_feature,
+            )
+        except Exception as e:
+            logger.error(f"❌ Error generating Violin plot: {e}")
+            return go.Figure()
+        if fig is None:
+            return _log_and_return_empty(
+                "⚠️ Insufficient valid data points for Violin plot."
             )
-        )
-
-        fig.update_layout(
-            title=f"Violin Plot: {numerical_feature} by {categorical_feature} (Resampled)",
-            xaxis_title=categorical_feature,
-            yaxis_title=numerical_feature,
-            template="plotly_white",
-        )
 
         logger.info("✅ Successfully generated resampled Violin plot.")
         return fig
@@ -1,8 +1,32 @@
-import polars as pl
 from dash import Input, Output
 
+from utils.dataset import Dataset, current_dataset
+from utils.dtypes import is_categorical, is_numeric
 from utils.logger_config import logger  # Import logger
-from utils.store import Store
+
+
+def visualization_columns(dataset: Dataset) -> tuple[list[str], list[str]]:
+    """Returns the numerical and categorical columns offered in the Visualization tab."""
+    numeric_columns = [
+        col for col, dtype in dataset.schema.items() if is_numeric(dtype)
+    ]
+    categorical_columns = [
+        col for col, dtype in dataset.schema.items() if is_categorical(dtype)
+    ]
+    return numeric_columns, categorical_columns
+
+
+def default_visualization_selections(dataset: Dataset) -> dict:
+    """Default dropdown values of the Visualization tab."""
+    numeric_columns, categorical_columns = visualization_columns(dataset)
+    return {
+        "x": numeric_columns[1] if numeric_columns else None,
+        "y": numeric_columns[2] if len(numeric_columns) > 2 else None,
+        "pairplot": numeric_columns[1:3] if len(numeric_columns) > 2 else [],
+        "parallel": numeric_columns[1:3] if len(numeric_columns) > 2 else [],
+        "categorical": categorical_columns[0] if categorical_columns else None,
+        "numeric_violin": numeric_columns[1] if numeric_columns else None,
+    }
 
 
 def register_visualization_selector_callbacks(app) -> None:
@@ -31,9 +55,9 @@ def register_visualization_selector_callbacks(app) -> None:
             logger.warning("⚠️ No dataset uploaded. Clearing dropdowns.")
             return ([], None, [], None, [], [], [], None, [], [], [], None)
 
-        df: pl.DataFrame = Store.get_static("data_frame")
+        dataset = current_dataset()
 
-        if df is None:
+        if dataset is None:
             logger.error("❌ Dataset not found in memory despite file upload.")
             return ([], None, [], None, [], [], [], None, [], [], [], None)
 
@@ -43,43 +67,29 @@ def register_visualization_selector_callbacks(app) -> None:
                 return [{"label": col, "value": col} for col in columns]
 
             # Extract numerical and categorical features
-            numeric_columns = [
-                col
-                for col, dtype in df.schema.items()
-                if dtype in [pl.Float64, pl.Float32, pl.Int64, pl.Int32]
-            ]
-            categorical_columns = [
-                col for col, dtype in df.schema.items() if dtype == pl.Utf8
-            ]
+            numeric_columns, categorical_columns = visualization_columns(dataset)
 
             numeric_options = get_dropdown_options(numeric_columns)
             categorical_options = get_dropdown_options(categorical_columns)
 
             # Set default values
-            default_x = numeric_columns[1] if numeric_columns else None
-            default_y = numeric_columns[2] if len(numeric_columns) > 2 else None
-            default_pairplot = numeric_columns[1:3] if len(numeric_columns) > 2 else []
-            default_parallel = numeric_columns[1:3] if len(numeric_columns) > 2 else []
-            default_categorical = (
-                categorical_columns[0] if categorical_columns else None
-            )
-            default_numeric_violin = numeric_columns[1] if numeric_columns else None
+            defaults = default_visualization_selections(dataset)
 
             logger.info("✅ Dropdowns successfully updated with dataset features.")
 
             return (
                 numeric_options,
-                default_x,
+                defaults["x"],
                 numeric_options,
-                default_y,
+                defaults["y"],
                 numeric_options,
-                default_pairplot,
+                defaults["pairplot"],
                 categorical_options,
-                default_categorical,
+                defaults["categorical"],
                 numeric_options,
-                default_parallel,
+                defaults["parallel"],
                 numeric_options,
-                default_numeric_violin,
+                defaults["numeric_violin"],
             )
 
         except Exception as e:
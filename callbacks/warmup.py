@@ -0,0 +1,122 @@
+from callbacks.overviews.data_summary_callback import (
+    summarize_columns,
+    summarize_missing_values,
+)
+from callbacks.overviews.duplicate_rows_callbacks import find_duplicate_rows
+from callbacks.overviews.head_table_callback import head_rows
+from callbacks.statistics.correlation_heatmap_callbacks import correlation_figure
+from callbacks.statistics.feature_distribution_callbacks import distribution_stats
+from callbacks.statistics.outlier_detection_callbacks import find_outliers
+from callbacks.statistics.statistic_table_callback import describe_dataset
+from callbacks.statistics.statistics_selector_callbacks import (
+    default_statistics_column,
+    statistics_columns,
+)
+from callbacks.visualizations.bar_plot_callbacks import bar_figure
+from callbacks.visualizations.pca_projection_callbacks import contour_density
+from callbacks.visualizations.violin_plot_callbacks import violin_figure
+from callbacks.visualizations.visualization_selector_callbacks import (
+    default_visualization_selections,
+)
+from utils import streaming
+from utils.dataset import Dataset
+from utils.dtypes import is_numeric
+from utils.helpers import select_columns
+from utils.warmup import WARMUP_SCHEDULER
+
+DEFAULT_CORRELATION_METHOD = "pearson"  # Initial value of correlation-method-dropdown
+DEFAULT_OUTLIER_ALGORITHM = "zscore"  # Initial value of outlier-algo-dropdown
+MIN_PAIRED_COLUMNS = 2  # Correlations and pair plots need two numerical columns
+
+
+def schedule_warmup(dataset: Dataset) -> None:
+    """
+    Precomputes what each page requests for its default selections.
+
+    Arguments mirror the callbacks exactly, so that the entries land under the
+    keys the first page visit looks up. Lazy datasets only warm the
+    column-scoped defaults, since the overview would load every column.
+    """
+    tasks = []
+    if not dataset.lazy:
+        df = dataset.frame()
+        tasks += [
+            ("head_rows", lambda: head_rows(df)),
+            ("summarize_columns", lambda: summarize_columns(df)),
+            ("summarize_missing_values", lambda: summarize_missing_values(df)),
+            ("find_duplicate_rows", lambda: find_duplicate_rows(df)),
+            ("describe_dataset", lambda: describe_dataset(df)),
+        ]
+
+    numeric_columns = statistics_columns(dataset)
+    if len(numeric_columns) >= MIN_PAIRED_COLUMNS and not dataset.lazy:
+        tasks.append(
+            (
+                "correlation_figure",
+                lambda: correlation_figure(
+                    dataset.frame(numeric_columns),
+                    numeric_columns,
+                    DEFAULT_CORRELATION_METHOD,
+                ),
+            )
+        )
+    column = default_statistics_column(numeric_columns)
+    if column:
+        tasks.append(
+            (
+                "distribution_stats",
+                lambda: distribution_stats(dataset.frame([column]), column),
+            )
+        )
+        tasks.append(
+            (
+                "find_outliers",
+                lambda: find_outliers(
+                    dataset.frame([column]), column, DEFAULT_OUTLIER_ALGORITHM
+                ),
+            )
+        )
+
+    defaults = default_visualization_selections(dataset)
+    x, y = defaults["x"], defaults["y"]
+    if x and y:
+        # Also warms the x/y pair shared with the scatter plot
+        tasks.append(
+            ("contour_density", lambda: contour_density(dataset.frame([x, y]), x, y))
+        )
+    categorical, numeric = defaults["categorical"], defaults["numeric_violin"]
+    if categorical:
+        if dataset.streaming:  # The bar plot counts every row, not the sample
+            tasks.append(
+                (
+                    "category_counts",
+                    lambda: streaming.category_counts(dataset, categorical),
+                )
+            )
+        else:
+            tasks.append(
+                (
+                    "bar_figure",
+                    lambda: bar_figure(dataset.frame([categorical]), categorical),
+                )
+            )
+        if numeric:
+            tasks.append(
+                (
+                    "violin_figure",
+                    lambda: violin_figure(
+                        dataset.frame([categorical, numeric]), categorical, numeric
+                    ),
+                )
+            )
+    # Pair and parallel plots only keep numerical columns of their selection
+    features = [col for col in defaults["pairplot"] if is_numeric(dataset.schema[col])]
+    if len(features) >= MIN_PAIRED_COLUMNS:
+        tasks.append(
+            (
+                "select_columns",
+                lambda: select_columns(dataset.frame(features), features),
+            )
+        )
+
+    WARMUP_SCHEDULER.schedule(dataset, tasks)
@@ -1,6 +1,8 @@
 import dash_bootstrap_components as dbc
 from dash import dcc, html
 
+from utils.catalog import DATA_ROOT
+
 
 def upload_component() -> "html.Div":
     """File upload component with reset confirmation."""
@@ -8,7 +10,13 @@ def upload_component() -> "html.Div":
         [
             # Hidden store to track upload status
             dcc.Store(id="file-upload-status", data=False),
-            dcc.Upload(
+            # Filled by assets/chunked_upload.js once the file is on the server
+            dcc.Store(id="uploaded-file", data=None),
+            # Polls a progressive ingest until the full file replaced its first rows
+            dcc.Interval(id="ingest-poll", interval=1000, disabled=True),
+            # Upload waiting for its columns to be chosen, see WIDE_FILE_COLUMNS
+            dcc.Store(id="pending-upload", data=None),
+            html.Div(
                 id="file-upload",
                 children=html.Div(
                     ["📂 Drag and Drop or ", html.A("Select a File")],
@@ -27,11 +35,50 @@ def upload_component() -> "html.Div":
                     "backgroundColor": "#f8f9fa",
                     "color": "#007bff",
                 },
-                multiple=False,
+            ),
+            # Files under DATA_ROOT, opened in place instead of uploaded
+            dcc.Dropdown(
+                id="catalog-picker",
+                placeholder="Or open a file on the server",
+                style={} if DATA_ROOT else {"display": "none"},
             ),
             html.Div(
                 id="file-info", style={"marginTop": "10px", "textAlign": "center"}
             ),
+            # Shown for wide files, to load only the chosen columns
+            html.Div(
+                id="column-chooser",
+                children=[
+                    dcc.Dropdown(
+                        id="column-select",
+                        multi=True,
+                        placeholder="Column groups or columns to load",
+                    ),
+                    dbc.Input(
+                        id="column-patterns",
+                        placeholder="Or patterns, e.g. price_* sensor_1?",
+                        className="mt-2",
+                        debounce=True,
+                    ),
+                    html.Div(id="column-count", className="mt-2 text-muted"),
+                    dbc.Button(
+                        "Load columns",
+                        id="load-columns",
+                        color="primary",
+                        className="mt-2",
+                        disabled=True,
+                    ),
+                ],
+                style={"display": "none"},
+                className="mt-2",
+            ),
+            # Datasets uploaded earlier in this session, to switch without re-uploading
+            dcc.Dropdown(
+                id="dataset-picker",
+                placeholder="Switch dataset",
+                clearable=False,
+                className="mt-2",
+            ),
             # html.Div(id="upload-status", style={"display": "none"}),
             dbc.Button(
                 "Clear",
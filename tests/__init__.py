@@ -0,0 +1,6 @@
+import os
+import tempfile
+
+# The cache lives under the working directory; keep test runs out of the repo
+os.environ.setdefault("ENABLE_CACHE", "true")
+os.chdir(tempfile.mkdtemp(prefix="eda-tests-"))
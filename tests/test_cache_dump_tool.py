@@ -0,0 +1,54 @@
+import io
+import json
+import tarfile
+import tempfile
+import unittest
+import uuid
+from contextlib import redirect_stdout
+from pathlib import Path
+
+from cache_dump_tool import BUNDLE_MANIFEST, add_bytes, import_cache
+from utils.cache_manager import CACHE_MANAGER
+
+
+class TestImportCache(unittest.TestCase):
+    def setUp(self) -> None:
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.bundle_path = Path(directory.name) / "bundle.tar"
+        self.namespace = uuid.uuid4().hex
+        self.addCleanup(CACHE_MANAGER.backend.delete, self.namespace, "good")
+
+    def write_bundle(self, payloads: dict[str, bytes]) -> None:
+        with tarfile.open(self.bundle_path, "w") as bundle:
+            manifest = []
+            for key, payload in payloads.items():
+                member = f"entries/{key}.bin"
+                add_bytes(bundle, member, payload)
+                manifest.append(
+                    {
+                        "namespace": self.namespace,
+                        "key": key,
+                        "payload": member,
+                        "blobs": [],
+                        "compute_seconds": 0.0,
+                    }
+                )
+            lines = "".join(json.dumps(item) + "\n" for item in manifest)
+            add_bytes(bundle, BUNDLE_MANIFEST, lines.encode())
+
+    def test_corrupt_entry_does_not_abort_the_import(self) -> None:
+        good = CACHE_MANAGER.serializer.dumps(self.namespace, "good", {"value": 1})
+        self.write_bundle({"corrupt": b"not a payload", "good": good})
+        output = io.StringIO()
+        with redirect_stdout(output):
+            import_cache(str(self.bundle_path))
+
+        backend = CACHE_MANAGER.backend
+        self.assertIsNone(backend.get(self.namespace, "corrupt"))
+        self.assertEqual(backend.get(self.namespace, "good"), good)
+        self.assertIn("1 entries (0 skipped, 1 failed)", output.getvalue())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+import time
+import unittest
+from unittest import mock
+
+import polars as pl
+
+from utils.cache_manager import CACHE_MANAGER, CacheManager
+
+
+class TestHashColumn(unittest.TestCase):
+    def test_categoricals_hash_by_label(self) -> None:
+        # Both columns have the physical codes 0, 1, 0
+        sex = pl.Series("sex", ["female", "male", "female"], dtype=pl.Categorical)
+        smoker = pl.Series("smoker", ["no", "yes", "no"], dtype=pl.Categorical)
+        self.assertNotEqual(
+            CacheManager.hash_column(sex), CacheManager.hash_column(smoker)
+        )
+
+    def test_categorical_fingerprints_differ(self) -> None:
+        left = pl.DataFrame({"c": pl.Series(["a", "b", "a"], dtype=pl.Categorical)})
+        right = pl.DataFrame({"c": pl.Series(["x", "y", "x"], dtype=pl.Categorical)})
+        self.assertNotEqual(
+            CacheManager.compute_file_hash(left), CacheManager.compute_file_hash(right)
+        )
+
+    def test_same_labels_hash_alike(self) -> None:
+        values = ["a", "b", None, "a"]
+        self.assertEqual(
+            CacheManager.hash_column(pl.Series("x", values, dtype=pl.Categorical)),
+            CacheManager.hash_column(pl.Series("y", values, dtype=pl.Categorical)),
+        )
+
+
+class TestHitRecording(unittest.TestCase):
+    def test_memory_hits_refresh_access_time(self) -> None:
+        CACHE_MANAGER.save_cache("key", "namespace", {"value": 1})
+        CACHE_MANAGER.backend.connection().execute(
+            "UPDATE entries SET accessed_at = 0 WHERE namespace = 'namespace'"
+        )
+        before = time.time()
+        self.assertEqual(CACHE_MANAGER.load_cache("key", "namespace"), {"value": 1})
+        CACHE_MANAGER.flush_hits()
+
+        (entry,) = CACHE_MANAGER.backend.iter_entries("namespace")
+        self.assertEqual(entry.hits, 1)
+        self.assertGreaterEqual(entry.accessed_at, before)
+
+
+class TestGetOrCompute(unittest.TestCase):
+    def test_new_leader_uses_result_stored_before_it_took_over(self) -> None:
+        compute = mock.Mock(return_value={"value": 2})
+        # Missed before taking over; the previous leader had stored it since
+        with mock.patch.object(
+            CACHE_MANAGER, "load_cache", side_effect=[None, {"value": 1}]
+        ):
+            result = CACHE_MANAGER.get_or_compute("key", "leader", compute)
+        self.assertEqual(result, {"value": 1})
+        compute.assert_not_called()
+
+
+class TestCompaction(unittest.TestCase):
+    def test_writes_do_not_compact(self) -> None:
+        backend = CACHE_MANAGER.backend
+        with mock.patch.object(backend, "maybe_compact") as compact:
+            for i in range(1000):
+                backend.put("compaction", str(i), b"x")
+                self.addCleanup(backend.delete, "compaction", str(i))
+        compact.assert_not_called()
+
+    def test_janitor_pass_compacts(self) -> None:
+        with mock.patch.object(CACHE_MANAGER.backend, "maybe_compact") as compact:
+            CACHE_MANAGER.maintain()
+        compact.assert_called_once()
+
+
+if __name__ == "__main__":
+    unittest.main()
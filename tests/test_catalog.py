@@ -0,0 +1,45 @@
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import polars as pl
+
+from utils import catalog
+from utils.dataset import catalog_entries, open_catalog_entry
+
+
+class TestPartitionEntries(unittest.TestCase):
+    def setUp(self) -> None:
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        root = Path(directory.name)
+        for year in (2023, 2024):
+            (root / "sales" / f"year={year}").mkdir(parents=True)
+        frame = pl.DataFrame({"id": [1, 2], "amount": [10.0, 20.0]})
+        frame.write_parquet(root / "sales" / "year=2023" / "part-0.parquet")
+        # Reading this partition fails, so opening 2023 shows it was pruned
+        (root / "sales" / "year=2024" / "part-0.parquet").write_bytes(b"not parquet")
+        patcher = mock.patch.object(catalog, "DATA_ROOT", directory.name)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_partitions_are_listed(self) -> None:
+        self.assertEqual(
+            catalog_entries(), ["sales/", "sales/year=2023/", "sales/year=2024/"]
+        )
+
+    def test_partition_entry_prunes_other_partitions(self) -> None:
+        dataset = open_catalog_entry("sales/year=2023/")
+        frame = dataset.frame()
+        self.assertEqual(frame["year"].to_list(), [2023, 2023])
+        self.assertEqual(frame["amount"].to_list(), [10.0, 20.0])
+
+    def test_split_partitions(self) -> None:
+        root, filters = catalog.split_partitions(Path("sales/year=2024/month=1"))
+        self.assertEqual(root, Path("sales"))
+        self.assertEqual(filters, {"year": "2024", "month": "1"})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,48 @@
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from utils.dataset_archive import DatasetArchive
+
+FINGERPRINT = "f" * 16
+SESSION = "c" * 32
+
+
+class TestDatasetArchive(unittest.TestCase):
+    def setUp(self) -> None:
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.archive = DatasetArchive(Path(directory.name))
+        self.archive.save(FINGERPRINT, None, {"catalog": "x.csv"})
+
+    def test_saving_a_session_keeps_unlisted_data(self) -> None:
+        self.archive.save_session(SESSION, {"active": None, "datasets": []})
+        self.assertTrue(self.archive.has(FINGERPRINT))
+
+    def test_remove_idle_drops_unlisted_data(self) -> None:
+        record = {"active": FINGERPRINT, "datasets": [[FINGERPRINT, "x.csv"]]}
+        self.archive.save_session(SESSION, record)
+        self.archive.remove_idle(3600)
+        self.assertTrue(self.archive.has(FINGERPRINT))
+
+        self.archive.save_session(SESSION, {"active": None, "datasets": []})
+        self.archive.remove_idle(3600)
+        self.assertFalse(self.archive.has(FINGERPRINT))
+
+    def test_temp_files_renamed_while_collecting_are_skipped(self) -> None:
+        (self.archive.root / "x.tmp").touch()
+        stat = Path.stat
+
+        def renamed(path: Path, **kwargs: object) -> object:
+            if path.suffix == ".tmp":  # Renamed by a writer after the listing
+                raise FileNotFoundError(path)
+            return stat(path, **kwargs)
+
+        with mock.patch.object(Path, "stat", renamed):
+            self.archive.remove_idle(3600)  # Does not raise
+        self.assertFalse(self.archive.has(FINGERPRINT))  # Collected all the same
+
+
+if __name__ == "__main__":
+    unittest.main()
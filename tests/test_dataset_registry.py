@@ -0,0 +1,85 @@
+import shutil
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import polars as pl
+
+from utils import dataset as dataset_module
+from utils.dataset import Dataset, DatasetRegistry
+
+SESSION = "b" * 32
+
+
+class TestDatasetRegistry(unittest.TestCase):
+    def setUp(self) -> None:
+        self.registry = DatasetRegistry()
+        self.dataset = Dataset.from_frame(pl.DataFrame({"x": [1, 2, 3]}))
+        fingerprint = self.dataset.fingerprint
+        self.registry.sessions[SESSION] = {
+            "version": 1,
+            "active": fingerprint,
+            "datasets": [[fingerprint, "x.csv"]],
+        }
+
+    def test_restores_outside_the_lock(self) -> None:
+        acquired = []
+
+        def lock_elsewhere() -> None:
+            # As a request of another session would while this one restores
+            if self.registry.lock.acquire(timeout=1):
+                self.registry.lock.release()
+                acquired.append(True)
+
+        def restore(fingerprint: str) -> Dataset:
+            other = threading.Thread(target=lock_elsewhere)
+            other.start()
+            other.join()
+            return self.dataset
+
+        with mock.patch.object(dataset_module, "_restore_archived", restore):
+            dataset, filename = self.registry.active(SESSION)
+        self.assertIs(dataset, self.dataset)
+        self.assertEqual(filename, "x.csv")
+        self.assertEqual(acquired, [True])
+
+    def test_active_does_not_enforce_the_budget(self) -> None:
+        self.registry.datasets[self.dataset.fingerprint] = self.dataset
+        with mock.patch.object(self.registry, "enforce_budget") as enforce:
+            self.registry.active(SESSION)
+        enforce.assert_not_called()
+
+
+class TestLazyIngest(unittest.TestCase):
+    def setUp(self) -> None:
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = Path(directory.name)
+        pl.DataFrame({f"c{i}": [i, i + 1, i + 2] for i in range(5)}).write_csv(
+            self.directory / "wide.csv"
+        )
+        patcher = mock.patch.object(dataset_module, "INGEST_MODE", "lazy")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def read(self, columns: list[str]) -> Dataset:
+        # read_dataset owns the file it reads, as it would an upload
+        path = self.directory / f"{'-'.join(columns)}.csv"
+        shutil.copy(self.directory / "wide.csv", path)
+        return dataset_module.read_dataset(path, "csv", columns)
+
+    def test_column_selection_is_part_of_the_fingerprint(self) -> None:
+        first, second = self.read(["c1", "c2"]), self.read(["c3", "c4"])
+        self.assertNotEqual(first.fingerprint, second.fingerprint)
+
+        registry = DatasetRegistry()
+        registry.publish(SESSION, first, "wide.csv")
+        registry.publish(SESSION, second, "wide.csv")
+        published, _ = registry.active(SESSION)
+        self.assertEqual(published.frame().columns, ["c3", "c4"])
+
+
+if __name__ == "__main__":
+    unittest.main()
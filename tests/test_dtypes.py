@@ -0,0 +1,24 @@
+import unittest
+
+import polars as pl
+
+from utils.dtypes import downcast_dtype
+
+
+class TestDowncastDtype(unittest.TestCase):
+    def test_floats_that_lose_precision_stay_float64(self) -> None:
+        for value in (123456789.01, 1700000000.123, 0.1):
+            series = pl.Series("x", [value, 1.0])
+            self.assertIsNone(downcast_dtype(series), value)
+
+    def test_floats_held_exactly_become_float32(self) -> None:
+        series = pl.Series("x", [0.5, -2.25, 1024.0, None, float("inf")])
+        self.assertEqual(downcast_dtype(series), pl.Float32)
+
+    def test_integers_move_to_the_narrowest_type(self) -> None:
+        self.assertEqual(downcast_dtype(pl.Series("x", [-100, 100])), pl.Int8)
+        self.assertEqual(downcast_dtype(pl.Series("x", [0, 40_000])), pl.Int32)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,48 @@
+import fcntl
+import tempfile
+import unittest
+from pathlib import Path
+
+from utils.shared_store import SharedStore
+
+FINGERPRINT = "e" * 16
+SESSION = "d" * 32
+
+
+class TestSharedStore(unittest.TestCase):
+    def setUp(self) -> None:
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.store = SharedStore(Path(directory.name))
+
+    def lock_is_free(self) -> bool:
+        with self.store.lock_path.open("a+b") as f:
+            try:
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                return False
+            fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            return True
+
+    def test_data_is_written_outside_the_lock(self) -> None:
+        free_while_writing = []
+
+        def write(path: Path) -> None:
+            free_while_writing.append(self.lock_is_free())
+            path.write_bytes(b"data")
+
+        def change(record: dict) -> None:
+            record["datasets"] = [[FINGERPRINT, "x.csv"]]
+            record["active"] = FINGERPRINT
+
+        self.store.root.mkdir(parents=True, exist_ok=True)
+        self.store.lock_path.touch()
+        record = self.store.update_session(SESSION, change, (FINGERPRINT, write, {}))
+        self.assertEqual(free_while_writing, [True])
+        self.assertEqual(record["active"], FINGERPRINT)
+        self.assertEqual(self.store.data_path(FINGERPRINT).read_bytes(), b"data")
+        self.assertEqual(self.store.read_meta(FINGERPRINT), {})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+import tempfile
+import unittest
+import uuid
+from pathlib import Path
+from unittest import mock
+
+import polars as pl
+
+from utils import streaming
+from utils.dataset import Dataset
+
+
+class TestStreamingSummaries(unittest.TestCase):
+    def setUp(self) -> None:
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = Path(directory.name) / "data.parquet"
+        rows = 20_000
+        pl.DataFrame(
+            {
+                "key": [f"id-{i:05d}" for i in range(rows)],
+                "color": ["red", "green", "red", None] * (rows // 4),
+            }
+        ).write_parquet(path)
+        # A fingerprint of its own, so results cached by other tests are not read
+        self.dataset = Dataset(pl.scan_parquet(path), uuid.uuid4().hex, streaming=True)
+        patcher = mock.patch.object(streaming, "VALUE_COUNTS_MAX", 100)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_high_cardinality_columns_are_estimated_not_counted(self) -> None:
+        with mock.patch.object(
+            streaming, "_counts_query", wraps=streaming._counts_query
+        ) as counts_query:
+            rows = {
+                row["Column"]: row for row in streaming.column_summaries(self.dataset)
+            }
+        self.assertEqual([c.args[1] for c in counts_query.call_args_list], ["color"])
+
+        key = rows["key"]
+        self.assertAlmostEqual(key["Unique Values"], 20_000, delta=20_000 * 0.03)
+        self.assertEqual((key["Most Frequent Value"], key["Entropy"]), ("-", "-"))
+        color = rows["color"]
+        self.assertEqual(color["Unique Values"], 3)  # Missing values count as one
+        self.assertEqual(color["Most Frequent Value"], "red")
+        self.assertIsNone(streaming.category_counts(self.dataset, "key"))
+
+    def test_describe_takes_string_extremes_from_aggregates(self) -> None:
+        stats = streaming.describe(self.dataset)
+        extremes = stats.filter(pl.col("statistic").is_in(["min", "max"]))
+        self.assertEqual(extremes["key"].to_list(), ["id-00000", "id-19999"])
+        self.assertEqual(extremes["color"].to_list(), ["green", "red"])
+
+
+class TestEstimateUnique(unittest.TestCase):
+    def test_small_counts_are_exact(self) -> None:
+        for values in ([], ["a"], ["a", "b", "a", None]):
+            df = pl.DataFrame({"x": pl.Series(values, dtype=pl.String)})
+            dataset = Dataset(df.lazy(), uuid.uuid4().hex, streaming=True)
+            sketch = streaming._sketch_query(dataset, "x").collect()
+            self.assertEqual(
+                streaming._estimate_unique(sketch), len(set(values)), values
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
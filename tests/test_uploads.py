@@ -0,0 +1,139 @@
+import gzip
+import os
+import tempfile
+import time
+import unittest
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from unittest import mock
+
+import flask
+
+from utils import uploads
+from utils.shared_store import SharedStore
+
+
+class TestDecompressUpload(unittest.TestCase):
+    def setUp(self) -> None:
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        patcher = mock.patch.object(uploads, "UPLOAD_DIR", Path(directory.name))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.upload_id = uuid.uuid4().hex
+        self.path = uploads.upload_path(self.upload_id)
+
+    def test_inflates_in_place(self) -> None:
+        self.path.write_bytes(gzip.compress(b"a,b\n1,2\n"))
+        name, codec = uploads.decompress_upload(self.upload_id, "data.csv.gz")
+        self.assertEqual((name, codec), ("data.csv", "gzip"))
+        self.assertEqual(self.path.read_bytes(), b"a,b\n1,2\n")
+
+    def test_rejects_output_over_the_upload_cap(self) -> None:
+        self.path.write_bytes(gzip.compress(bytes(3 * uploads.COPY_BLOCK_BYTES)))
+        with mock.patch.object(uploads, "UPLOAD_MAX_BYTES", uploads.COPY_BLOCK_BYTES):
+            with self.assertRaises(ValueError):
+                uploads.decompress_upload(self.upload_id, "bomb.csv.gz")
+        self.assertFalse(self.path.with_suffix(".inflate").exists())
+
+
+class SlowRequest:
+    """The current request, with a body that arrives slowly."""
+
+    def __getattr__(self, name: str) -> object:
+        """Everything but the body comes from the real request."""
+        return getattr(flask.request, name)
+
+    @property
+    def stream(self) -> "SlowRequest":
+        return self
+
+    def read(self, size: int = -1) -> bytes:
+        time.sleep(0.05)  # Lets retried slices overlap
+        return flask.request.stream.read(size)
+
+
+class TestUploadChunk(unittest.TestCase):
+    def setUp(self) -> None:
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        patcher = mock.patch.object(uploads, "UPLOAD_DIR", Path(directory.name))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        server = flask.Flask("test")
+        uploads.register_upload_routes(server)
+        self.server = server
+
+    def test_retried_slice_lands_once(self) -> None:
+        upload_id = self.server.test_client().post("/upload").get_json()["upload_id"]
+        body = bytes(1024)
+
+        def send(_: int) -> int:
+            client = self.server.test_client()
+            return client.put(f"/upload/{upload_id}?offset=0", data=body).status_code
+
+        with mock.patch.object(uploads, "request", SlowRequest()):
+            with ThreadPoolExecutor(4) as pool:
+                statuses = list(pool.map(send, range(4)))
+        self.assertEqual(statuses.count(200), 1)
+        self.assertEqual(uploads.upload_path(upload_id).stat().st_size, len(body))
+
+
+class TestRemoveStaleUploads(unittest.TestCase):
+    def setUp(self) -> None:
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        root = Path(directory.name)
+        for name, value in [
+            ("UPLOAD_DIR", root),
+            ("CLAIM_DIR", root / "datasets"),
+            ("SHARED_STORE", SharedStore(root / "shared")),
+            ("DATASET_ARCHIVE", None),
+            ("_claim_dirs", {}),
+        ]:
+            patcher = mock.patch.object(uploads, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.addCleanup(self.release_claim_dirs)
+
+    def release_claim_dirs(self) -> None:
+        for _, lock in uploads._claim_dirs.values():
+            lock.close()
+
+    def age(self, path: Path) -> None:
+        stale = path.stat().st_mtime - uploads.UPLOAD_STALE_SECONDS - 1
+        os.utime(path, (stale, stale))
+
+    def test_claims_of_a_live_process_are_kept(self) -> None:
+        upload_id = uuid.uuid4().hex
+        uploads.upload_path(upload_id).touch()
+        claimed = uploads.claim_upload(upload_id)
+        self.age(claimed.parent.with_suffix(".lock"))
+        uploads._remove_stale_uploads()
+        self.assertTrue(claimed.exists())
+
+    def test_claims_of_an_exited_process_are_removed(self) -> None:
+        directory = uploads.CLAIM_DIR / uuid.uuid4().hex
+        directory.mkdir(parents=True)
+        lock_path = directory.with_suffix(".lock")
+        lock_path.touch()  # Unlocked: its process is gone
+        self.age(lock_path)
+        (directory / "upload.data").write_bytes(b"data")
+        link = directory / f"{'a' * 16}-ipc.source"
+        link.write_bytes(b"data")
+        store = uploads.SHARED_STORE
+        store.root.mkdir()
+        (store.root / f"{'a' * 16}.json").write_bytes(b"{}")
+
+        uploads._remove_stale_uploads()
+        self.assertEqual(list(directory.iterdir()), [link])  # The store refers to it
+
+        (store.root / f"{'a' * 16}.json").unlink()
+        uploads._remove_stale_uploads()
+        self.assertFalse(directory.exists())
+        self.assertFalse(lock_path.exists())
+
+
+if __name__ == "__main__":
+    unittest.main()
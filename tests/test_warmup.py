@@ -0,0 +1,78 @@
+import os
+import sys
+import threading
+import unittest
+import uuid
+from concurrent.futures import wait
+from unittest import mock
+
+import flask
+import polars as pl
+
+from callbacks.warmup import schedule_warmup
+from utils.cache_manager import CACHE_MANAGER
+from utils.dataset import Dataset, DatasetRegistry, publish_dataset
+from utils.sessions import SESSION_COOKIE
+from utils.store import Store
+from utils.warmup import WARMUP_NICENESS, WARMUP_SCHEDULER, _lower_thread_priority
+
+SESSION = "a" * 32
+
+
+class TestWarmup(unittest.TestCase):
+    def setUp(self) -> None:
+        store = Store()
+        if "datasets" not in store.state:
+            store.register("datasets", DatasetRegistry())
+        CACHE_MANAGER.clear_cache()
+
+    def test_scheduled_warmup_fills_the_cache(self) -> None:
+        df = pl.DataFrame(
+            {
+                "id": range(1, 101),
+                "x": [float(i % 7) for i in range(100)],
+                "y": [float(i % 5) for i in range(100)],
+                "group": ["a", "b", "c", "d"] * 25,
+            }
+        )
+        server = flask.Flask("test")
+        cookie = {"Cookie": f"{SESSION_COOKIE}={SESSION}"}
+        with server.test_request_context(headers=cookie):
+            dataset = publish_dataset(df, "test.csv")
+            schedule_warmup(dataset)
+        wait(WARMUP_SCHEDULER.pending[SESSION])
+
+        entries = list(CACHE_MANAGER.backend.iter_entries())
+        self.assertGreater(len(entries), 0)
+
+    def test_streaming_datasets_warm_the_streamed_counts(self) -> None:
+        df = pl.DataFrame(
+            {"id": [1, 2, 3], "x": [1.0, 2.0, 3.0], "group": ["a", "b", "a"]}
+        )
+        dataset = Dataset(df.lazy(), uuid.uuid4().hex, streaming=True)
+        with mock.patch.object(WARMUP_SCHEDULER, "schedule") as schedule:
+            schedule_warmup(dataset)
+        names = [name for name, _ in schedule.call_args.args[1]]
+        self.assertIn("category_counts", names)
+        self.assertNotIn("bar_figure", names)
+
+
+class TestThreadPriority(unittest.TestCase):
+    @unittest.skipUnless(sys.platform == "linux", "per-thread priorities")
+    def test_niceness_is_added_to_the_current_value(self) -> None:
+        niceness = []
+
+        def lower() -> None:
+            thread = threading.get_native_id()
+            os.setpriority(os.PRIO_PROCESS, thread, 1)
+            _lower_thread_priority()
+            niceness.append(os.getpriority(os.PRIO_PROCESS, thread))
+
+        pool_thread = threading.Thread(target=lower)
+        pool_thread.start()
+        pool_thread.join()
+        self.assertEqual(niceness, [1 + WARMUP_NICENESS])
+
+
+if __name__ == "__main__":
+    unittest.main()
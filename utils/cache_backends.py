@@ -0,0 +1,251 @@
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections.abc import Iterator
+from pathlib import Path
+from typing import NamedTuple
+
+from utils.logger_config import logger
+
+
+class CacheEntryInfo(NamedTuple):
+    """Metadata of a stored entry, without its payload."""
+
+    namespace: str
+    key: str
+    size: int  # Bytes on disk, including sidecar files
+    created_at: float
+    accessed_at: float = 0.0
+    compute_seconds: float = 0.0  # Time it took to produce the payload
+    hits: int = 0  # Reads served from any tier, as last flushed
+
+
+class CacheBackend(ABC):
+    """
+    Key/value store for serialized cache payloads, grouped by namespace.
+
+    The namespace is the dataset fingerprint or column scope hash the entry
+    was computed from; keys are the analysis cache keys.
+    """
+
+    @abstractmethod
+    def get(self, namespace: str, key: str) -> bytes | None:
+        """Returns the stored payload, or None on a miss."""
+
+    @abstractmethod
+    def put(
+        self,
+        namespace: str,
+        key: str,
+        value: bytes,
+        size: int | None = None,
+        compute_seconds: float = 0.0,
+    ) -> None:
+        """Stores or replaces a payload; ``size`` defaults to ``len(value)``."""
+
+    @abstractmethod
+    def delete(self, namespace: str, key: str) -> None:
+        """Removes a single entry if present."""
+
+    def touch(self, namespace: str, key: str) -> None:
+        """Records a read, for least-recently-used eviction; a no-op by default."""
+        return
+
+    def record_hits(
+        self,
+        counts: dict[tuple[str, str], int],
+        read_at: dict[tuple[str, str], float],
+    ) -> None:
+        """
+        Adds batched hit counts and last read times; a no-op by default.
+
+        Both are keyed by ``(namespace, key)``.
+        """
+        return
+
+    @abstractmethod
+    def iter_entries(self, namespace: str | None = None) -> Iterator[CacheEntryInfo]:
+        """Yields entry metadata, optionally restricted to one namespace."""
+
+    @abstractmethod
+    def clear(self) -> None:
+        """Removes every entry."""
+
+    def compact(self) -> None:
+        """Reclaims space left behind by deleted or replaced entries, if needed."""
+        return
+
+    def maybe_compact(self) -> None:
+        """Compacts only when enough space would be reclaimed."""
+        self.compact()
+
+    def close(self) -> None:
+        """Releases any open handles; a no-op by default."""
+        return
+
+
+class SQLiteBackend(CacheBackend):
+    """
+    Single-file embedded store on stdlib ``sqlite3`` in WAL mode.
+
+    Lookups and writes are single indexed statements. Space freed by
+    overwrites is reclaimed by an occasional ``VACUUM`` once fragmentation
+    crosses ``COMPACT_FREE_RATIO``, checked by the cache's janitor passes.
+    """
+
+    FILENAME = "cache.sqlite3"
+    COMPACT_FREE_RATIO = 0.25  # Free pages / total pages that triggers VACUUM
+    TOUCH_RESOLUTION = 60.0  # Seconds; skips the write for entries read recently
+
+    def __init__(self, cache_dir: Path):
+        self.path = cache_dir / self.FILENAME
+        self.local = threading.local()
+        conn = self.connection()
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS entries (
+                namespace TEXT NOT NULL,
+                key TEXT NOT NULL,
+                value BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL DEFAULT 0,
+                compute_seconds REAL NOT NULL DEFAULT 0,
+                hits INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (namespace, key)
+            )
+            """
+        )
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(entries)")}
+        if "accessed_at" not in columns:  # Databases created before eviction
+            conn.execute(
+                "ALTER TABLE entries ADD COLUMN accessed_at REAL NOT NULL DEFAULT 0"
+            )
+            conn.execute("UPDATE entries SET accessed_at = created_at")
+        if "compute_seconds" not in columns:
+            conn.execute(
+                "ALTER TABLE entries ADD COLUMN compute_seconds REAL NOT NULL DEFAULT 0"
+            )
+        if "hits" not in columns:
+            conn.execute(
+                "ALTER TABLE entries ADD COLUMN hits INTEGER NOT NULL DEFAULT 0"
+            )
+
+    def connection(self) -> sqlite3.Connection:
+        """Returns this thread's connection, reopening it after a fork."""
+        conn = getattr(self.local, "conn", None)
+        if conn is None or self.local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self.local.conn = conn
+            self.local.pid = os.getpid()
+        return conn
+
+    def get(self, namespace: str, key: str) -> bytes | None:
+        row = (
+            self.connection()
+            .execute(
+                "SELECT value FROM entries WHERE namespace = ? AND key = ?",
+                (namespace, key),
+            )
+            .fetchone()
+        )
+        return row[0] if row else None
+
+    def put(
+        self,
+        namespace: str,
+        key: str,
+        value: bytes,
+        size: int | None = None,
+        compute_seconds: float = 0.0,
+    ) -> None:
+        size = len(value) if size is None else size
+        now = time.time()
+        self.connection().execute(
+            "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?, 0)",
+            (namespace, key, value, size, now, now, compute_seconds),
+        )
+
+    def delete(self, namespace: str, key: str) -> None:
+        self.connection().execute(
+            "DELETE FROM entries WHERE namespace = ? AND key = ?", (namespace, key)
+        )
+
+    def touch(self, namespace: str, key: str) -> None:
+        now = time.time()
+        self.connection().execute(
+            "UPDATE entries SET accessed_at = ? "
+            "WHERE namespace = ? AND key = ? AND accessed_at < ?",
+            (now, namespace, key, now - self.TOUCH_RESOLUTION),
+        )
+
+    def record_hits(
+        self,
+        counts: dict[tuple[str, str], int],
+        read_at: dict[tuple[str, str], float],
+    ) -> None:
+        self.connection().executemany(
+            "UPDATE entries SET hits = hits + ?, accessed_at = MAX(accessed_at, ?) "
+            "WHERE namespace = ? AND key = ?",
+            [
+                (hits, read_at[namespace, key], namespace, key)
+                for (namespace, key), hits in counts.items()
+            ],
+        )
+
+    def iter_entries(self, namespace: str | None = None) -> Iterator[CacheEntryInfo]:
+        query = (
+            "SELECT namespace, key, size, created_at, accessed_at, compute_seconds, "
+            "hits FROM entries"
+        )
+        params: tuple[str, ...] = ()
+        if namespace is not None:
+            query += " WHERE namespace = ?"
+            params = (namespace,)
+        for row in self.connection().execute(query, params):
+            yield CacheEntryInfo(*row)
+
+    def clear(self) -> None:
+        self.connection().execute("DELETE FROM entries")
+        self.compact()
+
+    def maybe_compact(self) -> None:
+        """Runs ``compact`` only when enough of the file is free pages."""
+        conn = self.connection()
+        free_pages = conn.execute("PRAGMA freelist_count").fetchone()[0]
+        total_pages = conn.execute("PRAGMA page_count").fetchone()[0]
+        if total_pages and free_pages / total_pages >= self.COMPACT_FREE_RATIO:
+            self.compact()
+
+    def compact(self) -> None:
+        conn = self.connection()
+        try:
+            conn.execute("VACUUM")
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")  # VACUUM goes to the WAL
+            logger.info(f"🧹 Compacted cache database {self.path.name}")
+        except sqlite3.OperationalError as e:
+            logger.warning(f"⚠️ Cache compaction skipped: {e}")
+
+    def close(self) -> None:
+        conn = getattr(self.local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self.local.conn = None
+
+
+CACHE_BACKENDS: dict[str, type[CacheBackend]] = {
+    "sqlite": SQLiteBackend,
+}
+
+
+def create_backend(name: str, cache_dir: Path) -> CacheBackend:
+    """Instantiates a registered backend by name."""
+    if name not in CACHE_BACKENDS:
+        raise ValueError(
+            f"Unknown cache backend '{name}'. Available: {', '.join(CACHE_BACKENDS)}"
+        )
+    return CACHE_BACKENDS[name](cache_dir)
@@ -0,0 +1,55 @@
+import os
+import threading
+from collections.abc import Callable
+
+from utils.logger_config import logger
+
+
+class CacheJanitor:
+    """
+    Daemon thread that periodically runs a garbage collection pass.
+
+    The cache uses one to enforce its disk budget, the dataset registry one
+    to clear the archive of idle sessions and the data they listed. Started
+    lazily from the worker process that writes to the store, so that
+    gunicorn workers forked after import each get their own thread.
+    """
+
+    def __init__(
+        self, collect: Callable[[], object], interval: float, name: str = "cache"
+    ):
+        self.collect = collect
+        self.interval = interval
+        self.name = name
+        self.pid: int | None = None
+        self.stop_event = threading.Event()
+        self.lock = threading.Lock()
+
+    def ensure_started(self) -> None:
+        """Starts the thread once per process; a no-op when the interval is 0."""
+        if self.interval <= 0 or self.pid == os.getpid():
+            return
+        with self.lock:
+            if self.pid == os.getpid():
+                return
+            self.pid = os.getpid()
+            self.stop_event.clear()
+            threading.Thread(
+                target=self.run, name=f"{self.name}-janitor", daemon=True
+            ).start()
+            logger.info(
+                f"🧹 {self.name.capitalize()} janitor started (every {self.interval}s)"
+            )
+
+    def run(self) -> None:
+        while not self.stop_event.wait(self.interval):
+            try:
+                self.collect()
+            except Exception as e:
+                logger.error(
+                    f"❌ {self.name.capitalize()} garbage collection failed: {e}"
+                )
+
+    def stop(self) -> None:
+        """Signals the thread to exit after its current pass."""
+        self.stop_event.set()
@@ -1,23 +1,39 @@
-import io
+import atexit
 import os
 import threading
+import time
+from collections import Counter
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import AbstractContextManager
 from pathlib import Path
 from typing import Any
 
-import joblib
+import numpy as np
 import polars as pl
 import xxhash
 
+from utils.cache_backends import create_backend
+from utils.cache_janitor import CacheJanitor
+from utils.cache_serializers import PayloadSerializer
+from utils.file_utils import file_lock
 from utils.logger_config import logger  # Import logger
+from utils.memory_cache import MemoryCache
+
+FINGERPRINT_CHUNK_ROWS = int(os.environ.get("FINGERPRINT_CHUNK_ROWS", "1_000_000"))
+FINGERPRINT_WORKERS = int(os.environ.get("FINGERPRINT_WORKERS", os.cpu_count() or 1))
+LOCK_STRIPES = 64  # Lock files shared by all entries, instead of one file per entry
 
 
 class CacheManager:
-    """Handles in-memory and file-based caching with file chunking for large datasets."""
+    """Handles two-tier caching: an in-memory LRU in front of a pluggable disk backend."""
 
     CACHE_DIR = Path("./.cache")  # Persistent cache directory
-    MEMORY_CACHE: dict[str | Path, Any] = {}  # In-memory cache
-    # MAX_FILE_SIZE = 100 * 1024 * 1024  # 100MB per cache file
-    MAX_FILE_SIZE = 8 * 1024
+    CACHE_BACKEND = os.environ.get("CACHE_BACKEND", "sqlite")
+    MEMORY_BUDGET = int(os.environ.get("CACHE_MEMORY_MB", "256")) * 1024 * 1024
+    DISK_BUDGET = int(os.environ.get("CACHE_DISK_MB", "1024")) * 1024 * 1024
+    TTL_SECONDS = int(os.environ.get("CACHE_TTL_SECONDS", "0"))  # 0 keeps entries
+    GC_INTERVAL = int(os.environ.get("CACHE_GC_INTERVAL_SECONDS", "300"))
 
     ENABLE_CACHE = os.environ.get("ENABLE_CACHE", "false").lower() == "true"
     ENABLE_SAMPLE = os.environ.get("ENABLE_SAMPLE", "false").lower() == "true"
@@ -26,202 +42,366 @@ class CacheManager:
         """Initialize cache manager and ensure cache directory exists."""
         self.CACHE_DIR.mkdir(exist_ok=True)
         logger.info(f"✅ CacheManager initialized. Cache Enabled: {self.ENABLE_CACHE}")
-        self.lock = threading.Lock()
+        self.backend = create_backend(self.CACHE_BACKEND, self.CACHE_DIR)
+        self.serializer = PayloadSerializer(self.CACHE_DIR / "blobs")
+        self.memory = MemoryCache(self.MEMORY_BUDGET)  # LRU tier in front of disk
+        self.lock_dir = self.CACHE_DIR / "locks"
+        self.janitor = CacheJanitor(self.maintain, self.GC_INTERVAL)
+        self.pending_hits: Counter[tuple[str, str]] = Counter()
+        self.pending_reads: dict[tuple[str, str], float] = {}  # Last hit times
+        self.pending_hits_lock = threading.Lock()
+        atexit.register(self.flush_hits)
+        self.in_flight: dict[tuple[str, str], Future] = {}
+        self.in_flight_lock = threading.Lock()
+
+    def entry_lock(
+        self, file_hash: str, cache_key: str
+    ) -> AbstractContextManager[None]:
+        """Exclusive lock serializing writers of one entry across gunicorn workers."""
+        stripe = xxhash.xxh64(f"{file_hash}\x1f{cache_key}".encode()).intdigest()
+        return file_lock(self.lock_dir / f"{stripe % LOCK_STRIPES}.lock")
+
+    @staticmethod
+    def hash_column(series: pl.Series, chunk_rows: int = FINGERPRINT_CHUNK_ROWS) -> str:
+        """
+        Hashes a single column's buffers chunk by chunk with xxHash.
+
+        The name is left out, so the digest addresses the column's content: the
+        same values under the same dtype hash alike in any dataset. Categorical
+        columns are hashed by their labels, since codes depend on the order
+        values were first seen.
+        """
+        hasher = xxhash.xxh64()
+        hasher.update(f"{series.dtype}\x1f{series.len()}".encode())
+
+        # Fixed-size row slices keep the digest independent of the physical chunk layout
+        for offset in range(0, series.len(), chunk_rows):
+            chunk = series.slice(offset, chunk_rows)
+            if isinstance(chunk.dtype, pl.Categorical | pl.Enum):
+                chunk = chunk.cast(pl.String)  # Hash labels, not physical codes
+            if chunk.dtype.is_numeric() and chunk.null_count() == 0:
+                buffer = chunk.to_numpy()  # Zero-copy view of the values buffer
+            else:
+                buffer = chunk.hash(seed=0).to_numpy()  # Strings, nulls, nested types
+            hasher.update(np.ascontiguousarray(buffer).data)
+
+        return hasher.hexdigest()
+
+    @staticmethod
+    def compute_column_hashes(
+        df: pl.DataFrame, sample_size: int = 100
+    ) -> dict[str, str]:
+        """Hashes every column of a DataFrame in parallel, keyed by column name."""
+        df_sample = df
+        if CacheManager.ENABLE_SAMPLE and df.height > sample_size * 3:
+            # Sample rows: Get first, middle, and last parts
+            df_sample = pl.concat(
+                [
+                    df.head(sample_size),
+                    df.slice(df.height // 2, sample_size),
+                    df.tail(sample_size),
+                ]
+            )
+
+        with ThreadPoolExecutor(max_workers=FINGERPRINT_WORKERS) as pool:
+            digests = pool.map(CacheManager.hash_column, df_sample.get_columns())
+            return dict(zip(df_sample.columns, digests, strict=True))
 
     @staticmethod
-    def compute_file_hash(df: pl.DataFrame, sample_size: int = 100) -> str:
-        """Generates a fast hash for a DataFrame using sampling and xxHash."""
-        df_clone = df.clone()
-        if df_clone.is_empty():
+    def compute_file_hash(
+        df: pl.DataFrame, column_hashes: dict[str, str] | None = None
+    ) -> str:
+        """
+        Generates a dataset fingerprint from the per-column hashes.
+
+        Meant to run once per ingest or cleaning step; the result is kept on the
+        published ``Dataset`` and passed to the cache.
+        """
+        if df.is_empty():
             return xxhash.xxh64().hexdigest()  # Empty DataFrame hash
 
+        if column_hashes is None:
+            column_hashes = CacheManager.compute_column_hashes(df)
+
         hasher = xxhash.xxh64()
-        if not CACHE_MANAGER.ENABLE_SAMPLE:
-            df_sample = df_clone.clone()
-        else:
-            # Sample rows: Get first, middle, and last parts (or full DataFrame if small)
-            num_rows = df.height
-            if num_rows <= sample_size * 3:
-                df_sample = df_clone.clone()
-            else:
-                df_sample = pl.concat(
-                    [
-                        df_clone.head(sample_size),
-                        df_clone.slice(num_rows // 2, sample_size),
-                        df_clone.tail(sample_size),
-                    ]
-                )
-
-        # Sample columns: Hash only a subset of columns (if many exist)
-        # num_cols = df_sample.width
-        # selected_cols = df_sample.columns[
-        #     : min(10, num_cols)
-        # ]  # Use first 10 cols (or all if less)
-        # df_sample = df_sample.select(selected_cols)
-
-        # Convert DataFrame to bytes and hash it
-        df_bytes = df_sample.write_csv().encode("utf-8")
-        hasher.update(df_bytes)
+        hasher.update(f"{df.height}\x1f{df.width}".encode())
+        for col in df.columns:
+            hasher.update(f"{col}\x1f{column_hashes[col]}\x1e".encode())
 
         return hasher.hexdigest()
 
-    def get_cache_index_file(self, df: pl.DataFrame) -> Path:
-        """Returns the index file path based on the dataset hash."""
-        file_hash = self.compute_file_hash(df)
-        return self.CACHE_DIR / f"{file_hash}_index.pkl"
+    @staticmethod
+    def hash_file(path: Path, block_bytes: int = 8 * 1024 * 1024) -> str:
+        """Fingerprints a source file by its bytes, for datasets not yet loaded."""
+        hasher = xxhash.xxh64()
+        with path.open("rb") as f:
+            while block := f.read(block_bytes):
+                hasher.update(block)
+        return hasher.hexdigest()
 
-    def get_cache_data_file(self, df: pl.DataFrame, part_number: int) -> Path:
-        """Returns the cache data file path based on dataset hash and part number."""
-        file_hash = self.compute_file_hash(df)
-        return self.CACHE_DIR / f"{file_hash}_data_{part_number}.pkl"
+    @staticmethod
+    def scope_hash(
+        column_hashes: dict[str, str] | None, columns: list[str]
+    ) -> str | None:
+        """
+        Derives a cache namespace from the hashes of the columns an analysis reads.
+
+        Entries keyed this way survive cleaning ops on any other column.
+        """
+        if not column_hashes or any(col not in column_hashes for col in columns):
+            return None
 
-    def load_cache(self, cache_key: str, df: pl.DataFrame) -> Any:
-        """Loads cached results from memory or disk if available."""
+        hasher = xxhash.xxh64()
+        for col in sorted(set(columns)):
+            # Names are mixed in since analysis keys refer to columns by name
+            hasher.update(f"{col}\x1f{column_hashes[col]}\x1e".encode())
+        return hasher.hexdigest()
+
+    def load_cache(self, cache_key: str, file_hash: str | None) -> Any:
+        """
+        Loads cached results from memory or disk if available.
+
+        ``file_hash`` is either the dataset fingerprint or a ``scope_hash``.
+        """
         if not self.ENABLE_CACHE:
             logger.info(f"🔧 Cache disabled. Skipping load for {cache_key}.")
             return None
 
-        index_file = self.get_cache_index_file(df)
+        if file_hash is None:
+            return None  # No dataset fingerprint, nothing to look up
+
+        # ✅ Serve from the memory tier first
+        cached = self.memory.get((file_hash, cache_key))
+        if cached is not MemoryCache.MISSING:
+            logger.debug(f"⚡ Memory cache hit for {cache_key}")
+            self._count_hit(file_hash, cache_key)
+            return cached
+
+        data = self._read_backend(cache_key, file_hash)
+        if data is None:
+            return None  # Cache miss
+
+        logger.info(f"✅ Cache hit for {cache_key}")
+        self.backend.touch(file_hash, cache_key)
+        self._count_hit(file_hash, cache_key)
+        self.janitor.ensure_started()
+        # ✅ Promote to the memory tier for the next lookup
+        self.memory.put((file_hash, cache_key), data)
+        return data
+
+    def _read_backend(self, cache_key: str, file_hash: str) -> Any:
+        """Reads and decodes an entry of the disk tier; broken entries are dropped."""
+        try:
+            payload = self.backend.get(file_hash, cache_key)
+        except Exception as e:
+            logger.error(f"❌ Failed to read cache entry {cache_key}: {e}")
+            return None
+
+        if payload is None:
+            return None
 
-        # ✅ Load index file if exists
-        if index_file.exists():
-            try:
-                index_data = self.load_from_file(index_file)
-            except Exception as e:
-                logger.error(f"❌ Failed to read index file: {e}")
+        try:
+            return self.serializer.loads(payload)
+        except FileNotFoundError:
+            if self.backend.get(file_hash, cache_key) != payload:
+                # A concurrent writer replaced the entry between our read and the mmap
+                logger.debug(f"🔄 Cache entry {cache_key} replaced while loading")
                 return None
-        else:
-            return None  # No index means no cache
-
-        # ✅ Check if the cache key exists in any part file
-        if cache_key in index_data:
-            part_number = index_data[cache_key]
-            data_file = self.get_cache_data_file(df, part_number)
-
-            # ✅ Load the cached data from file
-            if data_file.exists():
-                try:
-                    file_cache = self.load_from_file(data_file)
-                    if cache_key in file_cache:
-                        logger.info(
-                            f"✅ Cache hit for {cache_key} (Part {part_number})"
-                        )
-                        return file_cache[cache_key]
-                except Exception as e:
-                    logger.error(f"❌ Cache file corrupted: {e}")
-
-        return None  # Cache miss
-
-    def save_cache(self, cache_key: str, df: pl.DataFrame, data: Any) -> None:
-        """Stores computed results in memory and file cache with file size management."""
+            logger.error(f"❌ Cache entry {cache_key} lost its blob files")
+            self._drop_entry(file_hash, cache_key, payload)
+            return None
+        except Exception as e:  # CorruptEntryError, unpickling errors
+            logger.error(f"❌ Cache entry {cache_key} corrupted: {e}")
+            self._drop_entry(file_hash, cache_key, payload)
+            return None
+
+    def save_cache(
+        self,
+        cache_key: str,
+        file_hash: str | None,
+        data: Any,
+        compute_seconds: float = 0.0,
+    ) -> None:
+        """Stores computed results in the memory tier and the disk backend."""
         if not self.ENABLE_CACHE:
             logger.info(f"🔧 Cache disabled. Skipping save for {cache_key}.")
             return
-        with self.lock:
-            index_file = self.get_cache_index_file(df)
-            index_data = {}
-
-            # ✅ Load index file if it exists
-            if index_file.exists():
-                try:
-                    index_data = self.load_from_file(index_file)
-                except Exception as e:
-                    logger.error(f"❌ Failed to read index file: {e}")
-                    index_data = {}
-
-            # ✅ Remove old cache entry if it exists
-            if cache_key in index_data:
-                old_part_number = index_data[cache_key]
-                old_data_file = self.get_cache_data_file(df, old_part_number)
-
-                if old_data_file.exists():
-                    try:
-                        old_cache = self.load_from_file(old_data_file)
-
-                        # Remove the old key from the cache
-                        if cache_key in old_cache:
-                            del old_cache[cache_key]
-
-                        self.dump_to_file(old_data_file, old_cache)
-
-                        logger.info(
-                            f"🗑️ Removed old cache entry for {cache_key} from Part {old_part_number}"
-                        )
-
-                    except Exception as e:
-                        logger.error(f"❌ Error removing old cache entry: {e}")
-
-            # ✅ Find the latest part number
-            part_number = max(index_data.values(), default=1)
-            data_file = self.get_cache_data_file(df, part_number)
-
-            # ✅ Load or create cache part file
-            if data_file.exists():
-                try:
-                    # with data_file.open("rb") as f:
-                    #     file_cache = pickle.load(f)
-                    file_cache = self.load_from_file(data_file)
-                except Exception as e:
-                    logger.error(f"❌ Failed to read existing cache file: {e}")
-                    file_cache = {}
-            else:
-                file_cache = {}
-
-            # ✅ Check if removing the old key made enough space
-            # estimated_size = pickle.dumps({cache_key: data})
-            buffer = io.BytesIO()
-            joblib.dump({cache_key: data}, buffer, compress=0)
-            estimated_size = len(buffer.getvalue())
-
-            available_part = None
-            for part_number in sorted(
-                set(index_data.values())
-            ):  # Search existing parts
-                data_file = self.get_cache_data_file(df, part_number)
-                if not data_file.exists():
-                    continue  # Skip non-existent files
-
-                try:
-                    file_cache = self.load_from_file(data_file)
-                    current_size = data_file.stat().st_size
-
-                    if current_size + estimated_size <= self.MAX_FILE_SIZE:
-                        available_part = part_number
-                        break  # ✅ Found a part that fits, stop searching
-                except Exception as e:
-                    logger.error(f"❌ Error reading cache part {part_number}: {e}")
-
-            if available_part is None:
-                available_part = max(
-                    index_data.values(), default=1
-                )  # Allocate next part
-                data_file = self.get_cache_data_file(df, available_part)
-                file_cache = {}  # Start a fresh cache
-
-            else:
-                data_file = self.get_cache_data_file(df, available_part)
-                file_cache = (
-                    self.load_from_file(data_file) if data_file.exists() else {}
-                )
+        if file_hash is None:
+            return
 
-            # ✅ Store cache data
+        try:
+            with self.entry_lock(file_hash, cache_key):
+                previous = self.backend.get(file_hash, cache_key)
+                payload = self.serializer.dumps(file_hash, cache_key, data)
+                size = len(payload) + self.serializer.blob_size(payload)
+                self.backend.put(file_hash, cache_key, payload, size, compute_seconds)
+                if previous is not None:
+                    self.serializer.discard_blobs(previous)
+        except Exception as e:
+            logger.error(f"❌ Failed to store cache entry {cache_key}: {e}")
+            return
 
-            # ✅ Store in Memory and File
-            file_cache[cache_key] = data
-            self.MEMORY_CACHE[data_file] = (
-                file_cache  # Store in-memory for quick access
+        self.memory.put((file_hash, cache_key), data)
+        logger.info(f"💾 Cache stored for {cache_key} ({size} bytes)")
+        self.janitor.ensure_started()
+
+    def _count_hit(self, file_hash: str, cache_key: str) -> None:
+        with self.pending_hits_lock:
+            self.pending_hits[(file_hash, cache_key)] += 1
+            self.pending_reads[(file_hash, cache_key)] = time.time()
+
+    def flush_hits(self) -> None:
+        """
+        Writes the hits gathered since the last flush to the backend.
+
+        Hit times go with the counts, so entries served from the memory tier
+        stay recently used for eviction too.
+        """
+        with self.pending_hits_lock:
+            counts, self.pending_hits = self.pending_hits, Counter()
+            read_at, self.pending_reads = self.pending_reads, {}
+        if not counts:
+            return
+        try:
+            self.backend.record_hits(counts, read_at)
+        except Exception as e:
+            logger.error(f"❌ Failed to record cache hits: {e}")
+
+    def maintain(self) -> None:
+        """Periodic janitor pass: persists hit counts, then collects garbage."""
+        self.flush_hits()
+        self.collect_garbage()
+
+    def _drop_entry(self, file_hash: str, cache_key: str, payload: bytes) -> None:
+        """Deletes a corrupt entry unless another worker has already rewritten it."""
+        try:
+            with self.entry_lock(file_hash, cache_key):
+                if self.backend.get(file_hash, cache_key) == payload:
+                    self.backend.delete(file_hash, cache_key)
+                    self.serializer.remove(file_hash, cache_key)
+        except Exception as e:
+            logger.error(f"❌ Failed to drop cache entry {cache_key}: {e}")
+
+    def collect_garbage(
+        self, max_bytes: int | None = None, ttl_seconds: int | None = None
+    ) -> dict[str, int]:
+        """
+        Evicts expired entries, then least recently used ones until in budget.
+
+        Dataset fingerprints are ranked by their most recent read, so stale
+        datasets are dropped as a whole before entries of the active one.
+        A budget or TTL of 0 disables that policy. The backend is compacted
+        afterwards if enough of it is free space.
+        """
+        max_bytes = self.DISK_BUDGET if max_bytes is None else max_bytes
+        ttl_seconds = self.TTL_SECONDS if ttl_seconds is None else ttl_seconds
+
+        with file_lock(self.lock_dir / "gc.lock"):  # One worker collects at a time
+            entries = list(self.backend.iter_entries())
+            now = time.time()
+
+            victims, remaining = [], []
+            for e in entries:
+                expired = ttl_seconds and now - e.accessed_at > ttl_seconds
+                (victims if expired else remaining).append(e)
+            total_bytes = sum(e.size for e in remaining)
+
+            if max_bytes and total_bytes > max_bytes:
+                last_used: dict[str, float] = {}
+                for e in remaining:
+                    last_used[e.namespace] = max(
+                        last_used.get(e.namespace, 0), e.accessed_at
+                    )
+                remaining.sort(key=lambda e: (last_used[e.namespace], e.accessed_at))
+                for e in remaining:
+                    if total_bytes <= max_bytes:
+                        break
+                    victims.append(e)
+                    total_bytes -= e.size
+
+            for e in victims:
+                self._evict(e.namespace, e.key)
+            # Also reclaims space of overwritten entries, off the request threads
+            self.backend.maybe_compact()
+
+        freed_bytes = sum(e.size for e in victims)
+        if victims:
+            logger.info(
+                f"🧹 Cache GC evicted {len(victims)} entries "
+                f"({freed_bytes / 1024 / 1024:.1f} MB freed)"
             )
+        return {
+            "entries": len(entries) - len(victims),
+            "bytes": total_bytes,
+            "evicted": len(victims),
+            "freed_bytes": freed_bytes,
+        }
+
+    def _evict(self, file_hash: str, cache_key: str) -> None:
+        """Removes one entry from every tier."""
+        self.memory.discard((file_hash, cache_key))
+        try:
+            with self.entry_lock(file_hash, cache_key):
+                payload = self.backend.get(file_hash, cache_key)
+                if payload is None:
+                    return
+                self.backend.delete(file_hash, cache_key)
+                self.serializer.discard_blobs(payload)
+        except Exception as e:
+            logger.error(f"❌ Failed to evict cache entry {cache_key}: {e}")
+
+    def get_or_compute(
+        self, cache_key: str, file_hash: str | None, compute: Callable[[], Any]
+    ) -> Any:
+        """
+        Returns the cached result, or computes and stores it exactly once.
+
+        Concurrent misses on the same entry are coalesced: the first caller runs
+        ``compute`` and the others wait on its future instead of repeating the
+        work. Exceptions propagate to every waiter. ``None`` results are not
+        cached.
+        """
+        if file_hash is None:
+            return self._timed(cache_key, compute)[0]
+
+        cached = self.load_cache(cache_key, file_hash)
+        if cached is not None:
+            return cached
+
+        flight_key = (file_hash, cache_key)
+        with self.in_flight_lock:
+            future = self.in_flight.get(flight_key)
+            is_leader = future is None
+            if is_leader:
+                future = self.in_flight[flight_key] = Future()
+
+        if not is_leader:
+            logger.debug(f"⏳ Waiting on in-flight computation of {cache_key}")
+            return future.result()
+
+        try:
+            # A leader that released just before this one took over has stored it
+            result = self.load_cache(cache_key, file_hash)
+            if result is None:
+                result, elapsed = self._timed(cache_key, compute)
+                if result is not None:
+                    self.save_cache(cache_key, file_hash, result, elapsed)
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self.in_flight_lock:
+                del self.in_flight[flight_key]
 
-            # ✅ Save the data
-            self.dump_to_file(data_file, file_cache)
-
-            # ✅ Update the index
-            index_data[cache_key] = part_number
-            self.MEMORY_CACHE[index_file] = index_data  # Store index in-memory
-
-            self.dump_to_file(index_file, index_data)
-
-            logger.info(f"💾 Cache stored for {cache_key} in Part {part_number}")
+    @staticmethod
+    def _timed(cache_key: str, compute: Callable[[], Any]) -> tuple[Any, float]:
+        start = time.perf_counter()
+        result = compute()
+        elapsed = time.perf_counter() - start
+        logger.info(f"⏱️ Computed {cache_key} in {elapsed:.3f}s")
+        return result, elapsed
 
     def clear_cache(self) -> None:
         """Clears all cached data from memory and disk."""
@@ -229,19 +409,17 @@ class CacheManager:
             logger.info("🔧 Cache disabled. Skipping clear operation.")
             return
 
-        self.MEMORY_CACHE.clear()
-        for file in self.CACHE_DIR.glob("*.pkl"):
-            try:
-                file.unlink()
-            except Exception as e:
-                logger.error(f"❌ Failed to delete cache {file.name}: {e}")
+        self.memory.clear()
+        try:
+            self.backend.clear()
+            self.serializer.clear()
+        except Exception as e:
+            logger.error(f"❌ Failed to clear cache backend: {e}")
         logger.info("🗑️ Cache cleared!")
 
-    def load_from_file(self, path: str | Path):
-        return joblib.load(path)
-
-    def dump_to_file(self, path: str | Path, obj: Any):
-        return joblib.dump(obj, path, compress=0)
+    def memory_stats(self) -> dict[str, int]:
+        """Returns hit/miss/eviction counters of the memory tier."""
+        return self.memory.stats()
 
 
 # ✅ Singleton instance
@@ -0,0 +1,159 @@
+import itertools
+import os
+import pickle
+import uuid
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any, BinaryIO, NamedTuple
+
+import numpy as np
+import polars as pl
+import xxhash
+
+from utils.file_utils import atomic_write
+from utils.logger_config import logger
+
+# Arrays below this size are cheaper to pickle inline than to map from a file
+MIN_BLOB_BYTES = int(os.environ.get("CACHE_BLOB_MIN_KB", "64")) * 1024
+
+
+class ArrayRef(NamedTuple):
+    """Placeholder for a NumPy array stored as a memory-mapped ``.npy`` file."""
+
+    filename: str
+
+
+class TableRef(NamedTuple):
+    """Placeholder for a Polars DataFrame stored as an Arrow IPC file."""
+
+    filename: str
+
+
+class CorruptEntryError(ValueError):
+    """Raised when a stored payload fails its checksum."""
+
+
+class PayloadSerializer:
+    """
+    Serializes cache payloads, moving large arrays and tables out to sidecar files.
+
+    Top-level arrays/DataFrames and those inside (nested) tuples are written as
+    ``.npy`` or Arrow IPC files in ``blob_dir`` and loaded back memory-mapped,
+    so a cache hit does not copy them into RAM. Everything else, including the
+    tuple skeleton holding the file references, is pickled and prefixed with
+    its xxHash digest so that corrupt entries are detected instead of served.
+
+    Blob names carry a per-write token: a rewrite never touches the files an
+    older skeleton points to, so a lock-free reader cannot mix versions.
+    """
+
+    def __init__(self, blob_dir: Path):
+        self.blob_dir = blob_dir
+        self.blob_dir.mkdir(parents=True, exist_ok=True)
+
+    def blob_prefix(self, namespace: str, key: str) -> str:
+        """File prefix shared by every blob of one entry."""
+        return f"{namespace}_{xxhash.xxh64(key.encode()).hexdigest()}"
+
+    def dumps(self, namespace: str, key: str, data: Any) -> bytes:
+        """Writes sidecar blobs for ``data`` and returns the checksummed skeleton."""
+        counter = itertools.count()
+        prefix = f"{self.blob_prefix(namespace, key)}_{uuid.uuid4().hex[:12]}"
+        skeleton = self._externalize(data, prefix, counter)
+        body = pickle.dumps(skeleton, protocol=pickle.HIGHEST_PROTOCOL)
+        return xxhash.xxh64(body).digest() + body
+
+    def loads(self, payload: bytes) -> Any:
+        """
+        Restores a payload, memory-mapping any sidecar blobs.
+
+        Raises ``CorruptEntryError`` on a checksum mismatch and
+        ``FileNotFoundError`` if a blob was removed by a concurrent rewrite.
+        """
+        return self._internalize(self._skeleton(payload))
+
+    def blob_files(self, payload: bytes) -> list[str]:
+        """Lists the sidecar files referenced by a stored payload."""
+        refs: list[str] = []
+
+        def collect(obj: Any) -> None:
+            if isinstance(obj, ArrayRef | TableRef):
+                refs.append(obj.filename)
+            elif isinstance(obj, tuple) and not hasattr(obj, "_fields"):
+                for item in obj:
+                    collect(item)
+
+        collect(self._skeleton(payload))
+        return refs
+
+    def blob_size(self, payload: bytes) -> int:
+        """Returns the total size of the sidecar files of a payload."""
+        return sum(
+            (self.blob_dir / filename).stat().st_size
+            for filename in self.blob_files(payload)
+        )
+
+    def discard_blobs(self, payload: bytes) -> None:
+        """Deletes the sidecar files of a payload that is no longer referenced."""
+        try:
+            filenames = self.blob_files(payload)
+        except CorruptEntryError:
+            return  # Leftovers are picked up by garbage collection
+        for filename in filenames:
+            (self.blob_dir / filename).unlink(missing_ok=True)
+
+    def _skeleton(self, payload: bytes) -> Any:
+        digest, body = payload[:8], payload[8:]
+        if xxhash.xxh64(body).digest() != digest:
+            raise CorruptEntryError("checksum mismatch")
+        return pickle.loads(body)
+
+    def remove(self, namespace: str, key: str) -> None:
+        """Deletes the sidecar blobs of a single entry."""
+        for blob in self.blob_dir.glob(f"{self.blob_prefix(namespace, key)}_*"):
+            blob.unlink(missing_ok=True)
+
+    def clear(self) -> None:
+        """Deletes every sidecar blob."""
+        for blob in self.blob_dir.iterdir():
+            blob.unlink(missing_ok=True)
+
+    def _externalize(self, obj: Any, prefix: str, counter: itertools.count) -> Any:
+        if isinstance(obj, tuple) and not hasattr(obj, "_fields"):
+            return tuple(self._externalize(item, prefix, counter) for item in obj)
+
+        if (
+            isinstance(obj, np.ndarray)
+            and not obj.dtype.hasobject
+            and obj.nbytes >= MIN_BLOB_BYTES
+        ):
+            filename = f"{prefix}_{next(counter)}.npy"
+            self._write_blob(filename, lambda f: np.save(f, obj, allow_pickle=False))
+            return ArrayRef(filename)
+
+        if isinstance(obj, pl.DataFrame):
+            filename = f"{prefix}_{next(counter)}.arrow"
+            self._write_blob(
+                filename, lambda f: obj.write_ipc(f, compression="uncompressed")
+            )
+            return TableRef(filename)
+
+        return obj
+
+    def _internalize(self, obj: Any) -> Any:
+        if isinstance(obj, ArrayRef):
+            return np.load(self.blob_dir / obj.filename, mmap_mode="r")
+        if isinstance(obj, TableRef):
+            return pl.read_ipc(self.blob_dir / obj.filename, memory_map=True)
+        if isinstance(obj, tuple) and not hasattr(obj, "_fields"):
+            return tuple(self._internalize(item) for item in obj)
+        return obj
+
+    def _write_blob(
+        self, filename: str, writer: Callable[[BinaryIO], object]
+    ) -> None:
+        try:
+            atomic_write(self.blob_dir / filename, writer)
+        except Exception:
+            logger.error(f"❌ Failed to write cache blob {filename}")
+            raise
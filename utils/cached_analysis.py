@@ -0,0 +1,148 @@
+import functools
+import inspect
+import json
+import os
+import time
+from collections.abc import Callable
+from typing import Any
+
+import orjson
+import plotly.io as pio
+import polars as pl
+
+from utils.cache_manager import CACHE_MANAGER
+from utils.dataset import current_dataset
+
+ENABLE_FIGURE_CACHE = os.environ.get("ENABLE_FIGURE_CACHE", "true").lower() == "true"
+
+
+def analysis_key(name: str, params: dict[str, Any]) -> str:
+    """Builds a cache key from an analysis name and its JSON-encoded arguments."""
+    encoded = json.dumps(params, sort_keys=True, separators=(",", ":"), default=str)
+    return f"{name}:{encoded}"
+
+
+def cached_analysis(
+    name: str | None = None, columns: str | tuple[str, ...] | None = None
+) -> Callable:
+    """
+    Memoizes a pure ``func(df, *args)`` analysis through ``CACHE_MANAGER``.
+
+    Entries are namespaced on the hashes of the ``columns`` parameters, else
+    on the dataset fingerprint; frames not handed out by ``Dataset.frame``
+    are computed without caching.
+    """
+    column_params = (columns,) if isinstance(columns, str) else columns or ()
+
+    def decorator(func: Callable) -> Callable:
+        signature = inspect.signature(func)
+        key_name = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(df: pl.DataFrame, *args: Any, **kwargs: Any) -> Any:
+            bound = signature.bind(df, *args, **kwargs)
+            bound.apply_defaults()
+            params = dict(list(bound.arguments.items())[1:])  # Drop the frame
+            cache_key = analysis_key(key_name, params)
+            return CACHE_MANAGER.get_or_compute(
+                cache_key,
+                _namespace(df, params, column_params),
+                lambda: func(*bound.args, **bound.kwargs),
+            )
+
+        return wrapper
+
+    return decorator
+
+
+def cached_column_analysis(name: str | None = None) -> Callable:
+    """
+    Caches a ``func(df, columns) -> {column: result}`` analysis per column.
+
+    Results are keyed on column hashes, so must not depend on column names.
+    """
+
+    def decorator(func: Callable) -> Callable:
+        cache_key = analysis_key(name or func.__name__, {})
+
+        @functools.wraps(func)
+        def wrapper(
+            df: pl.DataFrame, columns: list[str] | None = None
+        ) -> dict[str, Any]:
+            columns = list(df.columns) if columns is None else columns
+            column_hashes = None
+            dataset = current_dataset()
+            if CACHE_MANAGER.ENABLE_CACHE and dataset and dataset.owns(df):
+                column_hashes = dataset.column_hashes
+
+            results: dict[str, Any] = {}
+            for col in columns if column_hashes is not None else ():
+                cached = CACHE_MANAGER.load_cache(cache_key, column_hashes.get(col))
+                if cached is not None:
+                    results[col] = cached
+
+            missing = [col for col in columns if col not in results]
+            if missing:
+                start = time.perf_counter()
+                computed = func(df, missing)
+                per_column = (time.perf_counter() - start) / len(missing)
+                for col in missing:
+                    results[col] = computed[col]
+                    if column_hashes is not None:
+                        CACHE_MANAGER.save_cache(
+                            cache_key, column_hashes.get(col), computed[col], per_column
+                        )
+
+            return {col: results[col] for col in columns}
+
+        return wrapper
+
+    return decorator
+
+
+def cached_figure(
+    name: str | None = None, columns: str | tuple[str, ...] | None = None
+) -> Callable:
+    """
+    Caches a ``func(df, *args)`` figure builder as Plotly JSON.
+
+    Hits return the figure as a dict; ``ENABLE_FIGURE_CACHE=false`` disables it.
+    """
+
+    def decorator(func: Callable) -> Callable:
+        @cached_analysis(name=f"figure:{name or func.__name__}", columns=columns)
+        @functools.wraps(func)
+        def render(df: pl.DataFrame, *args: Any, **kwargs: Any) -> bytes | None:
+            fig = func(df, *args, **kwargs)
+            if fig is None:
+                return None
+            return pio.to_json(fig, validate=False, engine="orjson").encode()
+
+        @functools.wraps(func)
+        def wrapper(df: pl.DataFrame, *args: Any, **kwargs: Any) -> Any:
+            if not ENABLE_FIGURE_CACHE:
+                return func(df, *args, **kwargs)
+            payload = render(df, *args, **kwargs)
+            return None if payload is None else orjson.loads(payload)
+
+        return wrapper
+
+    return decorator
+
+
+def _namespace(
+    df: pl.DataFrame, params: dict[str, Any], column_params: tuple[str, ...]
+) -> str | None:
+    dataset = current_dataset()
+    if dataset is None or not dataset.owns(df):
+        return None  # Fingerprints describe the published dataset only
+
+    if not column_params:
+        # Dataset-wide analyses must be given every column
+        return dataset.fingerprint if df.width == len(dataset.columns) else None
+
+    scope: list[str] = []
+    for param in column_params:
+        value = params[param]
+        scope.extend([value] if isinstance(value, str) else value)
+    return CACHE_MANAGER.scope_hash(dataset.column_hashes, scope)
@@ -0,0 +1,97 @@
+import os
+import re
+from collections.abc import Iterable
+from pathlib import Path
+
+import xxhash
+
+# Set to a directory on the server (e.g. a mounted volume) to open its files in place
+DATA_ROOT = os.environ.get("DATA_ROOT", "")
+CATALOG_MAX_ENTRIES = int(os.environ.get("CATALOG_MAX_ENTRIES", "500"))
+
+_PARTITION = re.compile(r"[^=]+=[^=]*")  # Hive-style directory, e.g. year=2024
+
+
+def list_entries(suffixes: Iterable[str]) -> list[str]:
+    """
+    Lists the datasets under ``DATA_ROOT`` as paths relative to it.
+
+    Entries are files with one of ``suffixes`` and hive-partitioned Parquet
+    directories (with ``key=value`` subdirectories), which are not descended
+    into; their first-level partitions are listed too, see ``split_partitions``.
+    Hidden files are skipped; at most ``CATALOG_MAX_ENTRIES`` are listed.
+    """
+    if not DATA_ROOT:
+        return []
+    root = Path(DATA_ROOT)
+    suffixes = {suffix.lower() for suffix in suffixes}
+    entries = []
+    for directory, subdirs, files in os.walk(root):
+        subdirs[:] = sorted(d for d in subdirs if not d.startswith("."))
+        here = Path(directory)
+        partitions = [d for d in subdirs if _PARTITION.fullmatch(d)]
+        if here != root and partitions:
+            relative = here.relative_to(root).as_posix()
+            entries.append(f"{relative}/")
+            entries.extend(f"{relative}/{d}/" for d in partitions)
+            subdirs.clear()  # Partitions are read through the directory
+            continue
+        entries.extend(
+            (here / name).relative_to(root).as_posix()
+            for name in sorted(files)
+            if not name.startswith(".") and Path(name).suffix.lower() in suffixes
+        )
+        if len(entries) >= CATALOG_MAX_ENTRIES:
+            break
+    return entries[:CATALOG_MAX_ENTRIES]
+
+
+def resolve_entry(entry: str) -> Path:
+    """
+    Returns the path of a catalog entry, refusing anything outside ``DATA_ROOT``.
+
+    Raises ``ValueError`` for such entries, or when no data root is configured.
+    """
+    if not DATA_ROOT:
+        raise ValueError("No data root is configured")
+    root = Path(DATA_ROOT).resolve()
+    path = (root / entry).resolve()
+    if path == root or not path.is_relative_to(root):
+        raise ValueError(f"Not in the data root: {entry}")
+    if not path.exists():
+        raise FileNotFoundError(f"No such file in the data root: {entry}")
+    return path
+
+
+def split_partitions(path: Path) -> tuple[Path, dict[str, str]]:
+    """
+    Splits a partition directory into its hive-partitioned root and filters.
+
+    ``sales/year=2024/month=1`` gives ``sales`` and ``{"year": "2024",
+    "month": "1"}``; a path outside any partition gives itself and no filters.
+    """
+    filters = {}
+    while _PARTITION.fullmatch(path.name):
+        key, value = path.name.split("=", 1)
+        filters = {key: value, **filters}
+        path = path.parent
+    return path, filters
+
+
+def fingerprint_entry(path: Path) -> str:
+    """
+    Fingerprints a file or directory by the names, sizes and mtimes of its files.
+
+    Only metadata is read, so opening a large dataset stays cheap; any file
+    rewritten since changes the fingerprint, and with it the cache namespace.
+    """
+    files = sorted(path.rglob("*")) if path.is_dir() else [path]
+    hasher = xxhash.xxh64()
+    for file in files:
+        if file.is_file():
+            stat = file.stat()
+            name = file.relative_to(path).as_posix() if path.is_dir() else file.name
+            hasher.update(
+                f"{name}\x1f{stat.st_size}\x1f{stat.st_mtime_ns}\x1e".encode()
+            )
+    return hasher.hexdigest()
@@ -0,0 +1,1032 @@
+import contextlib
+import functools
+import os
+import tempfile
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from collections.abc import Callable, Iterable
+from pathlib import Path
+
+import polars as pl
+import xxhash
+
+from utils.cache_janitor import CacheJanitor
+from utils.cache_manager import CACHE_MANAGER
+from utils.catalog import (
+    fingerprint_entry,
+    list_entries,
+    resolve_entry,
+    split_partitions,
+)
+from utils.dataset_archive import DATASET_ARCHIVE
+from utils.dtypes import DOWNCAST_DTYPES, downcast_frame
+from utils.file_utils import atomic_write
+from utils.logger_config import logger
+from utils.sessions import current_session
+from utils.shared_store import SHARED_STORE
+from utils.store import Store
+
+# "lazy" keeps uploads on disk and loads each column the first time it is used;
+# "progressive" publishes the first rows at once and parses the rest in the background
+INGEST_MODE = os.environ.get("INGEST_MODE", "eager").lower()
+PROGRESSIVE_ROWS = int(os.environ.get("PROGRESSIVE_ROWS", "10_000"))
+FRAME_MEMO_SIZE = 128  # Column selections whose frames are kept for identity checks
+
+# Memory the kernel cannot reclaim that datasets of all sessions may hold
+DATASET_MEMORY_BUDGET = int(os.environ.get("DATASET_MEMORY_MB", "2048")) * 1024 * 1024
+SPILL_DIR = Path(os.environ.get("SPILL_DIR", tempfile.gettempdir())) / "eda-spill"
+SESSION_MAX_DATASETS = int(os.environ.get("SESSION_MAX_DATASETS", "8"))
+SESSION_TTL_SECONDS = int(os.environ.get("SESSION_TTL_SECONDS", str(7 * 24 * 3600)))
+# How often idle sessions and unlisted datasets are removed from the archive
+ARCHIVE_GC_INTERVAL = int(os.environ.get("ARCHIVE_GC_INTERVAL_SECONDS", "300"))
+
+# Files larger than this stay on disk as Parquet and are profiled by streaming
+STREAMING_THRESHOLD = (
+    int(os.environ.get("STREAMING_THRESHOLD_MB", "4096")) * 1024 * 1024
+)
+STREAMING_SAMPLE_ROWS = int(os.environ.get("STREAMING_SAMPLE_ROWS", "1_000_000"))
+SAMPLE_BLOCKS = 100  # Evenly spaced row ranges a streaming sample is made of
+
+# Eager and lazy reader per format. Arrow IPC (and Feather v2, the same format)
+# is memory-mapped without rechunking, so columns are paged in as they are read.
+READERS: dict[str, tuple[Callable[..., pl.DataFrame], Callable[..., pl.LazyFrame]]] = {
+    "csv": (pl.read_csv, pl.scan_csv),
+    "parquet": (pl.read_parquet, pl.scan_parquet),
+    "ipc": (
+        functools.partial(pl.read_ipc, memory_map=True, rechunk=False),
+        functools.partial(pl.scan_ipc, memory_map=True),
+    ),
+}
+FILE_FORMATS = {
+    ".csv": "csv",
+    ".parquet": "parquet",
+    ".pq": "parquet",
+    ".arrow": "ipc",
+    ".ipc": "ipc",
+    ".feather": "ipc",
+}
+MAGIC_BYTES = {b"PAR1": "parquet", b"ARROW1": "ipc"}
+
+
+class Dataset:
+    """
+    The published data: a scan over its source plus the columns loaded so far.
+
+    Eager datasets are fully materialized when created. Lazy ones only know
+    their schema; ``frame`` collects the requested columns with projection
+    pushdown on first use and keeps them, so memory grows with the columns
+    actually explored. Column fingerprints are computed as columns load.
+
+    ``frame`` returns the same DataFrame object for the same selection, and
+    ``owns`` recognises those frames: cached analyses only key results on the
+    dataset's fingerprints for frames it handed out, never for derived ones.
+
+    With ``downcast``, lazily loaded columns are narrowed as they load and
+    ``schema`` is updated to match; ``raw_sizes`` keeps each column's size as
+    read. With ``add_id``, a 1-based ``id`` column is prepended to ``source``,
+    the scan as read. ``mapped`` frames are memory-mapped from a file, so the
+    kernel can reclaim their pages. ``catalog`` is the data root entry a
+    dataset scans in place, which stores refer to instead of copying it.
+
+    ``streaming`` datasets are larger than memory: ``frame`` returns a sample
+    of about ``STREAMING_SAMPLE_ROWS`` rows for plots, and exact summaries
+    run as streaming queries over ``source`` (see ``utils/streaming.py``).
+    Stores refer to their ``path`` (in ``file_format``) instead of copying it.
+    """
+
+    def __init__(
+        self,
+        scan: pl.LazyFrame,
+        fingerprint: str,
+        *,
+        frame: pl.DataFrame | None = None,
+        column_hashes: dict[str, str] | None = None,
+        downcast: bool = False,
+        raw_sizes: dict[str, int] | None = None,
+        add_id: bool = False,
+        mapped: bool = False,
+        catalog: str | None = None,
+        streaming: bool = False,
+        path: Path | None = None,
+        file_format: str | None = None,
+    ):
+        self.source = scan
+        self.add_id = add_id
+        self.scan = _with_row_id(scan) if add_id else scan
+        self.fingerprint = fingerprint
+        self.schema = frame.schema if frame is not None else self.scan.collect_schema()
+        self.columns = list(self.schema)
+        self.lazy = frame is None
+        self.series: dict[str, pl.Series] = {}
+        self.column_hashes: dict[str, str] = dict(column_hashes or {})
+        self.frames: OrderedDict[tuple[str, ...], pl.DataFrame] = OrderedDict()
+        self.lock = threading.Lock()
+        self.downcast = downcast
+        self.raw_sizes: dict[str, int] = dict(raw_sizes or {})
+        self.mapped = mapped
+        self.catalog = catalog
+        self.streaming = streaming
+        self.path = path
+        self.file_format = file_format
+        self._height = None
+
+        if frame is not None:
+            self.series = {series.name: series for series in frame.get_columns()}
+            self.frames[tuple(frame.columns)] = frame
+            for name, series in self.series.items():
+                self.raw_sizes.setdefault(name, series.estimated_size())
+            self._height = frame.height
+
+    @classmethod
+    def from_frame(
+        cls, df: pl.DataFrame, raw_sizes: dict[str, int] | None = None
+    ) -> "Dataset":
+        """
+        Wraps an in-memory DataFrame, hashing every column once.
+
+        ``raw_sizes`` are the column sizes as read, if ``df`` was downcast.
+        """
+        column_hashes = CACHE_MANAGER.compute_column_hashes(df)
+        fingerprint = CACHE_MANAGER.compute_file_hash(df, column_hashes)
+        return cls(
+            df.lazy(),
+            fingerprint,
+            frame=df,
+            column_hashes=column_hashes,
+            raw_sizes=raw_sizes,
+        )
+
+    @classmethod
+    def from_scan(
+        cls,
+        scan: pl.LazyFrame,
+        source: Path,
+        *,
+        downcast: bool = False,
+        add_id: bool = False,
+        streaming: bool = False,
+        file_format: str | None = None,
+    ) -> "Dataset":
+        """
+        Wraps a scan over ``source``, fingerprinted by the file's bytes.
+
+        The columns selected, ``downcast`` and ``add_id`` are part of the
+        fingerprint, since the same file read with other options is other data.
+        The source file is deleted once the dataset is garbage collected.
+        """
+        options = [
+            CACHE_MANAGER.hash_file(source),
+            str(list(scan.collect_schema())),
+            str(downcast),
+            str(add_id),
+        ]
+        dataset = cls(
+            scan,
+            xxhash.xxh64("\x1f".join(options).encode()).hexdigest(),
+            downcast=downcast,
+            add_id=add_id,
+            streaming=streaming,
+            path=source,
+            file_format=file_format,
+        )
+        weakref.finalize(dataset, source.unlink, missing_ok=True)
+        return dataset
+
+    @property
+    def height(self) -> int:
+        """Number of rows; counting them scans the source once for lazy datasets."""
+        if self._height is None:
+            self._height = self.source.select(pl.len()).collect().item()
+        return self._height
+
+    @property
+    def sample_height(self) -> int:
+        """Number of rows ``frame`` returns: all of them, unless ``streaming``."""
+        if not self.streaming:
+            return self.height
+        return sum(length for _, length in self._sample_blocks())
+
+    @property
+    def shape(self) -> tuple[int, int]:
+        return self.height, len(self.columns)
+
+    @property
+    def memory_bytes(self) -> int:
+        """Estimated size of the columns held in memory."""
+        return sum(series.estimated_size() for series in list(self.series.values()))
+
+    @property
+    def raw_bytes(self) -> int:
+        """Size the loaded columns had as read, before any downcasting."""
+        return sum(self.raw_sizes.get(name, 0) for name in list(self.series))
+
+    @property
+    def private_bytes(self) -> int:
+        """Memory the kernel cannot reclaim: loaded columns not mapped from a file."""
+        return 0 if self.mapped else self.memory_bytes
+
+    def release(self, spill_path: Path) -> None:
+        """
+        Drops the loaded columns, which are read back on their next use.
+
+        Data that only lives in memory is first written to ``spill_path`` as
+        Parquet; the dataset then continues lazily over that file.
+        """
+        with self.lock:
+            if not self.lazy and not self.mapped:
+                frame = pl.DataFrame([self.series[col] for col in self.columns])
+                spill_path.parent.mkdir(parents=True, exist_ok=True)
+                atomic_write(spill_path, frame.write_parquet)
+                weakref.finalize(self, spill_path.unlink, missing_ok=True)
+                self.source = self.scan = pl.scan_parquet(spill_path)
+                self.add_id = False
+                self.lazy = True
+            elif not self.lazy:
+                return  # Mapped pages are reclaimed by the kernel
+            self.series.clear()
+            self.frames.clear()
+        logger.info(f"📤 Released dataset {self.fingerprint[:12]} from memory")
+
+    def head(self, n: int = 10) -> pl.DataFrame:
+        """Returns the first ``n`` rows of every column without loading the rest."""
+        if not self.lazy:
+            return self.frame().head(n)
+        return self.scan.head(n).collect()
+
+    def frame(self, columns: Iterable[str] | None = None) -> pl.DataFrame:
+        """Returns the given columns (all when None), loading missing ones first."""
+        columns = tuple(self.columns if columns is None else dict.fromkeys(columns))
+        with self.lock:
+            missing = [col for col in columns if col not in self.series]
+            if missing:
+                if self.streaming:
+                    loaded = self._sample(missing)
+                else:
+                    loaded = self.scan.select(missing).collect()
+                for series in loaded.get_columns():
+                    self.raw_sizes.setdefault(series.name, series.estimated_size())
+                if self.downcast:
+                    loaded = downcast_frame(loaded)
+                    self.schema.update(loaded.schema)
+                self.column_hashes.update(CACHE_MANAGER.compute_column_hashes(loaded))
+                self.series.update((s.name, s) for s in loaded.get_columns())
+                logger.info(
+                    f"📥 Loaded {len(missing)} column(s), "
+                    f"{len(self.series)}/{len(self.columns)} in memory"
+                )
+
+            frame = self.frames.get(columns)
+            if frame is None:
+                # Shares the loaded column buffers, nothing is copied
+                frame = pl.DataFrame([self.series[col] for col in columns])
+                self.frames[columns] = frame
+                if len(self.frames) > FRAME_MEMO_SIZE:
+                    self.frames.popitem(last=False)
+            else:
+                self.frames.move_to_end(columns)
+            return frame
+
+    def _sample_blocks(self) -> list[tuple[int, int]]:
+        length = max(1, STREAMING_SAMPLE_ROWS // SAMPLE_BLOCKS)
+        step = max(length, -(-self.height // SAMPLE_BLOCKS))
+        return [
+            (offset, min(length, self.height - offset))
+            for offset in range(0, self.height, step)
+        ]
+
+    def _sample(self, columns: list[str]) -> pl.DataFrame:
+        """
+        Reads evenly spaced row ranges of ``columns``, the same for every call.
+
+        Row ranges of Parquet and Arrow files are read without scanning what
+        lies between them, and the union streams, so memory is bounded by
+        the sample whatever the dataset size.
+        """
+        blocks = []
+        for offset, length in self._sample_blocks():
+            block = self.source.slice(offset, length)
+            if self.add_id:
+                block = _with_row_id(block, offset + 1)
+            blocks.append(block.select(columns))
+        return pl.concat(blocks).collect(streaming=True)
+
+    def owns(self, df: pl.DataFrame) -> bool:
+        """Whether ``df`` was handed out by ``frame``, i.e. is unmodified data."""
+        with self.lock:
+            return any(frame is df for frame in self.frames.values())
+
+
+def detect_format(path: Path, filename: str) -> str:
+    """
+    Identifies the file format from its magic bytes, else from ``filename``.
+
+    Raises ``ValueError`` for unsupported files.
+    """
+    with path.open("rb") as f:
+        head = f.read(8)
+    for magic, file_format in MAGIC_BYTES.items():
+        if head.startswith(magic):
+            return file_format
+
+    file_format = FILE_FORMATS.get(Path(filename).suffix.lower())
+    if file_format is None or file_format in MAGIC_BYTES.values():
+        raise ValueError(f"Unsupported file type: {filename}")
+    return file_format
+
+
+def read_schema(path: Path, file_format: str) -> pl.Schema:
+    """Reads the column names and dtypes of a file, without parsing its rows."""
+    return READERS[file_format][1](path).collect_schema()
+
+
+def read_dataset(
+    path: Path, file_format: str = "csv", columns: list[str] | None = None
+) -> Dataset:
+    """
+    Reads an uploaded file into a ``Dataset`` according to ``INGEST_MODE``.
+
+    Only ``columns`` are read when given. A 1-based ``id`` column is prepended
+    unless the first column already is an incremental integer. With
+    ``DOWNCAST_DTYPES``, columns are narrowed as they are read. Files larger
+    than ``STREAMING_THRESHOLD`` are streamed whatever the mode. Lazy and
+    streaming datasets take ownership of ``path``; progressive ingest reads
+    eagerly, see ``publish_progressively``.
+    """
+    if is_larger_than_memory(path):
+        return _streaming_dataset(path, file_format, columns)
+
+    read, scan_source = READERS[file_format]
+    if INGEST_MODE == "lazy":
+        try:
+            scan = scan_source(path)
+            if columns is not None:
+                scan = scan.select(columns)
+            return Dataset.from_scan(
+                scan, path, downcast=DOWNCAST_DTYPES, add_id=_needs_id(scan)
+            )
+        except BaseException:
+            path.unlink(missing_ok=True)
+            raise
+
+    return _eager_dataset(read(path, columns=columns))
+
+
+def is_larger_than_memory(path: Path) -> bool:
+    """Whether a file or directory is above ``STREAMING_THRESHOLD``, so is streamed."""
+    if path.is_dir():
+        size = sum(file.stat().st_size for file in path.rglob("*") if file.is_file())
+    else:
+        size = path.stat().st_size
+    return size > STREAMING_THRESHOLD
+
+
+def _streaming_dataset(
+    path: Path, file_format: str, columns: list[str] | None
+) -> Dataset:
+    """
+    Keeps a large upload on disk and wraps a streaming scan over it.
+
+    CSV is first converted to Parquet in one streaming pass, so pages only
+    read the columns they use and samples skip straight to their rows.
+    """
+    parquet = path.with_suffix(".parquet")
+    try:
+        scan = READERS[file_format][1](path)
+        if columns is not None:
+            scan = scan.select(columns)
+        if file_format == "csv":
+            scan.sink_parquet(parquet)
+            path.unlink()
+            path, scan, file_format = parquet, pl.scan_parquet(parquet), "parquet"
+        logger.info(f"🌊 Streaming {path.stat().st_size / 1024**3:.2f} GB from disk")
+        return Dataset.from_scan(
+            scan,
+            path,
+            downcast=DOWNCAST_DTYPES,
+            add_id=_needs_id(scan, streaming=True),
+            streaming=True,
+            file_format=file_format,
+        )
+    except BaseException:
+        path.unlink(missing_ok=True)
+        parquet.unlink(missing_ok=True)
+        raise
+
+
+def read_head(
+    path: Path,
+    file_format: str,
+    columns: list[str] | None = None,
+    n_rows: int = PROGRESSIVE_ROWS,
+) -> Dataset:
+    """Reads the first ``n_rows`` rows of a file like ``read_dataset`` in eager mode."""
+    scan = READERS[file_format][1](path)
+    if columns is not None:
+        scan = scan.select(columns)
+    return _eager_dataset(scan.head(n_rows).collect())
+
+
+def catalog_entries() -> list[str]:
+    """Lists the files and partitioned directories that can be opened in place."""
+    return list_entries(FILE_FORMATS)
+
+
+def open_catalog_entry(entry: str) -> Dataset:
+    """
+    Scans a file or hive-partitioned Parquet directory under ``DATA_ROOT``.
+
+    The dataset is lazy whatever ``INGEST_MODE`` is: the file stays where it
+    is, and only the columns pages use are read, with projection pushdown.
+    A partition directory, e.g. ``sales/year=2024/``, is scanned from its
+    partitioned root with a filter on the partition keys, which keeps their
+    columns and prunes the files of other partitions. It is fingerprinted
+    by file metadata, without reading the data. Entries above
+    ``STREAMING_THRESHOLD`` are streamed; CSV ones are converted to Parquet
+    under ``SPILL_DIR`` first, for as long as the dataset is held.
+    """
+    path = resolve_entry(entry)
+    fingerprint = fingerprint_entry(path)
+    streaming = is_larger_than_memory(path)
+    converted = None
+    if path.is_dir():
+        root, partitions = split_partitions(path)
+        scan = pl.scan_parquet(root, hive_partitioning=True)
+        if partitions:
+            schema = scan.collect_schema()
+            # Literals of the keys' inferred dtypes, so the filter prunes files
+            scan = scan.filter(
+                pl.col(key) == pl.lit(value).cast(schema[key], strict=False)
+                for key, value in partitions.items()
+            )
+    else:
+        file_format = detect_format(path, path.name)
+        scan = READERS[file_format][1](path)
+        if streaming and file_format == "csv":
+            converted = SPILL_DIR / f"{fingerprint}-{os.getpid()}.parquet"
+            converted.parent.mkdir(parents=True, exist_ok=True)
+            scan.sink_parquet(converted)
+            scan = pl.scan_parquet(converted)
+    dataset = Dataset(
+        scan,
+        fingerprint,
+        downcast=DOWNCAST_DTYPES,
+        add_id=_needs_id(scan, streaming),
+        catalog=entry,
+        streaming=streaming,
+    )
+    if converted is not None:
+        weakref.finalize(dataset, converted.unlink, missing_ok=True)
+    return dataset
+
+
+def _reopen_catalog_entry(entry: str, fingerprint: str) -> Dataset:
+    dataset = open_catalog_entry(entry)
+    if dataset.fingerprint != fingerprint:
+        raise FileNotFoundError(f"{entry} changed on disk since it was opened")
+    return dataset
+
+
+def _eager_dataset(df: pl.DataFrame) -> Dataset:
+    df = _prepend_id(df)
+    if not DOWNCAST_DTYPES:
+        return Dataset.from_frame(df)
+    raw_sizes = {series.name: series.estimated_size() for series in df.get_columns()}
+    return Dataset.from_frame(downcast_frame(df), raw_sizes=raw_sizes)
+
+
+def _prepend_id(df: pl.DataFrame) -> pl.DataFrame:
+    if _is_id_column(df[df.columns[0]]):
+        return df
+    df = df.with_columns(pl.Series("id", range(1, len(df) + 1)))
+    return df.select(["id"] + [col for col in df.columns if col != "id"])
+
+
+def _with_row_id(scan: pl.LazyFrame, offset: int = 1) -> pl.LazyFrame:
+    return scan.with_row_index("id", offset=offset).with_columns(
+        pl.col("id").cast(pl.Int64)
+    )
+
+
+def _needs_id(scan: pl.LazyFrame, streaming: bool = False) -> bool:
+    """Whether an ``id`` column must be added; streamed data is judged by its head."""
+    first = scan.select(pl.first())
+    if streaming:
+        first = first.head(STREAMING_SAMPLE_ROWS)
+    return not _is_id_column(first.collect().to_series())
+
+
+def _is_id_column(series: pl.Series) -> bool:
+    if series.dtype == pl.Int64 and series.is_sorted():
+        logger.info(f"✅ Using '{series.name}' as the ID column.")
+        return True
+    logger.info("⚠️ First column is not an incremental integer, adding new ID column.")
+    return False
+
+
+class DatasetRegistry:
+    """
+    Datasets of every session, kept within one memory budget per process.
+
+    A session record lists up to ``SESSION_MAX_DATASETS`` (fingerprint,
+    filename) pairs, oldest first, and the active fingerprint. Datasets are
+    held once per fingerprint however many sessions uploaded them. When a
+    dataset is published while the memory the kernel cannot reclaim exceeds
+    the budget, the least recently used datasets are released (see
+    ``Dataset.release``) and reload their columns on next use.
+
+    With a shared store, session records live there so every worker sees the
+    same sessions, and each worker maps the data it is asked for. With an
+    archive, every complete dataset is also kept as Parquet and session
+    records are copied there, so sessions survive restarts of this process.
+    """
+
+    def __init__(self, budget: int = DATASET_MEMORY_BUDGET):
+        self.budget = budget
+        self.datasets: OrderedDict[str, Dataset] = OrderedDict()  # LRU first
+        self.sessions: dict[str, dict] = {}
+        self.last_used: dict[str, float] = {}
+        self.lock = threading.RLock()
+        self.archive_janitor = (
+            CacheJanitor(
+                lambda: DATASET_ARCHIVE.remove_idle(SESSION_TTL_SECONDS),
+                ARCHIVE_GC_INTERVAL,
+                name="archive",
+            )
+            if DATASET_ARCHIVE is not None
+            else None
+        )
+
+    def active(self, session: str) -> tuple[Dataset | None, str | None]:
+        """Returns the session's active dataset and its filename."""
+        with self.lock:
+            record = self._record(session)
+            active = record["active"]
+            if active is None:
+                return None, None
+            filename = dict(record["datasets"]).get(active)
+        try:
+            return self._get(active), filename
+        except FileNotFoundError:
+            return None, None  # Superseded meanwhile, the next call syncs
+
+    def list(self, session: str) -> list[tuple[str, str]]:
+        """Returns the session's (fingerprint, filename) pairs, oldest first."""
+        with self.lock:
+            return [tuple(entry) for entry in self._record(session)["datasets"]]
+
+    def publish(
+        self,
+        session: str,
+        dataset: Dataset,
+        filename: str | None = None,
+        *,
+        replaces: str | None = None,
+        provisional: bool = False,
+        upload_key: str | None = None,
+    ) -> Dataset:
+        """
+        Adds ``dataset`` to the session and makes it the active one.
+
+        Without ``filename``, it takes the place and name of ``replaces`` (by
+        default the active dataset), as cleaning ops and progressive ingest
+        do; it is only activated if ``replaces`` still is, and dropped if
+        ``replaces`` was removed meanwhile. ``provisional`` marks a partial
+        dataset that a complete one will replace. ``upload_key`` identifies
+        the upload ``dataset`` was read from, see ``upload_key``.
+        """
+        fingerprint = dataset.fingerprint
+        with self.lock:
+            record = self._record(session)
+            if filename is None:
+                replaces = replaces or record["active"]
+                if replaces not in dict(record["datasets"]):
+                    return dataset  # Removed from the session meanwhile
+            if SHARED_STORE is None:
+                self.datasets.setdefault(fingerprint, dataset)
+
+        def change(record: dict) -> None:
+            names = dict(record["datasets"])
+            name = names.pop(replaces, "") if filename is None else filename
+            names.pop(fingerprint, None)
+            names[fingerprint] = name
+            entries = [list(entry) for entry in names.items()]
+            record["datasets"] = entries[-SESSION_MAX_DATASETS:]
+            if filename is not None or record["active"] in (replaces, None):
+                record["active"] = fingerprint
+
+            listed = {fp for fp, _ in record["datasets"]}
+            record["provisional"] = {
+                fp: error
+                for fp, error in record.get("provisional", {}).items()
+                if fp in listed and fp not in (replaces, fingerprint)
+            }
+            if provisional:
+                record["provisional"][fingerprint] = None  # Error, if the rest fails
+
+        self._update(session, change, dataset)
+        if SHARED_STORE is not None:
+            SHARED_STORE.remove_idle(SESSION_TTL_SECONDS)
+        if self.archive_janitor is not None:
+            self.archive_janitor.ensure_started()
+        published = self._get(fingerprint)
+        if DATASET_ARCHIVE is not None and not provisional:
+            _archive_in_background(published, upload_key)
+        self.enforce_budget()
+        return published
+
+    def ingest_state(self, session: str) -> tuple[bool, str | None]:
+        """Returns whether the active dataset is provisional, and its load error."""
+        with self.lock:
+            record = self._record(session)
+            pending = record.get("provisional", {})
+            if record["active"] not in pending:
+                return False, None
+            return True, pending[record["active"]]
+
+    def fail_provisional(self, session: str, fingerprint: str, error: str) -> None:
+        """Records why the complete dataset for a provisional one failed to load."""
+
+        def change(record: dict) -> None:
+            if fingerprint in record.get("provisional", {}):
+                record["provisional"][fingerprint] = error
+
+        self._update(session, change)
+
+    def activate(self, session: str, fingerprint: str) -> None:
+        """Switches the session to one of its datasets."""
+
+        def change(record: dict) -> None:
+            if fingerprint in dict(record["datasets"]):
+                record["active"] = fingerprint
+
+        self._update(session, change)
+
+    def remove_active(self, session: str) -> None:
+        """Removes the active dataset from the session; none is active after."""
+
+        def change(record: dict) -> None:
+            record["datasets"] = [
+                entry for entry in record["datasets"] if entry[0] != record["active"]
+            ]
+            record["active"] = None
+
+        self._update(session, change)
+
+    def enforce_budget(self) -> None:
+        """Releases least recently used datasets until the budget is met."""
+        with self.lock:
+            held = [
+                (dataset, dataset.private_bytes) for dataset in self.datasets.values()
+            ]
+        total = sum(size for _, size in held)
+        for dataset, size in held[:-1]:  # The most recently used one stays
+            if total <= self.budget:
+                break
+            if size:
+                spill_path = SPILL_DIR / f"{dataset.fingerprint}-{os.getpid()}.parquet"
+                dataset.release(spill_path)
+                total -= size
+
+    def _record(self, session: str) -> dict:
+        if SHARED_STORE is not None:
+            shared = SHARED_STORE.changed(session)
+            local = self.sessions.get(session)
+            if shared is not None and (local is None or shared != local):
+                self.sessions[session] = shared
+                self._collect()
+            SHARED_STORE.touch(session)
+        elif session not in self.sessions and DATASET_ARCHIVE is not None:
+            restored = _restore_session(session)
+            if restored is not None:
+                self.sessions[session] = restored
+        if DATASET_ARCHIVE is not None:
+            DATASET_ARCHIVE.touch(session)
+        self.last_used[session] = time.monotonic()
+        return self.sessions.setdefault(
+            session, {"version": 0, "active": None, "datasets": []}
+        )
+
+    def _update(
+        self,
+        session: str,
+        change: Callable[[dict], None],
+        dataset: Dataset | None = None,
+    ) -> None:
+        if SHARED_STORE is None:
+            with self.lock:
+                record = self._record(session)
+                change(record)
+                record["version"] += 1
+                self._collect()
+        else:
+            data = _file_data(dataset, "ipc") if dataset is not None else None
+            record = SHARED_STORE.update_session(session, change, data)
+            with self.lock:
+                self.sessions[session] = record
+                self._collect()
+
+        if DATASET_ARCHIVE is not None:
+            DATASET_ARCHIVE.save_session(session, record)
+
+    def _get(self, fingerprint: str) -> Dataset:
+        """
+        Returns a held dataset, or maps, restores or reopens it.
+
+        Loading runs outside the lock, since reopening a catalog entry may
+        convert a whole file; a dataset another thread loaded meanwhile wins.
+        """
+        with self.lock:
+            dataset = self.datasets.get(fingerprint)
+            if dataset is not None:
+                self.datasets.move_to_end(fingerprint)
+                return dataset
+
+        if SHARED_STORE is not None:  # Published by another worker
+            loaded = _map_shared(fingerprint)
+            logger.info(f"🔗 Mapped shared dataset {fingerprint[:12]}")
+        else:  # Published before a restart
+            loaded = _restore_archived(fingerprint)
+            logger.info(f"🗄️ Restored archived dataset {fingerprint[:12]}")
+        with self.lock:
+            dataset = self.datasets.setdefault(fingerprint, loaded)
+            self.datasets.move_to_end(fingerprint)
+        return dataset
+
+    def _collect(self) -> None:
+        """Forgets idle sessions and the datasets no session lists any more."""
+        cutoff = time.monotonic() - SESSION_TTL_SECONDS
+        for session in [s for s, used in self.last_used.items() if used < cutoff]:
+            self.sessions.pop(session, None)
+            self.last_used.pop(session)
+        listed = {
+            fingerprint
+            for record in self.sessions.values()
+            for fingerprint, _ in record["datasets"]
+        }
+        for fingerprint in [fp for fp in self.datasets if fp not in listed]:
+            del self.datasets[fingerprint]  # Unlinks its files once unreferenced
+
+
+def _registry() -> DatasetRegistry:
+    return Store.get_static("datasets")
+
+
+def current_dataset(session: str | None = None) -> Dataset | None:
+    """Returns the session's active dataset, by default the current request's."""
+    return _registry().active(session or current_session())[0]
+
+
+def current_filename(session: str | None = None) -> str | None:
+    """Returns the name of the uploaded file behind the active dataset."""
+    return _registry().active(session or current_session())[1]
+
+
+def session_datasets(session: str | None = None) -> list[tuple[str, str]]:
+    """Returns the (fingerprint, filename) pairs of the session, oldest first."""
+    return _registry().list(session or current_session())
+
+
+def activate_dataset(fingerprint: str, session: str | None = None) -> None:
+    """Switches the session to another of its datasets, without re-uploading."""
+    _registry().activate(session or current_session(), fingerprint)
+
+
+def publish_dataset(
+    data: pl.DataFrame | Dataset,
+    filename: str | None = None,
+    upload_key: str | None = None,
+) -> Dataset:
+    """
+    Publishes a dataset in the current session, fingerprinting a DataFrame first.
+
+    Without ``filename`` the active dataset is replaced under its name (e.g.
+    by cleaning ops). With a shared store the data is written there once and
+    the returned dataset maps it, so this worker holds no private copy either.
+    """
+    dataset = data if isinstance(data, Dataset) else Dataset.from_frame(data)
+    return _registry().publish(
+        current_session(), dataset, filename, upload_key=upload_key
+    )
+
+
+def publish_progressively(
+    path: Path,
+    file_format: str,
+    filename: str,
+    columns: list[str] | None = None,
+    upload_key: str | None = None,
+) -> Dataset:
+    """
+    Publishes the first rows of a file at once, and all of it once parsed.
+
+    The head is published as a provisional dataset in the current session.
+    A background thread then reads the whole file like eager ingest, replaces
+    the head with it, and deletes ``path``, which it takes ownership of.
+    """
+    session = current_session()
+    head = read_head(path, file_format, columns)
+    if head.height < PROGRESSIVE_ROWS:  # The head is the whole file
+        path.unlink(missing_ok=True)
+        return _registry().publish(session, head, filename, upload_key=upload_key)
+    head = _registry().publish(session, head, filename, provisional=True)
+
+    def load_rest() -> None:
+        try:
+            dataset = read_dataset(path, file_format, columns)
+            _registry().publish(
+                session, dataset, replaces=head.fingerprint, upload_key=upload_key
+            )
+            logger.info(f"✅ Full load of {filename} done, {dataset.height:,} rows")
+        except Exception as e:
+            logger.error(f"❌ Full load of {filename} failed: {e}")
+            _registry().fail_provisional(session, head.fingerprint, str(e))
+        finally:
+            path.unlink(missing_ok=True)
+
+    threading.Thread(target=load_rest, name="progressive-ingest", daemon=True).start()
+    return head
+
+
+def upload_key(path: Path, columns: list[str] | None = None) -> str | None:
+    """
+    Identifies an upload by its bytes and ingest options, if datasets are archived.
+
+    Hashing the file is much cheaper than parsing it, so an identical
+    re-upload is restored from the archive by ``restore_upload`` instead.
+    """
+    if DATASET_ARCHIVE is None:
+        return None
+    options = f"{CACHE_MANAGER.hash_file(path)}\x1f{columns}\x1f{DOWNCAST_DTYPES}"
+    return xxhash.xxh64(options.encode()).hexdigest()
+
+
+def restore_upload(key: str | None) -> Dataset | None:
+    """Returns the archived dataset an identical upload was ingested as, if any."""
+    fingerprint = DATASET_ARCHIVE.lookup(key) if key is not None else None
+    if fingerprint is None:
+        return None
+    logger.info(f"🗄️ Upload already ingested as {fingerprint[:12]}, skipping parse")
+    return _restore_archived(fingerprint)
+
+
+def ingest_state() -> tuple[bool, str | None]:
+    """Whether the active dataset is a provisional head, and why its load failed."""
+    return _registry().ingest_state(current_session())
+
+
+def clear_dataset() -> None:
+    """Removes the active dataset from the current session."""
+    _registry().remove_active(current_session())
+
+
+def _file_data(
+    dataset: Dataset, file_format: str
+) -> tuple[str, Callable[[Path], None] | None, dict]:
+    """
+    Returns how to write ``dataset`` as uncompressed Arrow IPC or as Parquet.
+
+    Lazy datasets are streamed from their source without being collected;
+    their ``id`` column is added by each reader's scan. Catalog and streaming
+    datasets are not written at all: readers open the entry again, or scan
+    the file through a hard link made for the store (see ``_link_source``).
+    """
+    if dataset.catalog is not None:
+        return dataset.fingerprint, None, {"catalog": dataset.catalog}
+
+    meta = {
+        "lazy": dataset.lazy,
+        "add_id": dataset.add_id,
+        "raw_sizes": dataset.raw_sizes,
+        "column_hashes": None if dataset.lazy else dataset.column_hashes,
+    }
+    if dataset.streaming and dataset.path is not None:
+        meta["source"] = str(_link_source(dataset, file_format))
+        meta["source_format"] = dataset.file_format
+        meta["columns"] = list(dataset.source.collect_schema())
+        return dataset.fingerprint, None, meta
+
+    if dataset.lazy:
+
+        def write(path: Path) -> None:
+            if file_format == "ipc":
+                dataset.source.sink_ipc(path, compression=None)
+            else:
+                dataset.source.sink_parquet(path)
+    else:
+
+        def write(path: Path) -> None:
+            if file_format == "ipc":
+                dataset.frame().write_ipc(path, compression="uncompressed")
+            else:
+                dataset.frame().write_parquet(path)
+
+    return dataset.fingerprint, write, meta
+
+
+def _link_source(dataset: Dataset, file_format: str) -> Path:
+    """
+    Hard-links a streaming dataset's file for the store writing ``file_format``.
+
+    Larger-than-memory files must not be copied, least of all to a RAM-backed
+    shared store. Each store gets a link of its own next to the file, on the
+    same file system, and unlinks it with the dataset's metadata; the file is
+    freed once neither the stores nor the dataset refer to it.
+    """
+    link = dataset.path.with_name(f"{dataset.fingerprint}-{file_format}.source")
+    with contextlib.suppress(FileExistsError):  # Linked by an earlier publish
+        os.link(dataset.path, link)
+    return link
+
+
+def _referenced_dataset(fingerprint: str, meta: dict) -> Dataset:
+    """Scans the file a stored streaming dataset refers to, see ``_link_source``."""
+    path = Path(meta["source"])
+    if not path.exists():
+        raise FileNotFoundError(f"Source of dataset {fingerprint} is gone: {path}")
+    scan = READERS[meta["source_format"]][1](path).select(meta["columns"])
+    return Dataset(
+        scan,
+        fingerprint,
+        downcast=DOWNCAST_DTYPES,
+        raw_sizes=meta["raw_sizes"],
+        add_id=meta["add_id"],
+        streaming=True,
+        path=path,
+        file_format=meta["source_format"],
+    )
+
+
+def _map_shared(fingerprint: str) -> Dataset:
+    meta = SHARED_STORE.read_meta(fingerprint)
+    if "catalog" in meta:
+        return _reopen_catalog_entry(meta["catalog"], fingerprint)
+    if "source" in meta:
+        return _referenced_dataset(fingerprint, meta)
+    path = SHARED_STORE.data_path(fingerprint)
+    if meta["lazy"]:
+        return Dataset(
+            pl.scan_ipc(path, memory_map=True),
+            fingerprint,
+            downcast=DOWNCAST_DTYPES,
+            add_id=meta["add_id"],
+        )
+    frame = READERS["ipc"][0](path)  # Zero-copy: the pages are shared by all workers
+    return Dataset(
+        frame.lazy(),
+        fingerprint,
+        frame=frame,
+        column_hashes=meta["column_hashes"],
+        raw_sizes=meta["raw_sizes"],
+        mapped=True,
+    )
+
+
+def _archive_in_background(dataset: Dataset, upload_key: str | None) -> None:
+    def save() -> None:
+        try:
+            DATASET_ARCHIVE.save(*_file_data(dataset, "parquet"))
+            if upload_key is not None:
+                DATASET_ARCHIVE.remember(upload_key, dataset.fingerprint)
+        except Exception as e:
+            logger.error(f"❌ Archiving dataset {dataset.fingerprint[:12]} failed: {e}")
+
+    threading.Thread(target=save, name="dataset-archive", daemon=True).start()
+
+
+def _restore_session(session: str) -> dict | None:
+    """Reads an archived session record, keeping the datasets archived in full."""
+    record = DATASET_ARCHIVE.read_session(session)
+    if record is None:
+        return None
+    record["datasets"] = [
+        entry for entry in record["datasets"] if DATASET_ARCHIVE.has(entry[0])
+    ]
+    if record["active"] not in dict(record["datasets"]):
+        record["active"] = None
+    record["provisional"] = {}  # Background parses did not survive the restart
+    return record
+
+
+def _restore_archived(fingerprint: str) -> Dataset:
+    """
+    Scans an archived dataset; columns are read from Parquet as they are used.
+
+    Raises ``FileNotFoundError`` if it is not archived.
+    """
+    if DATASET_ARCHIVE is None or not DATASET_ARCHIVE.has(fingerprint):
+        raise FileNotFoundError(f"Dataset {fingerprint} is not archived")
+    meta = DATASET_ARCHIVE.read_meta(fingerprint)
+    if "catalog" in meta:
+        return _reopen_catalog_entry(meta["catalog"], fingerprint)
+    if "source" in meta:
+        return _referenced_dataset(fingerprint, meta)
+    return Dataset(
+        pl.scan_parquet(DATASET_ARCHIVE.data_path(fingerprint)),
+        fingerprint,
+        column_hashes=meta["column_hashes"],
+        downcast=meta["lazy"] and DOWNCAST_DTYPES,  # Eager data was narrowed already
+        raw_sizes=meta["raw_sizes"],
+        add_id=meta["add_id"],
+    )
@@ -0,0 +1,155 @@
+import contextlib
+import os
+import threading
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+import orjson
+
+from utils.file_utils import atomic_write, file_lock, unlink_source
+from utils.logger_config import logger
+
+# Set (e.g. to .cache/datasets) to keep ingested datasets across restarts
+DATASET_ARCHIVE_DIR = os.environ.get("DATASET_ARCHIVE_DIR", "")
+STALE_TMP_SECONDS = 3600  # Temp files of writes interrupted by a restart
+TOUCH_INTERVAL_SECONDS = 60  # Session records are marked used at most this often
+
+
+class DatasetArchive:
+    """
+    Keeps ingested datasets and the sessions listing them on disk.
+
+    Data is written once per fingerprint as ``<fingerprint>.parquet``, with
+    its metadata in ``<fingerprint>.json``. ``session-<id>.json`` copies each
+    session's record, so a restarted worker restores the session and scans
+    its datasets from Parquet as columns are used. ``upload-<key>.json``
+    maps an uploaded file and its ingest options to the fingerprint it was
+    ingested as, so an identical re-upload is not parsed again. Datasets
+    opened from the data root only have metadata; larger-than-memory ones
+    refer to a link to their file instead. Data no session lists any more is
+    removed by ``remove_idle``, which the registry runs periodically.
+    """
+
+    def __init__(self, root: Path):
+        self.root = root
+        self.lock_path = root / "archive.lock"
+        self.touched: dict[str, float] = {}
+
+    def data_path(self, fingerprint: str) -> Path:
+        return self.root / f"{fingerprint}.parquet"
+
+    def has(self, fingerprint: str) -> bool:
+        return self._meta(fingerprint).exists()
+
+    def read_meta(self, fingerprint: str) -> dict:
+        return orjson.loads(self._meta(fingerprint).read_bytes())
+
+    def save(
+        self, fingerprint: str, write: Callable[[Path], None] | None, meta: dict
+    ) -> None:
+        """
+        Writes a dataset unless it is archived already.
+
+        ``write`` (if any) gets a temp path, renamed once complete; the
+        metadata is written last, so a dataset with metadata is complete.
+        """
+        if self.has(fingerprint):
+            return
+        self.root.mkdir(parents=True, exist_ok=True)
+        if write is not None:
+            path = self.data_path(fingerprint)
+            tmp_path = path.with_name(
+                f"{fingerprint}-{os.getpid()}-{threading.get_ident()}.tmp"
+            )
+            try:
+                write(tmp_path)
+                tmp_path.replace(path)
+            finally:
+                tmp_path.unlink(missing_ok=True)
+        atomic_write(self._meta(fingerprint), lambda f: f.write(orjson.dumps(meta)))
+        logger.info(f"🗄️ Archived dataset {fingerprint[:12]}")
+
+    def lookup(self, upload_key: str) -> str | None:
+        """Returns the fingerprint an identical upload was ingested as, if archived."""
+        try:
+            fingerprint = orjson.loads(self._upload(upload_key).read_bytes())
+        except FileNotFoundError:
+            return None
+        return fingerprint if self.has(fingerprint) else None
+
+    def remember(self, upload_key: str, fingerprint: str) -> None:
+        """Records the fingerprint an upload was ingested as."""
+        atomic_write(
+            self._upload(upload_key), lambda f: f.write(orjson.dumps(fingerprint))
+        )
+
+    def read_session(self, session: str) -> dict | None:
+        try:
+            return orjson.loads(self._session(session).read_bytes())
+        except FileNotFoundError:
+            return None
+
+    def save_session(self, session: str, record: dict) -> None:
+        """Copies a session's record; data it stops listing waits for ``remove_idle``."""
+        self.root.mkdir(parents=True, exist_ok=True)
+        with file_lock(self.lock_path):
+            atomic_write(
+                self._session(session), lambda f: f.write(orjson.dumps(record))
+            )
+
+    def touch(self, session: str) -> None:
+        """Marks a session as used, so ``remove_idle`` keeps it."""
+        now = time.monotonic()
+        if now - self.touched.get(session, 0) < TOUCH_INTERVAL_SECONDS:
+            return
+        self.touched[session] = now
+        try:
+            os.utime(self._session(session))
+        except FileNotFoundError:
+            pass
+
+    def remove_idle(self, max_idle_seconds: float) -> None:
+        """Drops sessions unused for ``max_idle_seconds`` and their data."""
+        cutoff = time.time() - max_idle_seconds
+        with file_lock(self.lock_path):
+            for path in self.root.glob("session-*.json"):
+                if path.stat().st_mtime < cutoff:
+                    path.unlink(missing_ok=True)
+            self._remove_unreferenced()
+
+    def _meta(self, fingerprint: str) -> Path:
+        return self.root / f"{fingerprint}.json"
+
+    def _session(self, session: str) -> Path:
+        return self.root / f"session-{session}.json"
+
+    def _upload(self, upload_key: str) -> Path:
+        return self.root / f"upload-{upload_key}.json"
+
+    def _remove_unreferenced(self) -> None:
+        referenced = set()
+        for path in self.root.glob("session-*.json"):
+            record = orjson.loads(path.read_bytes())
+            referenced.update(fingerprint for fingerprint, _ in record["datasets"])
+        for path in [*self.root.glob("*.json"), *self.root.glob("*.parquet")]:
+            if path.stem.startswith(("session-", "upload-")):
+                continue
+            if path.stem not in referenced:
+                if path.suffix == ".json":
+                    unlink_source(path)
+                path.unlink(missing_ok=True)
+                self.data_path(path.stem).unlink(missing_ok=True)
+        for path in self.root.glob("upload-*.json"):
+            if orjson.loads(path.read_bytes()) not in referenced:
+                path.unlink(missing_ok=True)
+        cutoff = time.time() - STALE_TMP_SECONDS
+        for path in self.root.glob("*.tmp"):
+            with contextlib.suppress(FileNotFoundError):  # Renamed meanwhile
+                if path.stat().st_mtime < cutoff:
+                    path.unlink()
+
+
+DATASET_ARCHIVE = (
+    DatasetArchive(Path(DATASET_ARCHIVE_DIR)) if DATASET_ARCHIVE_DIR else None
+)
@@ -0,0 +1,87 @@
+import os
+
+import numpy as np
+import polars as pl
+
+from utils.logger_config import logger
+
+# Opt-in: shrink columns to the narrowest dtype that holds their values
+DOWNCAST_DTYPES = os.environ.get("DOWNCAST_DTYPES", "false").lower() == "true"
+
+# Narrowest first. Signed, so negative values fit without an offset. Sums and
+# means are computed as Int64/Float64, but element-wise arithmetic keeps the
+# narrow type and wraps (Int8 100 - -100 is -56): cast before subtracting.
+INTEGER_TYPES = {
+    pl.Int8: np.iinfo(np.int8),
+    pl.Int16: np.iinfo(np.int16),
+    pl.Int32: np.iinfo(np.int32),
+}
+
+
+def is_numeric(dtype: pl.DataType) -> bool:
+    """Whether columns of ``dtype`` are offered as numerical features."""
+    return dtype.is_numeric()
+
+
+def is_categorical(dtype: pl.DataType) -> bool:
+    """Whether columns of ``dtype`` are offered as categorical features."""
+    return dtype in (pl.String, pl.Categorical)
+
+
+def _narrowest_integer(series: pl.Series) -> pl.DataType | None:
+    low, high = series.min(), series.max()
+    if low is None:
+        return None  # All null
+    for dtype, bounds in INTEGER_TYPES.items():
+        if bounds.min <= low and high <= bounds.max:
+            return dtype
+    return None
+
+
+def _fits_float32(series: pl.Series) -> bool:
+    values = series.drop_nulls()
+    values = values.filter(values.is_finite())
+    if values.is_empty():
+        return False
+    return bool((values.cast(pl.Float32).cast(pl.Float64) == values).all())
+
+
+def downcast_dtype(series: pl.Series) -> pl.DataType | None:
+    """
+    Returns a narrower dtype holding every value of ``series``, or None.
+
+    Integers move to the smallest signed type covering their range, floats
+    to Float32 when every finite value survives the round trip exactly, and
+    strings to Categorical when their codes plus the dictionary take less
+    memory, i.e. when values repeat.
+    """
+    dtype = series.dtype
+    if dtype in (pl.Int64, pl.Int32, pl.UInt64, pl.UInt32):
+        narrower = _narrowest_integer(series)
+        return narrower if narrower is not None and narrower != dtype else None
+    if dtype == pl.Float64:
+        return pl.Float32 if _fits_float32(series) else None
+    if dtype == pl.String:
+        categorical = series.cast(pl.Categorical)
+        if categorical.estimated_size() < series.estimated_size():
+            return pl.Categorical
+    return None
+
+
+def downcast_frame(df: pl.DataFrame) -> pl.DataFrame:
+    """Casts every column of ``df`` that fits a narrower dtype."""
+    casts = {}
+    for series in df.get_columns():
+        dtype = downcast_dtype(series)
+        if dtype is not None:
+            casts[series.name] = dtype
+    if not casts:
+        return df
+
+    downcast = df.cast(casts)
+    saved = df.estimated_size() - downcast.estimated_size()
+    logger.info(
+        f"🗜️ Downcast {len(casts)}/{df.width} column(s), "
+        f"saving {saved / 1024 / 1024:.2f} MB"
+    )
+    return downcast
@@ -0,0 +1,71 @@
+import contextlib
+import os
+import tempfile
+import threading
+from collections.abc import Callable, Iterator
+from pathlib import Path
+from typing import BinaryIO
+
+import orjson
+
+try:
+    import fcntl
+except ImportError:  # Windows: fall back to in-process locking only
+    fcntl = None
+
+_fallback_locks: dict[Path, threading.Lock] = {}
+_fallback_guard = threading.Lock()
+
+
+def atomic_write(path: Path, writer: Callable[[BinaryIO], object]) -> None:
+    """
+    Writes a file through a temp file in the same directory and ``os.replace``.
+
+    Readers either see the previous file or the complete new one, never a
+    partially written file.
+    """
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    tmp_path = Path(tmp_name)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            writer(f)
+            f.flush()
+            os.fsync(f.fileno())
+        tmp_path.replace(path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+
+@contextlib.contextmanager
+def file_lock(path: Path, shared: bool = False) -> Iterator[None]:
+    """
+    Holds an advisory ``fcntl`` lock on ``path`` across processes.
+
+    Threads of the same process are serialized as well, since ``flock`` locks
+    are per open file description.
+    """
+    if fcntl is None:
+        with _fallback_guard:
+            lock = _fallback_locks.setdefault(path, threading.Lock())
+        with lock:
+            yield
+        return
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("a+b") as f:
+        fcntl.flock(f.fileno(), fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+def unlink_source(meta_path: Path) -> None:
+    """Unlinks the file a dataset's metadata refers to as its ``source``, if any."""
+    try:
+        source = orjson.loads(meta_path.read_bytes()).get("source")
+    except FileNotFoundError:
+        return
+    if source is not None:
+        Path(source).unlink(missing_ok=True)
@@ -1,5 +1,8 @@
+import numpy as np
 import plotly.graph_objects as go
+import polars as pl
 
+from .cached_analysis import cached_analysis
 from .logger_config import logger
 
 
@@ -7,3 +10,26 @@ def _log_and_return_empty(message: str):
     """Helper function to log a warning and return an empty figure."""
     logger.warning(message)
     return go.Figure(), message
+
+
+@cached_analysis(columns=("feature_x", "feature_y"))
+def xy_pair(
+    df: pl.DataFrame, feature_x: str, feature_y: str
+) -> tuple[np.ndarray, np.ndarray] | None:
+    """
+    Returns the null-free x/y values sorted by x, or None if no rows remain.
+
+    Shared by the scatter and contour callbacks, which request the same pair at
+    the same time. ``feature_x`` and ``feature_y`` may be the same column.
+    """
+    pair = pl.DataFrame({"x": df[feature_x], "y": df[feature_y]}).drop_nulls()
+    if pair.is_empty():
+        return None
+    pair = pair.sort("x")
+    return pair["x"].to_numpy(), pair["y"].to_numpy()
+
+
+@cached_analysis(columns="columns")
+def select_columns(df: pl.DataFrame, columns: list[str]) -> pl.DataFrame:
+    """Returns the given columns as a narrow frame, shared by multivariate plots."""
+    return df.select(columns)
@@ -0,0 +1,98 @@
+import sys
+import threading
+from collections import OrderedDict
+from typing import Any
+
+import numpy as np
+import polars as pl
+
+# Large row-dict lists are sized from a prefix instead of walking every element
+SIZE_SAMPLE_ITEMS = 1000
+
+
+def estimate_size(obj: Any) -> int:
+    """Estimates the resident size of a cached payload in bytes."""
+    if isinstance(obj, np.memmap):
+        return sys.getsizeof(obj)  # Pages live in the OS page cache, not the heap
+    if isinstance(obj, np.ndarray):
+        return obj.nbytes
+    if isinstance(obj, pl.DataFrame | pl.Series):
+        return obj.estimated_size()
+    if isinstance(obj, dict):
+        return sys.getsizeof(obj) + sum(
+            estimate_size(key) + estimate_size(value) for key, value in obj.items()
+        )
+    if isinstance(obj, list | tuple | set):
+        items = list(obj)[:SIZE_SAMPLE_ITEMS] if len(obj) > SIZE_SAMPLE_ITEMS else obj
+        sampled = sum(estimate_size(item) for item in items)
+        scale = len(obj) / len(items) if items else 0
+        return sys.getsizeof(obj) + int(sampled * scale)
+    return sys.getsizeof(obj)  # Strings, bytes and scalars
+
+
+class MemoryCache:
+    """Thread-safe LRU cache bounded by an estimated byte budget."""
+
+    MISSING = object()  # Sentinel so that falsy payloads still count as hits
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.entries: OrderedDict[Any, tuple[Any, int]] = OrderedDict()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.lock = threading.Lock()
+
+    def get(self, key: Any) -> Any:
+        """Returns the cached value and marks it most recently used, or ``MISSING``."""
+        with self.lock:
+            if key not in self.entries:
+                self.misses += 1
+                return self.MISSING
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return self.entries[key][0]
+
+    def put(self, key: Any, value: Any, size: int | None = None) -> None:
+        """Stores a value, evicting least recently used entries to stay in budget."""
+        size = estimate_size(value) if size is None else size
+        with self.lock:
+            self._discard(key)
+            if size > self.max_bytes:
+                return  # Would evict everything else and still not fit
+
+            self.entries[key] = (value, size)
+            self.current_bytes += size
+            while self.current_bytes > self.max_bytes:
+                _, (_, evicted_size) = self.entries.popitem(last=False)
+                self.current_bytes -= evicted_size
+                self.evictions += 1
+
+    def discard(self, key: Any) -> None:
+        """Removes a single entry if present."""
+        with self.lock:
+            self._discard(key)
+
+    def _discard(self, key: Any) -> None:
+        entry = self.entries.pop(key, None)
+        if entry is not None:
+            self.current_bytes -= entry[1]
+
+    def clear(self) -> None:
+        """Drops every entry; counters are kept."""
+        with self.lock:
+            self.entries.clear()
+            self.current_bytes = 0
+
+    def stats(self) -> dict[str, int]:
+        """Returns hit/miss/eviction counters and current usage."""
+        with self.lock:
+            return {
+                "entries": len(self.entries),
+                "bytes": self.current_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
@@ -0,0 +1,55 @@
+import fnmatch
+import os
+import re
+from collections import Counter
+
+# Uploads with more columns than this ask which columns to load first
+WIDE_FILE_COLUMNS = int(os.environ.get("WIDE_FILE_COLUMNS", "200"))
+
+_GROUP_PREFIX = re.compile(r"^(.+?[_.:\-\s])")  # Up to the first separator
+
+
+def column_groups(columns: list[str]) -> dict[str, int]:
+    """
+    Returns a glob pattern per group of columns sharing a prefix, with its size.
+
+    Columns are grouped by the name part up to their first separator, e.g.
+    ``sensor_1`` and ``sensor_2`` under ``sensor_*``; lone columns are left out.
+    """
+    prefixes = Counter()
+    for column in columns:
+        match = _GROUP_PREFIX.match(column)
+        if match:
+            prefixes[match.group(1)] += 1
+    return {
+        f"{_escape(prefix)}*": count
+        for prefix, count in sorted(prefixes.items())
+        if count > 1
+    }
+
+
+def match_columns(columns: list[str], patterns: list[str]) -> list[str]:
+    """
+    Returns the columns matching any glob pattern, in file order.
+
+    Patterns without wildcards select the column of that exact name.
+    """
+    return [
+        column
+        for column in columns
+        if any(fnmatch.fnmatchcase(column, pattern) for pattern in patterns)
+    ]
+
+
+def column_pattern(column: str) -> str:
+    """Returns the glob pattern matching only ``column``."""
+    return _escape(column)
+
+
+def split_patterns(text: str | None) -> list[str]:
+    """Splits a comma or whitespace separated list of patterns typed by the user."""
+    return [pattern for pattern in re.split(r"[,\s]+", text or "") if pattern]
+
+
+def _escape(name: str) -> str:
+    return re.sub(r"([*?\[])", r"[\1]", name)
@@ -0,0 +1,57 @@
+import re
+import uuid
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from flask import Flask, Response, has_request_context, request
+
+SESSION_COOKIE = "eda_session"
+DEFAULT_SESSION = "default"  # Used outside requests, e.g. by scripts
+
+_SESSION_ID = re.compile(r"[0-9a-f]{32}")
+_SESSION_OVERRIDE: ContextVar[str | None] = ContextVar("session", default=None)
+
+
+def current_session() -> str:
+    """
+    Returns the session of the current request, from its session cookie.
+
+    Inside ``session_context`` (e.g. background threads working for a
+    request) that session is returned instead.
+    """
+    override = _SESSION_OVERRIDE.get()
+    if override is not None:
+        return override
+    if has_request_context():
+        session = request.cookies.get(SESSION_COOKIE, "")
+        if _SESSION_ID.fullmatch(session):
+            return session
+    return DEFAULT_SESSION
+
+
+@contextmanager
+def session_context(session: str) -> Iterator[None]:
+    """Makes ``current_session`` return ``session`` outside its request."""
+    token = _SESSION_OVERRIDE.set(session)
+    try:
+        yield
+    finally:
+        _SESSION_OVERRIDE.reset(token)
+
+
+def register_session_cookie(server: Flask) -> None:
+    """
+    Issues a session cookie with the first page a browser loads.
+
+    Every callback request then carries the session, so each analyst gets
+    their own datasets without the callbacks declaring any extra state.
+    """
+
+    @server.after_request
+    def issue_session_cookie(response: Response) -> Response:
+        if response.mimetype == "text/html" and current_session() == DEFAULT_SESSION:
+            response.set_cookie(
+                SESSION_COOKIE, uuid.uuid4().hex, httponly=True, samesite="Lax"
+            )
+        return response
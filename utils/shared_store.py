@@ -0,0 +1,170 @@
+import contextlib
+import os
+import threading
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+import orjson
+
+from utils.file_utils import atomic_write, file_lock, unlink_source
+from utils.logger_config import logger
+
+# Set (e.g. to /dev/shm/eda-datasets) to share datasets across gunicorn workers
+SHARED_DATASET_DIR = os.environ.get("SHARED_DATASET_DIR", "")
+STALE_TMP_SECONDS = 3600  # Temp files of writes interrupted by a crashed worker
+TOUCH_INTERVAL_SECONDS = 60  # Session pointers are marked used at most this often
+
+
+class SharedStore:
+    """
+    Publishes the datasets of every session as files all workers can map.
+
+    Data is written once per fingerprint as ``<fingerprint>.arrow``, with its
+    metadata in ``<fingerprint>.json``; both are immutable. Datasets opened
+    from the data root only have metadata, workers open the entry themselves;
+    larger-than-memory ones refer to a link to their file on disk instead.
+    ``session-<id>.json`` lists a session's datasets and the active one under
+    a version counter bumped on every change, so workers notice uploads,
+    switches and cleaning ops made by any worker with a ``stat`` of the
+    pointer. Data no session lists any more is unlinked; workers still
+    mapping it keep their pages until they remap.
+    """
+
+    def __init__(self, root: Path):
+        self.root = root
+        self.lock_path = root / "sessions.lock"
+        self.seen: dict[str, tuple[int, int]] = {}  # Pointer inode and mtime last read
+        self.seen_lock = threading.Lock()
+
+    def data_path(self, fingerprint: str) -> Path:
+        return self.root / f"{fingerprint}.arrow"
+
+    def has(self, fingerprint: str) -> bool:
+        return (self.root / f"{fingerprint}.json").exists()
+
+    def read_meta(self, fingerprint: str) -> dict:
+        return orjson.loads((self.root / f"{fingerprint}.json").read_bytes())
+
+    def update_session(
+        self,
+        session: str,
+        change: Callable[[dict], None],
+        data: tuple[str, Callable[[Path], None] | None, dict] | None = None,
+    ) -> dict:
+        """
+        Applies ``change`` to the session's record and bumps its version.
+
+        ``data`` is an optional (fingerprint, write, meta) triple for a dataset
+        the change refers to; ``write`` (if any) is only called if it is not
+        present. The data is written before the lock is taken, so other
+        workers are not held up; its metadata, which publishes it, and the
+        record are written under the lock, so it cannot be collected between.
+        """
+        self.root.mkdir(parents=True, exist_ok=True)
+        if data is not None:
+            self._write_data(*data[:2])
+        with file_lock(self.lock_path):
+            if data is not None:
+                self._write_meta(*data)
+            record = self._read(session)
+            change(record)
+            record["version"] += 1
+            pointer = self._pointer(session)
+            atomic_write(pointer, lambda f: f.write(orjson.dumps(record)))
+            self._mark_seen(session, pointer)
+            self._remove_unreferenced()
+        logger.info(f"🔗 Shared session {session[:8]}, version {record['version']}")
+        return record
+
+    def changed(self, session: str) -> dict | None:
+        """Returns the session's record if its pointer changed since the last call."""
+        pointer = self._pointer(session)
+        try:
+            stat = pointer.stat()
+        except FileNotFoundError:
+            return None  # Nothing was published in this session yet
+        with self.seen_lock:
+            if self.seen.get(session) == (stat.st_ino, stat.st_mtime_ns):
+                return None
+            self.seen[session] = (stat.st_ino, stat.st_mtime_ns)
+        return self._read(session)
+
+    def touch(self, session: str) -> None:
+        """Marks a session as used, so ``remove_idle`` keeps it."""
+        pointer = self._pointer(session)
+        try:
+            if time.time() - pointer.stat().st_mtime > TOUCH_INTERVAL_SECONDS:
+                os.utime(pointer)
+        except FileNotFoundError:
+            pass
+
+    def remove_idle(self, max_idle_seconds: float) -> None:
+        """Drops sessions unused for ``max_idle_seconds`` and their data."""
+        cutoff = time.time() - max_idle_seconds
+        with file_lock(self.lock_path):
+            for pointer in self.root.glob("session-*.json"):
+                if pointer.stat().st_mtime < cutoff:
+                    pointer.unlink(missing_ok=True)
+            self._remove_unreferenced()
+
+    def _pointer(self, session: str) -> Path:
+        return self.root / f"session-{session}.json"
+
+    def _read(self, session: str) -> dict:
+        try:
+            return orjson.loads(self._pointer(session).read_bytes())
+        except FileNotFoundError:
+            return {"version": 0, "active": None, "datasets": []}
+
+    def _mark_seen(self, session: str, pointer: Path) -> None:
+        stat = pointer.stat()
+        with self.seen_lock:
+            self.seen[session] = (stat.st_ino, stat.st_mtime_ns)  # Up to date here
+
+    def _write_data(
+        self, fingerprint: str, write: Callable[[Path], None] | None
+    ) -> None:
+        path = self.data_path(fingerprint)
+        if write is None or path.exists():
+            return  # Content-addressed, already written by some session
+        tmp_path = path.with_name(
+            f"{fingerprint}-{os.getpid()}-{threading.get_ident()}.tmp"
+        )
+        try:
+            write(tmp_path)
+            tmp_path.replace(path)
+        finally:
+            tmp_path.unlink(missing_ok=True)
+
+    def _write_meta(
+        self, fingerprint: str, write: Callable[[Path], None] | None, meta: dict
+    ) -> None:
+        meta_path = self.root / f"{fingerprint}.json"
+        if meta_path.exists():
+            return
+        self._write_data(fingerprint, write)  # Unless collected since it was written
+        atomic_write(meta_path, lambda f: f.write(orjson.dumps(meta)))
+
+    def _remove_unreferenced(self) -> None:
+        referenced = set()
+        for pointer in self.root.glob("session-*.json"):
+            record = orjson.loads(pointer.read_bytes())
+            referenced.update(fingerprint for fingerprint, _ in record["datasets"])
+        for path in self.root.glob("*.json"):
+            if not path.stem.startswith("session-") and path.stem not in referenced:
+                unlink_source(path)
+                path.unlink(missing_ok=True)
+                self.data_path(path.stem).unlink(missing_ok=True)
+
+        # Data is written outside the lock, so only leftovers of crashed writes go
+        cutoff = time.time() - STALE_TMP_SECONDS
+        for path in [*self.root.glob("*.tmp"), *self.root.glob("*.arrow")]:
+            if (path.parent / f"{path.stem}.json").exists():
+                continue
+            with contextlib.suppress(FileNotFoundError):  # Renamed meanwhile
+                if path.stat().st_mtime < cutoff:
+                    path.unlink()
+
+
+SHARED_STORE = SharedStore(Path(SHARED_DATASET_DIR)) if SHARED_DATASET_DIR else None
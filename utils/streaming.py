@@ -0,0 +1,375 @@
+import math
+
+import polars as pl
+from scipy.stats import entropy
+
+from utils.cache_manager import CACHE_MANAGER
+from utils.cached_analysis import analysis_key
+from utils.dataset import Dataset
+from utils.dtypes import is_categorical, is_numeric
+from utils.logger_config import logger
+
+DUPLICATE_ROWS_SHOWN = 1000  # Distinct duplicated rows listed, all are counted
+QUANTILES = {"25%": 0.25, "50%": 0.5, "75%": 0.75}
+SHIFT_ROWS = 10_000  # Head rows whose mean is subtracted before squaring values
+SKETCH_BITS = 14  # 2**14 HyperLogLog registers per column: about 1% error
+TOTALS_KEY = "__totals__"  # Constant group-by key: the streaming engine runs those
+VALUE_COUNTS_MAX = 10_000  # Distinct values above which a column is not counted
+
+
+def streamed_columns(dataset: Dataset) -> list[str]:
+    """Columns of the file itself; an ``id`` added as a row number is left out."""
+    return list(dataset.source.collect_schema())
+
+
+def missing_values(dataset: Dataset) -> list[dict]:
+    """Counts missing values of every column with any."""
+    totals = _column_totals(dataset)
+    return [
+        {
+            "Missing Count": stats["nulls"],
+            "Column": col,
+            "Missing %": f"{(stats['nulls'] / totals['rows'] * 100):.2f}%",
+        }
+        for col, stats in totals["columns"].items()
+        if stats["nulls"] > 0
+    ]
+
+
+def describe(dataset: Dataset) -> pl.DataFrame:
+    """
+    Builds ``describe()`` of the file's columns without loading them.
+
+    Counts, means, deviations and extremes are exact; quartiles come from
+    the sample ``Dataset.frame`` returns, since exact ones would need every
+    value of a column in memory.
+    """
+    schema = dataset.source.collect_schema()
+    numeric = [col for col, dtype in schema.items() if is_numeric(dtype)]
+    totals = _column_totals(dataset)
+    sample = dataset.frame(numeric) if numeric else None
+
+    columns = {"statistic": ["count", "null_count", "mean", "std", "min"]}
+    columns["statistic"] += [*QUANTILES, "max"]
+    for col in schema:
+        stats = totals["columns"][col]
+        row = [stats["count"], stats["nulls"], stats.get("mean"), stats.get("std")]
+        row.append(stats.get("min"))
+        row += [
+            sample[col].quantile(q, "nearest") if col in numeric else None
+            for q in QUANTILES.values()
+        ]
+        row.append(stats.get("max"))
+        if col in numeric:
+            columns[col] = [None if v is None else float(v) for v in row]
+        else:
+            columns[col] = [None if v is None else str(v) for v in row]
+    return pl.DataFrame(columns)
+
+
+def column_summaries(dataset: Dataset) -> list[dict]:
+    """
+    Builds the column summary rows from streaming aggregations.
+
+    Categorical columns with up to ``VALUE_COUNTS_MAX`` distinct values are
+    counted with a streaming group-by; above, the distinct values are
+    estimated and the most frequent value and entropy are left out. Sizes
+    are estimated from the dtypes and, for strings, the summed lengths.
+    """
+    schema = dataset.source.collect_schema()
+    categorical = [col for col, dtype in schema.items() if is_categorical(dtype)]
+    totals = _column_totals(dataset)
+    counts = _value_counts(dataset, categorical)
+
+    rows = []
+    for col, dtype in schema.items():
+        stats = totals["columns"][col]
+        summary = {
+            "Column": col,
+            "Type": str(dtype),
+            "Size (KB)": round(
+                _estimated_bytes(dtype, totals["rows"], stats) / 1024, 2
+            ),
+            "Unique Values": "-",
+            "Most Frequent Value": "-",
+            "Zero Count": stats["zeros"] if "zeros" in stats else "-",
+            "Entropy": "-",
+        }
+        if counts.get(col) is not None:
+            unique_count = counts[col].height
+            summary["Unique Values"] = unique_count
+            if unique_count > 1:
+                summary["Most Frequent Value"] = counts[col]["category"][0]
+                summary["Entropy"] = round(
+                    entropy(counts[col]["count"].to_numpy().astype(float)), 2
+                )
+        elif "unique" in stats:
+            unique_count = stats["unique"]  # Estimated
+            summary["Unique Values"] = unique_count
+        elif "zeros" in stats:
+            single = stats["min"] == stats["max"] and stats["nulls"] == 0
+            unique_count = 1 if single or stats["nulls"] == totals["rows"] else None
+        else:
+            unique_count = None  # Not counted for other types
+        summary["Constant Column"] = "Yes" if unique_count == 1 else "No"
+        rows.append(summary)
+    return rows
+
+
+def category_counts(dataset: Dataset, column: str) -> tuple[list, list] | None:
+    """
+    Counts the values of a column with a streaming group-by, most frequent first.
+
+    Returns None if the column has no values or too many distinct ones.
+    """
+    counts = _value_counts(dataset, [column])[column]
+    if counts is None:
+        logger.info(f"⚠️ '{column}' has over {VALUE_COUNTS_MAX:,} values to plot")
+        return None
+    if counts.is_empty():
+        return None
+    return counts["category"].to_list(), counts["count"].to_list()
+
+
+def duplicate_rows(dataset: Dataset) -> tuple[int, pl.DataFrame]:
+    """
+    Counts duplicated rows with a streaming group-by over the file's columns.
+
+    Returns the number of rows that have a duplicate, as ``is_duplicated``
+    counts them, and up to ``DUPLICATE_ROWS_SHOWN`` distinct duplicated rows.
+    """
+
+    def compute() -> tuple[int, pl.DataFrame]:
+        logger.info(f"🌊 Streaming duplicate_rows over {dataset.height:,} rows")
+        groups = dataset.source.group_by(pl.all()).len().filter(pl.col("len") > 1)
+        groups = groups.collect(streaming=True)
+        count = int(groups["len"].sum()) if not groups.is_empty() else 0
+        return count, groups.drop("len").head(DUPLICATE_ROWS_SHOWN)
+
+    return CACHE_MANAGER.get_or_compute(
+        analysis_key("streaming:duplicate_rows", {}), dataset.fingerprint, compute
+    )
+
+
+def _column_totals(dataset: Dataset) -> dict:
+    """
+    Returns the totals of every column, see ``_totals``.
+
+    They are cached under the dataset fingerprint; on a miss, the sums, the
+    distinct value sketches and the string extremes are computed by
+    streaming queries collected in a single call.
+    """
+    fingerprint = dataset.fingerprint
+    key = analysis_key("streaming:totals", {})
+    result = CACHE_MANAGER.load_cache(key, fingerprint)
+    if result is not None:
+        return result
+
+    schema = dataset.source.collect_schema()
+    categorical = [col for col, dtype in schema.items() if is_categorical(dtype)]
+    strings = [col for col, dtype in schema.items() if dtype == pl.String]
+    shifts = _shifts(dataset)
+    queries = [_totals_query(dataset, shifts)]
+    queries += [_sketch_query(dataset, col) for col in categorical]
+    queries += [_extremes_query(dataset, col) for col in strings]
+
+    logger.info(
+        f"🌊 Streaming {len(queries)} aggregations over {dataset.height:,} rows"
+    )
+    collected = pl.collect_all(queries, streaming=True)
+    result = _totals(dataset, collected[0], shifts)
+    sketches = collected[1 : 1 + len(categorical)]
+    for col, sketch in zip(categorical, sketches, strict=True):
+        result["columns"][col]["unique"] = _estimate_unique(sketch)
+    for col, extremes in zip(strings, collected[1 + len(categorical) :], strict=True):
+        values = extremes[col].to_list()
+        result["columns"][col]["min"] = values[0] if values else None
+        result["columns"][col]["max"] = values[-1] if values else None
+    CACHE_MANAGER.save_cache(key, fingerprint, result)
+    return result
+
+
+def _value_counts(
+    dataset: Dataset, columns: list[str]
+) -> dict[str, pl.DataFrame | None]:
+    """
+    Returns the value counts of ``columns``, most frequent first.
+
+    Columns estimated to hold more than ``VALUE_COUNTS_MAX`` distinct values
+    map to None: their counts would take about as much memory as the column.
+    Counts are cached under the dataset fingerprint; missing ones are
+    computed by streaming group-bys collected in a single call.
+    """
+    fingerprint = dataset.fingerprint
+    stats = _column_totals(dataset)["columns"]
+    keys = {
+        col: analysis_key("streaming:value_counts", {"column": col})
+        for col in columns
+        if stats[col].get("unique", VALUE_COUNTS_MAX + 1) <= VALUE_COUNTS_MAX
+    }
+    counts = dict.fromkeys(columns)
+    for col, key in keys.items():
+        counts[col] = CACHE_MANAGER.load_cache(key, fingerprint)
+
+    missing = [col for col in keys if counts[col] is None]
+    if missing:
+        logger.info(f"🌊 Counting the values of {len(missing)} column(s)")
+        collected = pl.collect_all(
+            [_counts_query(dataset, col) for col in missing], streaming=True
+        )
+        for col, df in zip(missing, collected, strict=True):
+            counts[col] = df
+            CACHE_MANAGER.save_cache(keys[col], fingerprint, df)
+    return counts
+
+
+def _totals_query(dataset: Dataset, shifts: dict[str, float]) -> pl.LazyFrame:
+    """Aggregates every column in one streaming pass, see ``_totals``."""
+    schema = dataset.source.collect_schema()
+    # Typed: the streaming engine does not group by a dynamically typed literal
+    key = pl.lit(0, dtype=pl.UInt8).alias(TOTALS_KEY)
+    prepared, aggregates = [key], [pl.len().alias("rows")]
+    for i, (col, dtype) in enumerate(schema.items()):
+        # Null counts and squares are summed from columns computed per batch,
+        # since only plain sums, extremes and counts run in the streaming engine
+        prepared.append(pl.col(col).is_null().cast(pl.UInt64).alias(f"nulls:{i}"))
+        aggregates.append(pl.col(f"nulls:{i}").sum())
+        if col in shifts:
+            deviation = pl.col(col).cast(pl.Float64) - shifts[col]
+            prepared += [
+                deviation.alias(f"deviation:{i}"),
+                (deviation * deviation).alias(f"squares:{i}"),
+                (pl.col(col) == 0).cast(pl.UInt64).alias(f"zeros:{i}"),
+            ]
+            aggregates += [
+                pl.col(f"deviation:{i}").sum(),
+                pl.col(f"squares:{i}").sum(),
+                pl.col(f"zeros:{i}").sum(),
+                pl.col(col).min().alias(f"min:{i}"),
+                pl.col(col).max().alias(f"max:{i}"),
+            ]
+        elif dtype == pl.String:
+            prepared.append(
+                pl.col(col).str.len_bytes().cast(pl.UInt64).alias(f"bytes:{i}")
+            )
+            aggregates.append(pl.col(f"bytes:{i}").sum())
+    return (
+        dataset.source.with_columns(prepared)
+        .group_by(TOTALS_KEY)
+        .agg(aggregates)
+        .drop(TOTALS_KEY)
+    )
+
+
+def _totals(dataset: Dataset, df: pl.DataFrame, shifts: dict[str, float]) -> dict:
+    """
+    Derives each column's counts, extremes, mean and deviation from the sums.
+
+    Returns the row count and, by column, ``nulls`` and ``count``, plus
+    ``zeros``, ``min``, ``max``, ``mean`` and ``std`` for numerical columns
+    and the summed length in ``bytes`` of string columns. ``_column_totals``
+    adds the extremes of string columns and the estimated distinct values,
+    ``unique``, of categorical ones.
+    """
+    sums = df.row(0, named=True) if df.height else dict.fromkeys(df.columns, 0)
+    columns = {}
+    for i, col in enumerate(dataset.source.collect_schema()):
+        count = sums["rows"] - sums[f"nulls:{i}"]
+        stats = {"nulls": sums[f"nulls:{i}"], "count": count}
+        if f"bytes:{i}" in sums:
+            stats["bytes"] = sums[f"bytes:{i}"] or 0
+        if col in shifts:
+            deviation = sums[f"deviation:{i}"] or 0.0
+            spread = (sums[f"squares:{i}"] or 0.0) - deviation * deviation / max(
+                count, 1
+            )
+            stats["zeros"] = sums[f"zeros:{i}"]
+            stats["min"] = sums[f"min:{i}"] if count else None
+            stats["max"] = sums[f"max:{i}"] if count else None
+            stats["mean"] = shifts[col] + deviation / count if count else None
+            stats["std"] = (
+                math.sqrt(max(spread, 0.0) / (count - 1)) if count > 1 else None
+            )
+        columns[col] = stats
+    return {"rows": sums["rows"], "columns": columns}
+
+
+def _shifts(dataset: Dataset) -> dict[str, float]:
+    """
+    Means of the numerical columns over the first rows.
+
+    Squares are summed around them instead of zero, so the variance of
+    values far from zero does not cancel out in floating point.
+    """
+    schema = dataset.source.collect_schema()
+    numeric = [col for col, dtype in schema.items() if is_numeric(dtype)]
+    if not numeric:
+        return {}
+    head = dataset.source.head(SHIFT_ROWS).select(
+        pl.col(numeric).cast(pl.Float64).mean()
+    )
+    means = head.collect().row(0, named=True)
+    return {
+        col: mean if mean is not None and math.isfinite(mean) else 0.0
+        for col, mean in means.items()
+    }
+
+
+def _sketch_query(dataset: Dataset, column: str) -> pl.LazyFrame:
+    """
+    Keeps the smallest hash remainder of each bucket, see ``_estimate_unique``.
+
+    Missing values hash alike, so they count as one value, as in ``n_unique``.
+    """
+    hashes = pl.col(column).cast(pl.String).hash()
+    buckets = 1 << SKETCH_BITS
+    return (
+        dataset.source.select(
+            (hashes % buckets).alias("bucket"), (hashes // buckets).alias("rest")
+        )
+        .group_by("bucket")
+        .agg(pl.col("rest").min())
+    )
+
+
+def _estimate_unique(sketch: pl.DataFrame) -> int:
+    """
+    Estimates the distinct values of a column from its sketch, by HyperLogLog.
+
+    A bucket's register is the position of the first 1-bit of its smallest
+    remainder. Few distinct values are counted from the empty buckets instead.
+    """
+    buckets, bits = 1 << SKETCH_BITS, 64 - SKETCH_BITS
+    registers = [bits - int(rest).bit_length() + 1 for rest in sketch["rest"]]
+    empty = buckets - len(registers)
+    alpha = 0.7213 / (1 + 1.079 / buckets)
+    estimate = alpha * buckets**2 / (empty + sum(2.0**-r for r in registers))
+    if estimate <= 2.5 * buckets and empty:
+        estimate = buckets * math.log(buckets / empty)
+    return round(estimate)
+
+
+def _extremes_query(dataset: Dataset, column: str) -> pl.LazyFrame:
+    """The lowest and highest value of a string column, as up to two rows."""
+    values = dataset.source.select(column).drop_nulls()
+    return pl.concat([values.bottom_k(1, by=column), values.top_k(1, by=column)])
+
+
+def _counts_query(dataset: Dataset, column: str) -> pl.LazyFrame:
+    return (
+        dataset.source.group_by(column)
+        .len()
+        .sort("len", descending=True)
+        .rename({column: "category", "len": "count"})
+    )
+
+
+def _estimated_bytes(dtype: pl.DataType, rows: int, stats: dict) -> int:
+    """What ``estimated_size`` of the column would report, had it been loaded."""
+    if "bytes" in stats:
+        return stats["bytes"]
+    probe = pl.repeat(None, 1024, dtype=dtype, eager=True)
+    width = probe.estimated_size() / 1024
+    if not stats["nulls"]:  # The probe's validity bitmap only exists with nulls
+        width -= 1 / 8
+    return int(rows * width)
@@ -0,0 +1,228 @@
+import bz2
+import contextlib
+import fcntl
+import gzip
+import os
+import re
+import tempfile
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import BinaryIO
+
+from flask import Flask, Response, jsonify, request
+
+from utils.dataset_archive import DATASET_ARCHIVE
+from utils.file_utils import file_lock
+from utils.logger_config import logger
+from utils.shared_store import SHARED_STORE
+
+try:
+    import zstandard
+except ImportError:  # zstd uploads are rejected without the optional package
+    zstandard = None
+
+UPLOAD_DIR = Path(os.environ.get("UPLOAD_DIR", tempfile.gettempdir())) / "eda-uploads"
+CLAIM_DIR = UPLOAD_DIR / "datasets"  # Uploads read lazily, see ``claim_upload``
+UPLOAD_STALE_SECONDS = 24 * 3600  # Abandoned partial uploads are removed after this
+COPY_BLOCK_BYTES = 1024 * 1024  # Request bodies are copied to disk in blocks of this
+# Largest file accepted, as uploaded and once decompressed
+UPLOAD_MAX_BYTES = int(os.environ.get("UPLOAD_MAX_MB", "16384")) * 1024 * 1024
+
+_UPLOAD_ID = re.compile(r"[0-9a-f]{32}")
+_claim_dirs: dict[int, tuple[Path, BinaryIO]] = {}  # By pid, see ``_claim_dir``
+_claim_dirs_lock = threading.Lock()
+
+# Compressed uploads are recognised by their leading bytes, not their name
+COMPRESSION_MAGIC = {b"\x1f\x8b": "gzip", b"\x28\xb5\x2f\xfd": "zstd", b"BZh": "bz2"}
+COMPRESSION_SUFFIXES = {".gz", ".gzip", ".zst", ".zstd", ".bz2"}
+
+
+def upload_path(upload_id: str) -> Path:
+    """Returns the temp file of an upload, rejecting ids the server did not issue."""
+    if not isinstance(upload_id, str) or not _UPLOAD_ID.fullmatch(upload_id):
+        raise ValueError("Invalid upload id")
+    return UPLOAD_DIR / f"{upload_id}.part"
+
+
+def claim_upload(upload_id: str) -> Path:
+    """
+    Moves a finished upload out of the temp area, for data read lazily from it.
+
+    The caller owns the returned file and must delete it when done; files
+    of a process that died first are removed by ``_remove_stale_uploads``.
+    """
+    claimed = _claim_dir() / f"{upload_id}.data"
+    upload_path(upload_id).replace(claimed)
+    return claimed
+
+
+def _claim_dir() -> Path:
+    """
+    Returns this process's directory of claimed uploads, made on first use.
+
+    The process locks the directory's ``.lock`` file until it exits, however
+    it exits, which tells other processes the files in it are in use.
+    """
+    pid = os.getpid()  # A forked worker makes a directory of its own
+    with _claim_dirs_lock:
+        if pid not in _claim_dirs:
+            directory = CLAIM_DIR / uuid.uuid4().hex
+            directory.mkdir(parents=True)
+            lock = directory.with_suffix(".lock").open("wb")
+            fcntl.flock(lock.fileno(), fcntl.LOCK_EX)
+            _claim_dirs[pid] = (directory, lock)
+        return _claim_dirs[pid][0]
+
+
+def discard_upload(upload_id: str) -> None:
+    """Deletes the temp file of an upload once it has been read."""
+    upload_path(upload_id).unlink(missing_ok=True)
+
+
+def _open_decompressed(f: BinaryIO, codec: str) -> BinaryIO:
+    if codec == "gzip":
+        return gzip.GzipFile(fileobj=f)
+    if codec == "bz2":
+        return bz2.BZ2File(f)
+    if zstandard is None:
+        raise ValueError("zstd uploads require the zstandard package")
+    return zstandard.ZstdDecompressor().stream_reader(f, read_across_frames=True)
+
+
+def decompress_upload(upload_id: str, filename: str) -> tuple[str, str | None]:
+    """
+    Inflates a gzip, zstd or bz2 upload in place before it is parsed.
+
+    The compressed file is decompressed block by block into a sibling file
+    that then replaces it, so neither form is ever held in memory. Returns
+    ``filename`` without its compression suffix and the codec, or the
+    unchanged name and None when the upload is not compressed.
+
+    Raises ``ValueError`` once the output exceeds ``UPLOAD_MAX_BYTES``, so a
+    small archive cannot fill the disk.
+    """
+    path = upload_path(upload_id)
+    with path.open("rb") as f:
+        head = f.read(4)
+    codec = next(
+        (codec for magic, codec in COMPRESSION_MAGIC.items() if head.startswith(magic)),
+        None,
+    )
+    if codec is None:
+        return filename, None
+
+    inflated = path.with_suffix(".inflate")
+    try:
+        with path.open("rb") as f, _open_decompressed(f, codec) as src:
+            with inflated.open("wb") as dst:
+                while block := src.read(COPY_BLOCK_BYTES):
+                    if dst.tell() + len(block) > UPLOAD_MAX_BYTES:
+                        raise ValueError(
+                            f"Upload inflates to more than "
+                            f"{UPLOAD_MAX_BYTES // (1024 * 1024):,} MB"
+                        )
+                    dst.write(block)
+        inflated.replace(path)
+    except BaseException:
+        inflated.unlink(missing_ok=True)
+        raise
+
+    name = Path(filename)
+    if name.suffix.lower() in COMPRESSION_SUFFIXES:
+        filename = name.stem
+    logger.info(
+        f"🗜️ Decompressed {codec} upload {upload_id} "
+        f"({path.stat().st_size / 1024:.2f} KB inflated)"
+    )
+    return filename, codec
+
+
+def _remove_stale_uploads() -> None:
+    cutoff = time.time() - UPLOAD_STALE_SECONDS
+    for part in [*UPLOAD_DIR.glob("*.part"), *UPLOAD_DIR.glob("*.inflate")]:
+        try:
+            if part.stat().st_mtime < cutoff:
+                part.unlink()
+        except FileNotFoundError:
+            pass  # Removed by another worker
+    for lock_path in CLAIM_DIR.glob("*.lock"):
+        with contextlib.suppress(FileNotFoundError):  # Removed by another worker
+            if lock_path.stat().st_mtime < cutoff:
+                _remove_abandoned_claims(lock_path)
+
+
+def _remove_abandoned_claims(lock_path: Path) -> None:
+    """
+    Deletes the claimed uploads of a process that exited without deleting them.
+
+    Links a store still refers to are kept (see ``utils.dataset._link_source``);
+    the store unlinks them once it drops the dataset.
+    """
+    directory = lock_path.with_suffix("")
+    with lock_path.open("rb") as lock:
+        try:
+            fcntl.flock(lock.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            return  # Its process is alive
+        for path in directory.glob("*"):
+            if path.suffix != ".source" or not _store_refers_to(path):
+                path.unlink(missing_ok=True)
+                logger.info(f"🧹 Removed abandoned upload file {path.name}")
+        with contextlib.suppress(OSError):  # Not empty while links remain
+            directory.rmdir()
+            lock_path.unlink()
+
+
+def _store_refers_to(link: Path) -> bool:
+    fingerprint = link.stem.rsplit("-", 1)[0]  # Named <fingerprint>-<format>.source
+    return any(
+        store is not None and store.has(fingerprint)
+        for store in (SHARED_STORE, DATASET_ARCHIVE)
+    )
+
+
+def register_upload_routes(server: Flask) -> None:
+    """
+    Registers the chunked upload endpoints on the Flask server.
+
+    The browser posts the file in slices as raw bytes, which are appended to a
+    temp file without being buffered; the ``uploaded-file`` store then hands
+    the upload id to the Dash callback that parses the file from disk.
+    """
+
+    @server.post("/upload")
+    def start_upload() -> Response:
+        UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
+        _remove_stale_uploads()
+        upload_id = uuid.uuid4().hex
+        upload_path(upload_id).touch()
+        logger.info(f"📥 Upload {upload_id} started")
+        return jsonify({"upload_id": upload_id})
+
+    @server.put("/upload/<upload_id>")
+    def upload_chunk(upload_id: str) -> Response | tuple[Response, int]:
+        """Appends one slice; ``offset`` must match the bytes received so far."""
+        try:
+            path = upload_path(upload_id)
+            offset = int(request.args.get("offset", -1))
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
+        if not path.exists():
+            return jsonify({"error": "Unknown upload"}), 404
+
+        # Retried slices can overlap; check, write and measure as one step
+        with file_lock(path), path.open("r+b") as f:
+            size = f.seek(0, os.SEEK_END)
+            if offset != size:  # Out of order or a retried slice that already landed
+                return jsonify({"error": "Offset mismatch", "size": size}), 409
+            while block := request.stream.read(COPY_BLOCK_BYTES):
+                if f.tell() + len(block) > UPLOAD_MAX_BYTES:
+                    f.truncate(offset)  # Drop the part of the slice written so far
+                    return jsonify({"error": "Upload too large", "size": offset}), 413
+                f.write(block)
+            size = f.tell()
+
+        return jsonify({"size": size})
@@ -0,0 +1,84 @@
+import os
+import threading
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any
+
+from utils.cache_manager import CACHE_MANAGER
+from utils.dataset import Dataset, current_dataset
+from utils.logger_config import logger
+from utils.sessions import current_session, session_context
+
+WARMUP_WORKERS = int(os.environ.get("CACHE_WARMUP_WORKERS", "2"))
+WARMUP_NICENESS = 10  # Added to the worker threads' nice value on Linux
+
+
+def _lower_thread_priority() -> None:
+    """Makes the calling pool thread yield the CPU to request handlers."""
+    try:
+        thread = threading.get_native_id()
+        niceness = os.getpriority(os.PRIO_PROCESS, thread) + WARMUP_NICENESS
+        os.setpriority(os.PRIO_PROCESS, thread, niceness)
+    except (AttributeError, OSError):
+        pass  # Per-thread priorities are Linux-only
+
+
+class WarmupScheduler:
+    """
+    Precomputes cache entries in a small low-priority thread pool.
+
+    Scheduling for a new dataset cancels whatever is still queued for the
+    previous one of the same session, and every task is skipped once its
+    dataset is no longer the session's active one.
+    """
+
+    def __init__(self, max_workers: int):
+        self.max_workers = max_workers
+        self.pool: ThreadPoolExecutor | None = None
+        self.pending: dict[str, list[Future]] = {}  # By session
+        self.lock = threading.Lock()
+
+    def schedule(
+        self, dataset: Dataset, tasks: list[tuple[str, Callable[[], Any]]]
+    ) -> None:
+        """Queues ``tasks`` (name, thunk) to warm the cache for ``dataset``."""
+        if self.max_workers <= 0 or not CACHE_MANAGER.ENABLE_CACHE:
+            return
+
+        session = current_session()  # Pool threads run outside the request
+        with self.lock:
+            if self.pool is None:
+                self.pool = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix="cache-warmup",
+                    initializer=_lower_thread_priority,
+                )
+            for future in self.pending.get(session, []):
+                future.cancel()
+            self.pending[session] = [
+                self.pool.submit(self._run, session, dataset, name, task)
+                for name, task in tasks
+            ]
+            # Forget sessions whose tasks have all finished
+            self.pending = {
+                key: futures
+                for key, futures in self.pending.items()
+                if not all(future.done() for future in futures)
+            }
+        logger.info(f"🔥 Scheduled {len(tasks)} cache warm-up tasks")
+
+    @staticmethod
+    def _run(
+        session: str, dataset: Dataset, name: str, task: Callable[[], Any]
+    ) -> None:
+        if current_dataset(session) is not dataset:
+            return  # Dataset replaced since scheduling
+        try:
+            with session_context(session):  # Cache lookups resolve the dataset
+                task()
+        except Exception as e:
+            logger.warning(f"⚠️ Cache warm-up for {name} failed: {e}")
+
+
+# ✅ Singleton instance
+WARMUP_SCHEDULER = WarmupScheduler(WARMUP_WORKERS)